@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark bridge SSE encoding: per-delta dict + json.dumps versus the
+per-request SSEStreamEncoder, and frames written with delta coalescing.
+
+Usage: python scripts/bench_sse.py [--deltas 200000] [--fragment 4]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from xsarena.bridge_v2.formatters import (  # noqa: E402
+    FAST_JSON,
+    DeltaCoalescer,
+    SSEStreamEncoder,
+    format_openai_chunk,
+)
+
+
+def fragments(count: int, size: int):
+    rng = random.Random(0)
+    alphabet = 'abcdefghij klmnop "qrs"\ntuv wxyz é'
+    return ["".join(rng.choice(alphabet) for _ in range(size)) for _ in range(count)]
+
+
+def bench(label: str, fn, deltas) -> float:
+    started = time.perf_counter()
+    fn(deltas)
+    elapsed = time.perf_counter() - started
+    rate = len(deltas) / elapsed
+    print(f"{label:<38} {rate:>12,.0f} deltas/s  ({elapsed:.3f}s)")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--deltas", type=int, default=200_000)
+    parser.add_argument("--fragment", type=int, default=4, help="characters per delta")
+    parser.add_argument(
+        "--arrival-us",
+        type=float,
+        default=500.0,
+        help="simulated gap between deltas for coalescing (microseconds)",
+    )
+    args = parser.parse_args()
+
+    deltas = fragments(args.deltas, args.fragment)
+    print(f"{len(deltas):,} deltas of {args.fragment} chars; fast JSON backend: {FAST_JSON}")
+
+    def legacy(items):
+        for d in items:
+            format_openai_chunk(d, "some-model", "req-123")
+
+    def encoder(items):
+        enc = SSEStreamEncoder("some-model", "req-123")
+        for d in items:
+            enc.delta(d)
+
+    before = bench("format_openai_chunk (per-delta dict)", legacy, deltas)
+    after = bench("SSEStreamEncoder (frame template)", encoder, deltas)
+    print(f"speed-up: {after / before:.1f}x")
+
+    # Writes with coalescing, replaying the deltas on a simulated clock
+    coalescer = DeltaCoalescer()
+    gap = args.arrival_us / 1e6
+    frames = 0
+    now = 0.0
+    for d in deltas:
+        now += gap
+        if coalescer.add(d, now) is not None:
+            frames += 1
+    frames += 1 if coalescer.pending else 0
+    print(
+        f"frames written: {len(deltas):,} -> {frames:,} with coalescing "
+        f"({coalescer.max_delay * 1000:g} ms / {coalescer.max_chars} chars), "
+        f"{len(deltas) / max(1, frames):.1f} deltas per frame"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# src/xsarena/bridge_v2/admission.py
+"""Fair admission queue in front of the bridge's response channels."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+LANES = ("interactive", "batch")  # drained in this order
+
+
+class AdmissionRejected(Exception):
+    """The request could not be admitted: the queue is full or its wait ran out."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("key", "peer", "lane", "future", "enqueued_at")
+
+    def __init__(self, key: str, peer: str, lane: str, future: "asyncio.Future[None]"):
+        self.key = key
+        self.peer = peer
+        self.lane = lane
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionQueue:
+    """
+    Bound the number of active requests and queue the rest fairly.
+
+    Up to `max_active` requests run at once. Beyond that a request waits in
+    its lane: "interactive" is always served before "batch", and within a lane
+    peers (client address or API key) take turns, so one busy client cannot
+    starve the others. A request that would exceed `max_queue` waiters, or
+    that is not admitted before its deadline, is rejected with a Retry-After
+    estimate.
+    """
+
+    def __init__(self, max_active: int = 200, max_queue: int = 1000):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self._active: Dict[str, Tuple[str, str]] = {}  # key -> (peer, lane)
+        self._lanes: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            lane: OrderedDict() for lane in LANES
+        }
+        self._queued = 0
+        self._waits: Dict[str, Deque[float]] = {lane: deque(maxlen=500) for lane in LANES}
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "deadline": 0}
+
+    def configure(self, max_active: int, max_queue: int) -> None:
+        """Apply current limits (config may change at runtime)."""
+        self.max_active = max(1, max_active)
+        self.max_queue = max(0, max_queue)
+        self._dispatch()
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> float:
+        """Rough seconds until a slot frees up: recent queue wait, at least one second."""
+        recent = [w for lane in LANES for w in self._waits[lane]]
+        if not recent:
+            return 1.0
+        return float(max(1, math.ceil(sum(recent) / len(recent))))
+
+    async def acquire(
+        self, key: str, peer: str, lane: str = "interactive", timeout: float = 30.0
+    ) -> float:
+        """Wait for an active slot for request `key`; returns seconds spent queued."""
+        if lane not in self._lanes:
+            lane = LANES[0]
+        if self.active < self.max_active and not self._queued:
+            self._admit(key, peer, lane, 0.0)
+            return 0.0
+        if self._queued >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected("Server busy: admission queue full", self.retry_after())
+
+        waiter = _Waiter(key, peer, lane, asyncio.get_running_loop().create_future())
+        self._lanes[lane].setdefault(peer, deque()).append(waiter)
+        self._queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            self._withdraw(waiter)
+            if waiter.future.done():
+                # Admitted at the same moment the deadline hit: keep the slot
+                return time.monotonic() - waiter.enqueued_at
+            self.rejected["deadline"] += 1
+            raise AdmissionRejected(
+                f"Server busy: not admitted within {timeout:g}s", self.retry_after()
+            ) from None
+        except BaseException:
+            # Client went away while queued (or was admitted just as it left)
+            self._withdraw(waiter)
+            self.release(key)
+            raise
+        return time.monotonic() - waiter.enqueued_at
+
+    def release(self, key: str) -> None:
+        """Free the slot held by `key` (safe to call more than once, or if never admitted)."""
+        if self._active.pop(key, None) is not None:
+            self._dispatch()
+
+    def _admit(self, key: str, peer: str, lane: str, waited: float) -> None:
+        self._active[key] = (peer, lane)
+        self._waits[lane].append(waited)
+        self.admitted += 1
+
+    def _withdraw(self, waiter: _Waiter) -> None:
+        peers = self._lanes[waiter.lane]
+        queue = peers.get(waiter.peer)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._queued -= 1
+        if not queue:
+            del peers[waiter.peer]
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters: lanes in priority order, peers round-robin."""
+        while self.active < self.max_active and self._queued:
+            for lane in LANES:
+                peers = self._lanes[lane]
+                if peers:
+                    break
+            else:
+                return
+            peer, queue = next(iter(peers.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                peers.move_to_end(peer)  # this peer goes to the back of the rotation
+            else:
+                del peers[peer]
+            if waiter.future.done():
+                continue
+            self._admit(
+                waiter.key, waiter.peer, lane, time.monotonic() - waiter.enqueued_at
+            )
+            waiter.future.set_result(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        lanes = {}
+        for lane in LANES:
+            peers = self._lanes[lane]
+            waits = sorted(self._waits[lane])
+            oldest = min(
+                (q[0].enqueued_at for q in peers.values() if q), default=None
+            )
+            lanes[lane] = {
+                "queued": sum(len(q) for q in peers.values()),
+                "peers_waiting": len(peers),
+                "oldest_wait": round(now - oldest, 3) if oldest is not None else 0.0,
+                "wait_p50": _pct(waits, 50),
+                "wait_p95": _pct(waits, 95),
+                "wait_max": round(waits[-1], 3) if waits else None,
+            }
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "lanes": lanes,
+        }
+
+
+def _pct(ordered, pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)], 3)
+
+
+admission_queue = AdmissionQueue()
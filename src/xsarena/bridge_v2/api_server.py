@@ -1,55 +1,70 @@
 # src/xsarena/bridge_v2/api_server.py
-import json
+import asyncio
 import logging
 import os
-import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from . import handlers as handlers_module
 from . import job_service as job_service_module
-
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-
-
-# Import from new modules
+from .admission import admission_queue
+from .channels import reap_channels_forever
+from .endpoints import endpoint_balancer
 from .handlers import (
     CONFIG,
-    MODEL_NAME_TO_ID_MAP,
     _internal_ok,
     chat_completions_handler,
     load_config,
-    load_model_endpoint_map,
-    load_model_map,
     update_available_models_handler,
     update_id_capture_handler,
 )
+from .model_registry import model_registry
+from .ratelimit import rate_limiter
+from .recovery import recovery_journal
 from .websocket import (
     REFRESHING_BY_REQUEST,
-    browser_ws,
     cloudflare_verified,
+    drain_commands_forever,
+    pool,
     response_channels,
     start_idle_restart_thread,
     stop_idle_restart_thread,
     websocket_endpoint,
 )
 
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     load_config()
-    load_model_map()
-    load_model_endpoint_map()
+    model_registry.reload(force=True)
     start_idle_restart_thread(CONFIG)  # Start idle restart thread with CONFIG
+    # load_config() rebinds handlers.CONFIG, so background tasks read it from there
+    reaper = asyncio.create_task(
+        reap_channels_forever(response_channels, lambda: handlers_module.CONFIG)
+    )
+    # Pick up edits to models.json / model_endpoint_map.json without a restart
+    watcher = asyncio.create_task(
+        model_registry.watch_forever(
+            lambda: float(handlers_module.CONFIG.get("models_reload_seconds", 2))
+        )
+    )
+    # Forward commands from background threads even while no userscript is talking
+    commands = asyncio.create_task(drain_commands_forever())
     logger.info("Server startup complete. Waiting for userscript connection...")
     yield
+    reaper.cancel()
+    watcher.cancel()
+    commands.cancel()
     stop_idle_restart_thread()  # Stop idle restart thread
     logger.info("Server shutting down.")
 
@@ -94,7 +109,7 @@ async def chat_completions(request: Request):
     # Call the handler from the handlers module
     return await chat_completions_handler(
         request,
-        browser_ws,
+        pool,
         response_channels,
         REFRESHING_BY_REQUEST,
         cloudflare_verified,
@@ -105,9 +120,10 @@ async def chat_completions(request: Request):
 async def start_id_capture(request: Request):
     if not _internal_ok(request):
         raise HTTPException(status_code=401, detail="Unauthorized")
-    if not browser_ws:
+    conn = pool.least_loaded()
+    if conn is None:
         raise HTTPException(status_code=503, detail="Browser client not connected.")
-    await browser_ws.send_json({"command": "activate_id_capture"})
+    await conn.send_json({"command": "activate_id_capture"})
     return JSONResponse({"status": "success", "message": "Activation command sent."})
 
 
@@ -116,9 +132,10 @@ async def request_model_update(request: Request):
     if not _internal_ok(request):
         raise HTTPException(status_code=401, detail="Unauthorized")
     """Request userscript to send page source for model update."""
-    if not browser_ws:
+    conn = pool.least_loaded()
+    if conn is None:
         raise HTTPException(status_code=503, detail="Browser client not connected.")
-    await browser_ws.send_json({"command": "send_page_source"})
+    await conn.send_json({"command": "send_page_source"})
     return JSONResponse({"status": "success", "message": "Page source request sent."})
 
 
@@ -163,34 +180,15 @@ def internal_config(request: Request):
 
 
 @app.get("/v1/models")
-async def list_models():
-    """Return available models in OpenAI schema."""
-    try:
-        models_list = []
-        for model_name in MODEL_NAME_TO_ID_MAP:  # Iterate over keys
-            # Try to determine if it's an image model
-            try:
-                with open("models.json", "r", encoding="utf-8") as f:
-                    models_data = json.load(f)
-                model_info = models_data.get(model_name)
-                if model_info and isinstance(model_info, dict):
-                    if model_info.get("type") == "image":
-                        pass
-            except (FileNotFoundError, json.JSONDecodeError):
-                pass  # If models.json doesn't exist, continue with is_image format
-
-            model_obj = {
-                "id": model_name,
-                "object": "model",
-                "created": int(time.time()),
-                "owned_by": "user",
-            }
-            models_list.append(model_obj)
-
-        return {"object": "list", "data": models_list}
-    except Exception as e:
-        logger.error(f"Error listing models: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def list_models(request: Request):
+    """Return available models in OpenAI schema (prebuilt by the model registry)."""
+    models = model_registry.current
+    headers = {"ETag": models.etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == models.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=models.models_body, media_type="application/json", headers=headers
+    )
 
 
 @app.post("/internal/reload")
@@ -199,8 +197,7 @@ def internal_reload(request: Request):
         raise HTTPException(status_code=401, detail="Unauthorized")
     try:
         load_config()
-        load_model_map()
-        load_model_endpoint_map()
+        model_registry.reload(force=True)
         return JSONResponse(
             {"ok": True, "reloaded": True, "version": CONFIG.get("version")}
         )
@@ -247,7 +244,14 @@ def health():
     return {
         "status": "ok",
         "ts": datetime.now().isoformat(),
-        "ws_connected": browser_ws is not None,
+        "ws_connected": bool(pool),
+        "ws_connections": pool.snapshot(),
+        "endpoints": endpoint_balancer.snapshot(),
+        "admission": admission_queue.snapshot(),
+        "rate_limit": rate_limiter.snapshot(),
+        "channels": response_channels.snapshot(),
+        "recovery": recovery_journal.snapshot(),
+        "models": model_registry.snapshot(),
         "last_activity": last_activity_iso,
         "version": CONFIG.get("version", "unknown"),
     }
@@ -0,0 +1,262 @@
+# src/xsarena/bridge_v2/channels.py
+"""Bounded per-request channels between the userscript WebSocket and HTTP clients."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Signal = Callable[[str], Awaitable[None]]
+
+
+def _mergeable(data: Any) -> bool:
+    return isinstance(data, str) and data != "[DONE]" and not data.startswith("![Image]")
+
+
+class ResponseChannel:
+    """
+    One request's buffer of userscript output, bounded in items and characters.
+
+    The WebSocket reader never blocks on a channel (it serves every request),
+    so a slow HTTP consumer is handled by policy instead:
+
+    - past `max_items` queued messages, new text is merged into the last one;
+    - past `max_chars` buffered characters, the userscript is asked to
+      ``pause_stream`` for this request, and ``resume_stream`` once the
+      consumer has drained below half of that;
+    - past `hard_limit_chars`, the buffer is dropped, the userscript is told
+      to ``cancel_stream`` and the request fails with an error the consumer
+      will read next.
+
+    A request given up on before the userscript finished (reaped, cut short
+    or abandoned by its client) is sent ``cancel_stream`` too, so a paused
+    tab does not wait forever on a stream nobody will resume.
+
+    The hard limit is what bounds memory (at most `max_channels` times it in
+    total); pausing keeps a merely slow consumer well below it.
+
+    Errors and sentinels are always accepted.
+    """
+
+    def __init__(
+        self,
+        request_id: str,
+        max_items: int = 256,
+        max_chars: int = 128_000,
+        hard_limit_chars: int = 512_000,
+        signal: Optional[Signal] = None,
+        on_reap: Optional[Callable[[], None]] = None,
+        on_overflow: Optional[Callable[[], None]] = None,
+    ):
+        self.request_id = request_id
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.hard_limit_chars = max(hard_limit_chars, max_chars)
+        self.signal = signal
+        self.on_reap = on_reap
+        self.on_overflow = on_overflow
+        self._items: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+        self.chars = 0
+        self.peak_chars = 0
+        self.total_chars = 0
+        self.coalesced = 0
+        self.paused = False
+        self.overflowed = False
+        self.finished = False  # the userscript sent [DONE] or an error
+        self.cancelled = False  # cancel_stream was sent
+        self.created = time.monotonic()
+        self.last_read = self.created
+        self.reading = False
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    async def put(self, data: Any) -> None:
+        """Accept one message from the userscript (never waits on the consumer)."""
+        if self.overflowed:
+            return
+        size = len(data) if isinstance(data, str) else 0
+        if (
+            len(self._items) >= self.max_items
+            and _mergeable(data)
+            and _mergeable(self._items[-1])
+        ):
+            self._items[-1] += data
+            self.coalesced += 1
+        else:
+            self._items.append(data)
+        self.chars += size
+        self.total_chars += size
+        self.peak_chars = max(self.peak_chars, self.chars)
+        self._ready.set()
+        if data == "[DONE]" or (isinstance(data, dict) and "error" in data):
+            self.finished = True
+
+        if self.chars > self.hard_limit_chars:
+            self._overflow()
+            await self.cancel()
+        elif self.chars > self.max_chars and not self.paused:
+            self.paused = True
+            logger.info(
+                f"Channel {self.request_id} holds {self.chars} chars; pausing its stream"
+            )
+            await self._signal("pause_stream")
+
+    def put_nowait(self, data: Any) -> None:
+        """Synchronous put for errors and sentinels (no userscript signalling)."""
+        self._items.append(data)
+        self._ready.set()
+
+    async def get(self) -> Any:
+        """Next message, waiting until one arrives."""
+        self.reading = True
+        try:
+            while not self._items:
+                self._ready.clear()
+                await self._ready.wait()
+        finally:
+            self.reading = False
+        data = self._items.popleft()
+        if isinstance(data, str):
+            self.chars -= len(data)
+        self.last_read = time.monotonic()
+        if self.paused and self.chars <= self.max_chars // 2:
+            self.paused = False
+            # Don't hold up the consumer (or lose `data` to a cancellation) on the send
+            asyncio.ensure_future(self._signal("resume_stream"))
+        return data
+
+    def _overflow(self) -> None:
+        logger.warning(
+            f"Channel {self.request_id} exceeded {self.hard_limit_chars} buffered chars; "
+            "failing the request"
+        )
+        self.overflowed = True
+        self._items.clear()
+        self.chars = 0
+        self._items.append(
+            {"error": "Response channel overflow: the client is not reading the stream."}
+        )
+        self._ready.set()
+        if self.on_overflow is not None:
+            self.on_overflow()
+
+    async def cancel(self) -> None:
+        """Tell the userscript to abort this request, unless it already ended."""
+        if self.finished or self.cancelled:
+            return
+        self.cancelled = True
+        await self._signal("cancel_stream")
+
+    async def _signal(self, command: str) -> None:
+        if self.signal is None:
+            return
+        try:
+            await self.signal(command)
+        except Exception as e:
+            logger.debug(f"Could not send {command} for {self.request_id}: {e}")
+
+    def stale(self, now: float, idle_seconds: float) -> bool:
+        """No consumer has read (or is waiting to read) for `idle_seconds`."""
+        return not self.reading and now - self.last_read > idle_seconds
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "queued": len(self._items),
+            "chars": self.chars,
+            "peak_chars": self.peak_chars,
+            "total_chars": self.total_chars,
+            "coalesced": self.coalesced,
+            "paused": self.paused,
+            "idle_for": round(now - self.last_read, 1),
+        }
+
+
+class ChannelRegistry(Dict[str, ResponseChannel]):
+    """request_id -> ResponseChannel, with reaping of channels nobody reads."""
+
+    def __init__(self):
+        super().__init__()
+        self.reaped = 0
+        self.overflows = 0
+
+    def open(
+        self,
+        request_id: str,
+        config: Dict[str, Any],
+        signal: Optional[Signal] = None,
+        on_reap: Optional[Callable[[], None]] = None,
+    ) -> ResponseChannel:
+        """Create and register a channel with the limits from `config["channels"]`."""
+        cfg = config.get("channels", {})
+        channel = ResponseChannel(
+            request_id,
+            max_items=int(cfg.get("max_items", 256)),
+            max_chars=int(cfg.get("max_chars", 128_000)),
+            hard_limit_chars=int(cfg.get("hard_limit_chars", 512_000)),
+            signal=signal,
+            on_reap=on_reap,
+            on_overflow=self._note_overflow,
+        )
+        self[request_id] = channel
+        return channel
+
+    def _note_overflow(self) -> None:
+        self.overflows += 1
+
+    async def reap(self, idle_seconds: float) -> List[str]:
+        """Fail and drop channels whose HTTP client went away; returns their ids."""
+        now = time.monotonic()
+        reaped = []
+        for request_id, channel in list(self.items()):
+            if not channel.stale(now, idle_seconds):
+                continue
+            reaped.append(request_id)
+            self.pop(request_id, None)
+            self.reaped += 1
+            # Should the consumer come back after all, it reads an error and stops
+            channel.put_nowait({"error": "Response channel reaped: no reader."})
+            logger.warning(
+                f"Reaping channel {request_id}: no reader for {now - channel.last_read:.0f}s"
+            )
+            # Stop the tab's fetch while the request is still pinned to it
+            await channel.cancel()
+            if channel.on_reap is not None:
+                try:
+                    channel.on_reap()
+                except Exception as e:
+                    logger.debug(f"Cleanup for reaped channel {request_id} failed: {e}")
+        return reaped
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        channels = list(self.values())
+        return {
+            "open": len(channels),
+            "buffered_chars": sum(c.chars for c in channels),
+            "paused": sum(1 for c in channels if c.paused),
+            "reaped": self.reaped,
+            "overflows": self.overflows,
+            "largest": sorted(
+                (c.snapshot(now) for c in channels), key=lambda s: -s["chars"]
+            )[:5],
+        }
+
+
+async def reap_channels_forever(
+    registry: ChannelRegistry, get_config: Callable[[], Dict[str, Any]]
+) -> None:
+    """Background task: reap abandoned channels every few seconds."""
+    while True:
+        cfg = get_config().get("channels", {})
+        idle_seconds = float(cfg.get("reap_after_seconds", 120))
+        await asyncio.sleep(max(1.0, min(10.0, idle_seconds / 4)))
+        await registry.reap(idle_seconds)
@@ -0,0 +1,100 @@
+# src/xsarena/bridge_v2/endpoints.py
+"""Least-loaded selection among the endpoint configs of MODEL_ENDPOINT_MAP."""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+EndpointConfig = Dict[str, Any]
+
+
+def _endpoint_key(config: EndpointConfig) -> Tuple[Optional[str], Optional[str]]:
+    return config.get("session_id"), config.get("message_id")
+
+
+class _EndpointLoad:
+    __slots__ = ("inflight", "total", "failures", "latency_ewma")
+
+    def __init__(self):
+        self.inflight = 0
+        self.total = 0
+        self.failures = 0
+        self.latency_ewma: Optional[float] = None
+
+
+class EndpointBalancer:
+    """
+    Track in-flight requests and latency per (session_id, message_id) and pick
+    the least-loaded config when a model maps to several endpoints.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.3):
+        self.ewma_alpha = ewma_alpha
+        self._loads: Dict[Tuple[Optional[str], Optional[str]], _EndpointLoad] = {}
+        self._active: Dict[str, Tuple[Tuple[Optional[str], Optional[str]], float]] = {}
+
+    def _load(self, key) -> _EndpointLoad:
+        load = self._loads.get(key)
+        if load is None:
+            load = self._loads[key] = _EndpointLoad()
+        return load
+
+    def choose(
+        self, configs: Union[EndpointConfig, List[EndpointConfig]]
+    ) -> Optional[EndpointConfig]:
+        """Least in-flight config (ties: lower latency EWMA, then fewer requests)."""
+        if isinstance(configs, dict):
+            return configs
+        candidates = [c for c in configs or () if isinstance(c, dict)]
+        if not candidates:
+            return None
+
+        def score(config: EndpointConfig):
+            load = self._loads.get(_endpoint_key(config))
+            if load is None:
+                return (0, 0.0, 0)
+            return (load.inflight, load.latency_ewma or 0.0, load.total)
+
+        return min(candidates, key=score)
+
+    def start(self, request_id: str, session_id: str, message_id: str) -> None:
+        key = (session_id, message_id)
+        self._load(key).inflight += 1
+        self._active[request_id] = (key, time.monotonic())
+
+    def finish(self, request_id: str, ok: bool = True) -> None:
+        """Release the request's endpoint slot (safe to call more than once)."""
+        entry = self._active.pop(request_id, None)
+        if entry is None:
+            return
+        key, started = entry
+        load = self._load(key)
+        load.inflight = max(0, load.inflight - 1)
+        load.total += 1
+        if not ok:
+            load.failures += 1
+            return
+        latency = time.monotonic() - started
+        if load.latency_ewma is None:
+            load.latency_ewma = latency
+        else:
+            load.latency_ewma += self.ewma_alpha * (latency - load.latency_ewma)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "session_id": key[0],
+                "message_id": key[1],
+                "inflight": load.inflight,
+                "total": load.total,
+                "failures": load.failures,
+                "latency_ewma": (
+                    round(load.latency_ewma, 3)
+                    if load.latency_ewma is not None
+                    else None
+                ),
+            }
+            for key, load in self._loads.items()
+        ]
+
+
+endpoint_balancer = EndpointBalancer()
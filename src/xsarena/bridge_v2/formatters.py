@@ -2,6 +2,20 @@
 
 import json
 import time
+from typing import Optional
+
+# Optional fast JSON backend for string escaping in the streaming hot path
+try:
+    import orjson
+
+    def _json_str(text: str) -> str:
+        return orjson.dumps(text).decode("utf-8")
+
+    FAST_JSON = True
+except ImportError:
+    from json.encoder import encode_basestring as _json_str
+
+    FAST_JSON = False
 
 
 def format_openai_chunk(content, model, request_id):
@@ -43,6 +57,91 @@ def format_openai_finish_chunk(model, request_id, reason="stop"):
     return f"data: {json.dumps(chunk)}\n\n"
 
 
+class SSEStreamEncoder:
+    """
+    Encode one request's stream as OpenAI SSE frames without per-delta dicts.
+
+    The id/object/created/model part of every frame is serialized once per
+    request; each delta then only escapes its text and joins three strings.
+    Frames are byte-for-byte what `format_openai_chunk` would emit (with
+    `created` fixed at the start of the request).
+    """
+
+    __slots__ = ("_prefix", "_suffix", "_head")
+
+    def __init__(self, model, request_id, created: Optional[int] = None):
+        head = json.dumps(
+            {
+                "id": request_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()) if created is None else created,
+                "model": model,
+            },
+            ensure_ascii=False,
+        )[:-1]
+        self._head = head
+        self._prefix = f'data: {head}, "choices": [{{"index": 0, "delta": {{"content": '
+        self._suffix = '}, "finish_reason": null}]}\n\n'
+
+    def delta(self, content) -> str:
+        """SSE frame carrying one text delta."""
+        return self._prefix + _json_str(str(content)) + self._suffix
+
+    def finish(self, reason: str = "stop") -> str:
+        """SSE frame with the finish reason and an empty delta."""
+        return (
+            f'data: {self._head}, "choices": [{{"index": 0, "delta": {{}}, '
+            f'"finish_reason": {json.dumps(reason)}}}]}}\n\n'
+        )
+
+
+class DeltaCoalescer:
+    """
+    Merge adjacent text deltas so a stream is written in fewer, larger frames.
+
+    Text is held until `max_chars` have accumulated or the oldest held piece
+    is `max_delay` seconds old; `max_delay` of 0 disables coalescing.
+    """
+
+    __slots__ = ("max_chars", "max_delay", "_parts", "_size", "_since")
+
+    def __init__(self, max_chars: int = 512, max_delay: float = 0.02):
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self._parts = []
+        self._size = 0
+        self._since = 0.0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._parts)
+
+    def add(self, text: str, now: Optional[float] = None) -> Optional[str]:
+        """Hold `text`; returns the merged text when it is time to write it."""
+        if self.max_delay <= 0:
+            return text
+        now = time.monotonic() if now is None else now
+        if not self._parts:
+            self._since = now
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_chars or now - self._since >= self.max_delay:
+            return self.flush()
+        return None
+
+    def time_until_due(self, now: Optional[float] = None) -> float:
+        """Seconds until held text must be written (0.0 if overdue)."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._since + self.max_delay - now)
+
+    def flush(self) -> str:
+        """Return and clear the held text."""
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return text
+
+
 def add_content_filter_explanation(content, finish_reason):
     """Add explanation for content-filter finish reason."""
     if finish_reason == "content_filter":
@@ -1,26 +1,40 @@
 """Request handlers for the XSArena Bridge API."""
 
 import asyncio
+import functools
+import hashlib
 import hmac
+import io
 import json
 import logging
+import math
+import re
 import time
 import uuid
-from collections import deque
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 
+from .admission import LANES, AdmissionRejected, admission_queue
+from .channels import ResponseChannel
+from .endpoints import endpoint_balancer
+from .formatters import DeltaCoalescer, SSEStreamEncoder
+from .model_registry import model_registry
 from .payload_converter import convert_openai_to_lmarena_payload
+from .ratelimit import limit_from_config, rate_limiter
+from .recovery import (
+    CONTINUE_PROMPT,
+    DISCONNECTED,
+    continuation_request,
+    recovery_journal,
+)
 
 logger = logging.getLogger(__name__)
 
 # Global configuration
 CONFIG = {}
-MODEL_NAME_TO_ID_MAP = {}
-MODEL_ENDPOINT_MAP = {}
-PER_PEER = {}  # dict[ip] -> deque of timestamps
 
 
 def _internal_ok(request: Request) -> bool:
@@ -33,6 +47,68 @@ def _internal_ok(request: Request) -> bool:
         return False
 
 
+def _peer_limit(request: Request):
+    """(rate, burst) for this client: a per-key override, else the default limit."""
+    rate_cfg = CONFIG.get("rate_limit", {"burst": 10, "window_seconds": 10})
+    rate_limiter.max_entries = int(rate_cfg.get("max_peers", 10000))
+    auth_header = request.headers.get("authorization") or ""
+    key_limits = rate_cfg.get("keys") or {}
+    if auth_header.startswith("Bearer ") and auth_header[7:] in key_limits:
+        return limit_from_config(key_limits[auth_header[7:]])
+    return limit_from_config(rate_cfg)
+
+
+def _enforce_rate_limit(*limits) -> None:
+    """Spend from the given buckets or raise 429 with an accurate Retry-After."""
+    wait = rate_limiter.check(*limits)
+    if wait > 0:
+        retry_after = "86400" if math.isinf(wait) else str(max(1, math.ceil(wait)))
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": retry_after},
+        )
+
+
+def _admission_peer(request: Request) -> str:
+    """Fairness identity: the API key when one is presented, else the client address."""
+    auth_header = request.headers.get("authorization") or ""
+    if auth_header.startswith("Bearer "):
+        digest = hashlib.sha256(auth_header[7:].encode("utf-8")).hexdigest()
+        return f"key:{digest[:12]}"
+    return (request.client.host if request.client else None) or "unknown"
+
+
+def _admission_lane(request: Request) -> str:
+    lane = (request.headers.get("x-xsarena-lane") or "").strip().lower()
+    if lane in LANES:
+        return lane
+    default = CONFIG.get("admission", {}).get("default_lane", "interactive")
+    return default if default in LANES else LANES[0]
+
+
+async def _admit(request: Request, request_id: str) -> None:
+    """Wait for an active slot; 503 with Retry-After if the queue is full or too slow."""
+    admission_cfg = CONFIG.get("admission", {})
+    admission_queue.configure(
+        int(CONFIG.get("max_channels", 200)),
+        int(admission_cfg.get("max_queue", 1000)),
+    )
+    try:
+        await admission_queue.acquire(
+            request_id,
+            _admission_peer(request),
+            _admission_lane(request),
+            timeout=float(admission_cfg.get("max_wait_seconds", 30)),
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=e.reason,
+            headers={"Retry-After": str(int(math.ceil(e.retry_after)))},
+        )
+
+
 def load_config():
     """Load configuration from .xsarena/config.yml."""
     global CONFIG
@@ -55,92 +131,208 @@ def load_config():
         CONFIG = {}
 
 
-def load_model_map():
-    """Load model mappings from models.json."""
-    global MODEL_NAME_TO_ID_MAP
-    try:
-        with open("models.json", "r", encoding="utf-8") as f:
-            content = f.read()
-            raw_data = json.loads(content) if content.strip() else {}
-
-            # Ensure MODEL_NAME_TO_ID_MAP is dict; if a list is read, convert to {name: name}
-            if isinstance(raw_data, list):
-                MODEL_NAME_TO_ID_MAP = {name: name for name in raw_data}
-            elif isinstance(raw_data, dict):
-                MODEL_NAME_TO_ID_MAP = raw_data
-            else:
-                MODEL_NAME_TO_ID_MAP = {}
-
-        logger.info(
-            f"Successfully loaded {len(MODEL_NAME_TO_ID_MAP)} models from 'models.json'."
-        )
-    except FileNotFoundError:
-        logger.warning("models.json not found. Using empty model list.")
-        MODEL_NAME_TO_ID_MAP = {}
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse 'models.json': {e}. Using empty model list.")
-        MODEL_NAME_TO_ID_MAP = {}
-    except Exception as e:
-        logger.error(f"Failed to load 'models.json': {e}. Using empty model list.")
-        MODEL_NAME_TO_ID_MAP = {}
+_DEFAULT_CLOUDFLARE_PATTERNS = (
+    "Just a moment...",
+    "Enable JavaScript and cookies to continue",
+    "Checking your browser before accessing",
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _cloudflare_regex(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    """All configured Cloudflare markers as one alternation, compiled once per config."""
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+def _is_cloudflare_page(data: str) -> bool:
+    patterns = tuple(CONFIG.get("cloudflare_patterns", _DEFAULT_CLOUDFLARE_PATTERNS))
+    return bool(patterns) and _cloudflare_regex(patterns).search(data) is not None
+
+
+class _ResponseAggregator:
+    """Non-streaming response body, built incrementally and capped at `max_chars`."""
 
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._buf = io.StringIO()
+        self.size = 0
 
-def load_model_endpoint_map():
-    """Load model endpoint mappings from model_endpoint_map.json."""
-    global MODEL_ENDPOINT_MAP
+    def add(self, text: str) -> bool:
+        """Append `text`; False once the cap is reached (the rest is dropped)."""
+        room = self.max_chars - self.size
+        if self.max_chars > 0 and len(text) > room:
+            self._buf.write(text[: max(0, room)])
+            self.size = self.max_chars
+            return False
+        self._buf.write(text)
+        self.size += len(text)
+        return True
+
+    def reset(self) -> None:
+        self._buf = io.StringIO()
+        self.size = 0
+
+    def text(self) -> str:
+        return self._buf.getvalue()
+
+
+async def _response_events(
+    request_id: str,
+    queue: ResponseChannel,
+    browser_ws,
+    lmarena_payload: Dict[str, Any],
+    REFRESHING_BY_REQUEST,
+    idle_after: Optional[Callable[[], Optional[float]]] = None,
+    recover: Optional[Callable[[str], Awaitable[Optional[Tuple[Any, Dict[str, Any]]]]]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Turn the userscript's messages for one request into response events.
+
+    Both the SSE writer and the JSON aggregator consume this, so Cloudflare
+    handling, the [DONE]/error sentinels and timeouts live in one place.
+    Events are ``(kind, value)`` pairs:
+
+    - ``text`` / ``image``: a piece of the completion (image markdown is kept apart)
+    - ``restart``: a Cloudflare refresh resent the request; output so far is stale
+    - ``idle``: nothing arrived within ``idle_after()`` seconds (lets writers flush)
+    - ``done``: the completion finished
+    - ``cloudflare`` / ``timeout``: the request gave up (message as value); last event
+
+    When the userscript disconnects, ``recover`` is awaited for a new
+    connection and the payload it was sent (the stream then simply goes on);
+    if it gives up, or an error is reported by the browser, HTTPException(502)
+    is raised.
+    """
+    entry = recovery_journal.get(request_id)
+    timeout_seconds = CONFIG.get("stream_response_timeout_seconds", 360)
+    while True:
+        idle = idle_after() if idle_after else None
+        wait = timeout_seconds if idle is None else min(idle, timeout_seconds)
+        try:
+            data = await asyncio.wait_for(queue.get(), timeout=wait)
+        except asyncio.TimeoutError:
+            if idle is not None and idle < timeout_seconds:
+                yield "idle", None
+                continue
+            logger.error(f"Timeout waiting for response for request_id: {request_id}")
+            yield "timeout", f"Response timeout after {timeout_seconds} seconds"
+            return
+
+        if isinstance(data, dict) and DISCONNECTED in data:
+            yield "idle", None  # flush held text before waiting
+            recovered = await recover(data[DISCONNECTED]) if recover else None
+            if recovered is None:
+                raise HTTPException(status_code=502, detail="Browser disconnected.")
+            browser_ws, lmarena_payload = recovered
+            continue
+        if isinstance(data, dict) and "error" in data:
+            logger.error(f"Error from browser: {data['error']}")
+            raise HTTPException(status_code=502, detail=data["error"])
+        if data == "[DONE]":
+            # Reset per-request refresh flag after successful completion
+            REFRESHING_BY_REQUEST.pop(request_id, None)
+            yield "done", None
+            return
+        if not isinstance(data, str):
+            if entry is not None:
+                entry.add_output(str(data))
+            yield "text", str(data)
+            continue
+
+        if _is_cloudflare_page(data):
+            max_refresh_attempts = CONFIG.get("max_refresh_attempts", 1)
+            current_refresh_attempts = REFRESHING_BY_REQUEST.get(request_id, 0)
+            if current_refresh_attempts >= max_refresh_attempts:
+                yield "cloudflare", (
+                    f"Cloudflare security challenge still present after {max_refresh_attempts} "
+                    "refresh attempts. Please manually refresh the browser."
+                )
+                return
+            logger.info(
+                "Detected Cloudflare challenge, sending refresh command "
+                f"(attempt {current_refresh_attempts + 1}/{max_refresh_attempts})"
+            )
+            REFRESHING_BY_REQUEST[request_id] = current_refresh_attempts + 1
+            await browser_ws.send_json({"command": "refresh"})
+            # Wait for a short backoff period, then send the same request again
+            await asyncio.sleep(5.0)
+            await browser_ws.send_json(
+                {"request_id": request_id, "payload": lmarena_payload}
+            )
+            if entry is not None:
+                entry.reset_output()
+            yield "restart", None
+            continue
+
+        if entry is not None:
+            entry.add_output(data)
+        yield ("image" if data.startswith("![Image]") else "text"), data
+
+
+async def _cancel_stream(conn, request_id: str) -> None:
+    """Ask a userscript connection to abort one request's fetch."""
     try:
-        with open("model_endpoint_map.json", "r", encoding="utf-8") as f:
-            content = f.read()
-            MODEL_ENDPOINT_MAP = json.loads(content) if content.strip() else {}
-        logger.info(
-            f"Successfully loaded {len(MODEL_ENDPOINT_MAP)} model endpoint mappings."
-        )
-    except FileNotFoundError:
-        logger.warning("model_endpoint_map.json not found. Using empty map.")
-        MODEL_ENDPOINT_MAP = {}
-    except json.JSONDecodeError as e:
-        logger.error(
-            f"Failed to parse 'model_endpoint_map.json': {e}. Using empty map."
-        )
-        MODEL_ENDPOINT_MAP = {}
+        await conn.send_json({"command": "cancel_stream", "request_id": request_id})
     except Exception as e:
-        logger.error(f"Failed to load 'model_endpoint_map.json': {e}. Using empty map.")
-        MODEL_ENDPOINT_MAP = {}
+        logger.debug(f"Could not send cancel_stream for {request_id}: {e}")
+
+
+async def _sse_writer(
+    events: Callable[..., AsyncIterator[Tuple[str, Any]]],
+    model_name: str,
+    request_id: str,
+    finish_request: Callable[[bool], None],
+) -> AsyncIterator[str]:
+    """Encode response events as OpenAI SSE frames, merging small text deltas."""
+    completed = False
+    encoder = SSEStreamEncoder(model_name, request_id)
+    # Tiny userscript fragments are merged into fewer, larger frames
+    coalescer = DeltaCoalescer(
+        max_chars=int(CONFIG.get("stream_coalesce_chars", 512)),
+        max_delay=float(CONFIG.get("stream_coalesce_ms", 20)) / 1000.0,
+    )
+    stream = events(
+        idle_after=lambda: coalescer.time_until_due() if coalescer.pending else None
+    )
+    try:
+        async for kind, value in stream:
+            if kind == "text":
+                merged = coalescer.add(value)
+                if merged is not None:
+                    yield encoder.delta(merged)
+                continue
+            if coalescer.pending and kind != "restart":
+                # Keep frame order: held text goes out before anything else
+                yield encoder.delta(coalescer.flush())
+            if kind == "image":
+                yield encoder.delta(value)
+            elif kind == "done":
+                yield encoder.finish("stop")
+                completed = True
+            elif kind in ("cloudflare", "timeout"):
+                error_type = "cloudflare_challenge" if kind == "cloudflare" else "timeout"
+                error_chunk = {"error": {"type": error_type, "message": value}}
+                yield f"data: {json.dumps(error_chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+    finally:
+        await stream.aclose()
+        finish_request(completed)
 
 
 async def chat_completions_handler(
     request: Request,
-    browser_ws,
+    pool,
     response_channels,
     REFRESHING_BY_REQUEST,
     cloudflare_verified,
 ):
-    """Handle chat completions requests."""
-    if not browser_ws:
-        raise HTTPException(status_code=503, detail="Userscript client not connected.")
+    """Handle chat completions requests.
 
-    # Check channel limit
-    max_channels = int(CONFIG.get("max_channels", 200))
-    if len(response_channels) >= max_channels:
-        raise HTTPException(status_code=503, detail="Server busy")
-
-    # Rate limiting per peer
-    peer = request.client.host or "unknown"
-    now = time.time()
-    if peer not in PER_PEER:
-        PER_PEER[peer] = deque()
-
-    # Read rate limit config dynamically each call to allow config changes to take effect
-    rate_cfg = CONFIG.get("rate_limit", {"burst": 10, "window_seconds": 10})
-
-    # Prune old timestamps
-    while PER_PEER[peer] and now - PER_PEER[peer][0] > rate_cfg["window_seconds"]:
-        PER_PEER[peer].popleft()
-    # Check if over burst limit
-    if len(PER_PEER[peer]) >= rate_cfg["burst"]:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
-    # Add current timestamp
-    PER_PEER[peer].append(now)
+    `pool` is the websocket ConnectionPool; each request is routed to the
+    least-loaded userscript connection and stays on it until it finishes.
+    """
+    if not pool:
+        raise HTTPException(status_code=503, detail="Userscript client not connected.")
 
     # Check for API key if configured
     api_key = CONFIG.get("api_key")
@@ -157,10 +349,23 @@ async def chat_completions_handler(
     openai_req = await request.json()
     want_stream = bool(openai_req.get("stream"))
     model_name = openai_req.get("model", "unknown")
+    # One snapshot for the whole request, even if the files reload meanwhile
+    models = model_registry.current
+
+    # Rate limiting per client (API key or address) and, where configured, per
+    # model to protect a scarce session; both buckets are spent or neither is
+    limits = [(f"peer:{_admission_peer(request)}", _peer_limit(request))]
+    model_limits = CONFIG.get("rate_limit", {}).get("models") or {}
+    if model_name in model_limits:
+        limits.append(
+            (f"model:{model_name}", limit_from_config(model_limits[model_name]))
+        )
+    _enforce_rate_limit(*limits)
 
     # Get session and message IDs - first try job-specific IDs from payload
     session_id = None
     message_id = None
+    chosen_endpoint = None
 
     # Check if the payload contains specific bridge IDs (from RunSpecV2)
     if "bridge_session_id" in openai_req:
@@ -171,13 +376,10 @@ async def chat_completions_handler(
     # If no job-specific IDs, then try model endpoint mapping
     if not session_id or not message_id:
         # Check if model has specific endpoint mapping
-        if model_name in MODEL_ENDPOINT_MAP:
-            endpoint_config = MODEL_ENDPOINT_MAP[model_name]
-            if isinstance(endpoint_config, list):
-                # If it's a list, pick randomly
-                import random
-
-                endpoint_config = random.choice(endpoint_config)
+        if model_name in models.endpoint_map:
+            # Several endpoints per model: take the least-loaded one
+            endpoint_config = endpoint_balancer.choose(models.endpoint_map[model_name])
+            chosen_endpoint = endpoint_config
 
             if isinstance(endpoint_config, dict):
                 session_id = endpoint_config.get("session_id")
@@ -202,7 +404,46 @@ async def chat_completions_handler(
         )
 
     request_id = str(uuid.uuid4())
-    response_channels[request_id] = asyncio.Queue()
+    # Queue for one of the `max_channels` active slots instead of failing fast
+    await _admit(request, request_id)
+    # Pin the request to the least-loaded userscript connection for its lifetime
+    required_capabilities = openai_req.get("bridge_capabilities") or ()
+    browser_ws = pool.acquire(request_id, required_capabilities)
+    if browser_ws is None:
+        admission_queue.release(request_id)
+        raise HTTPException(
+            status_code=503,
+            detail="No userscript connection offers the requested capabilities.",
+        )
+    endpoint_balancer.start(request_id, session_id, message_id)
+
+    def finish_request(ok: bool) -> None:
+        """Release everything the request holds; safe to call from every exit path."""
+        REFRESHING_BY_REQUEST.pop(request_id, None)
+        response_channels.pop(request_id, None)
+        # Ended before the userscript did (failed, cut short or client gone):
+        # stop its fetch, which may be paused, before the slot counts as free
+        owner = pool.owner_of(request_id)
+        if owner is not None and not (channel.finished or channel.cancelled):
+            channel.cancelled = True
+            asyncio.ensure_future(_cancel_stream(owner, request_id))
+        pool.release(request_id)
+        admission_queue.release(request_id)
+        endpoint_balancer.finish(request_id, ok=ok)
+        recovery_journal.forget(request_id)
+
+    async def signal_userscript(command: str) -> None:
+        # After a reconnect the request lives on another connection
+        conn = pool.owner_of(request_id) or browser_ws
+        await conn.send_json({"command": command, "request_id": request_id})
+
+    # Bounded buffer: a slow client pauses this stream instead of growing memory
+    channel = response_channels.open(
+        request_id,
+        CONFIG,
+        signal=signal_userscript,
+        on_reap=lambda: finish_request(False),
+    )
 
     try:
         # Initialize per-request refresh state
@@ -214,8 +455,6 @@ async def chat_completions_handler(
             for message in openai_req["messages"]:
                 if isinstance(message.get("content"), str):
                     # Simple check for data URLs that might be images
-                    import re
-
                     data_url_pattern = r"data:image/[^;]+;base64,([a-zA-Z0-9+/=]+)"
                     matches = re.findall(data_url_pattern, message["content"])
                     if matches and CONFIG.get("file_bed_upload_url"):
@@ -230,248 +469,150 @@ async def chat_completions_handler(
             session_id,
             message_id,
             model_name,
-            MODEL_NAME_TO_ID_MAP,
-            MODEL_ENDPOINT_MAP,
+            models.name_to_id,
+            models.endpoint_map,
             CONFIG,
+            endpoint_config=chosen_endpoint,
+        )
+        # Journal before sending, so a disconnect right after can be recovered
+        recovery_journal.record(
+            request_id, openai_req, lmarena_payload, required_capabilities
         )
         await browser_ws.send_json(
             {"request_id": request_id, "payload": lmarena_payload}
         )
 
-        # Reset Cloudflare verification flag for this request
-        cloudflare_verified = False
-
-        async def stream_generator():
-            global cloudflare_verified, REFRESHING_BY_REQUEST
-            try:
-                queue = response_channels[request_id]
-                timeout_seconds = CONFIG.get("stream_response_timeout_seconds", 360)
-
-                while True:
-                    try:
-                        # Use timeout for queue.get to handle timeouts gracefully
-                        data = await asyncio.wait_for(
-                            queue.get(), timeout=timeout_seconds
-                        )
-
-                        # Check for Cloudflare detection
-                        if isinstance(data, str):
-                            # Check if this looks like a Cloudflare page using configurable patterns
-                            cloudflare_patterns = CONFIG.get(
-                                "cloudflare_patterns",
-                                [
-                                    "Just a moment...",
-                                    "Enable JavaScript and cookies to continue",
-                                    "Checking your browser before accessing",
-                                ],
-                            )
-                            if any(pattern in data for pattern in cloudflare_patterns):
-                                max_refresh_attempts = CONFIG.get(
-                                    "max_refresh_attempts", 1
-                                )
-                                current_refresh_attempts = REFRESHING_BY_REQUEST.get(
-                                    request_id, 0
-                                )
-                                if current_refresh_attempts < max_refresh_attempts:
-                                    # First time seeing Cloudflare, trigger refresh
-                                    logger.info(
-                                        f"Detected Cloudflare challenge, sending refresh command (attempt {current_refresh_attempts + 1}/{max_refresh_attempts})"
-                                    )
-                                    REFRESHING_BY_REQUEST[request_id] = (
-                                        current_refresh_attempts + 1
-                                    )
-                                    await browser_ws.send_json({"command": "refresh"})
-                                    # Wait for a short backoff period before retrying
-                                    await asyncio.sleep(5.0)  # 5 second backoff
-                                    # Retry by sending the same request again
-                                    await browser_ws.send_json(
-                                        {
-                                            "request_id": request_id,
-                                            "payload": lmarena_payload,
-                                        }
-                                    )
-                                    continue  # Continue to wait for response again
-
-                                else:
-                                    # Already tried refreshing up to max attempts, return error
-                                    error_chunk = {
-                                        "error": {
-                                            "type": "cloudflare_challenge",
-                                            "message": f"Cloudflare security challenge still present after {max_refresh_attempts} refresh attempts. Please manually refresh the browser.",
-                                        }
-                                    }
-                                    yield f"data: {json.dumps(error_chunk)}\n\n"
-                                    yield "data: [DONE]\n\n"
-                                    break
-
-                        if isinstance(data, dict) and "error" in data:
-                            logger.error(f"Error from browser: {data['error']}")
-                            raise HTTPException(status_code=502, detail=data["error"])
-                        if data == "[DONE]":
-                            # Check if we need to add content filter explanation in the final chunk
-                            from .formatters import format_openai_finish_chunk
-
-                            yield format_openai_finish_chunk(
-                                model_name, request_id, reason="stop"
-                            )
-                            # Reset per-request refresh flag after successful completion
-                            REFRESHING_BY_REQUEST.pop(request_id, None)
-                            break
-
-                        # Handle image content for image models
-                        if isinstance(data, str) and data.startswith("![Image]"):
-                            # This is an image markdown, format as appropriate
-                            from .formatters import format_openai_chunk
-
-                            yield format_openai_chunk(data, model_name, request_id)
-                        else:
-                            yield format_openai_chunk(data, model_name, request_id)
-                    except asyncio.TimeoutError:
-                        logger.error(
-                            f"Timeout waiting for response for request_id: {request_id}"
-                        )
-                        error_chunk = {
-                            "error": {
-                                "type": "timeout",
-                                "message": f"Response timeout after {timeout_seconds} seconds",
-                            }
-                        }
-                        yield f"data: {json.dumps(error_chunk)}\n\n"
-                        yield "data: [DONE]\n\n"
-                        break
-            finally:
-                # Reset per-request refresh flag in all exit paths to prevent getting stuck
-                REFRESHING_BY_REQUEST.pop(request_id, None)
-                if request_id in response_channels:
-                    del response_channels[request_id]
+        async def recover(conn_id: str):
+            """Wait for a userscript to (re)connect and send this request to it again."""
+            cfg = CONFIG.get("recovery", {})
+            grace = float(cfg.get("grace_seconds", 30))
+            entry = recovery_journal.get(request_id)
+            if entry is None:
+                return None
+            if grace <= 0 or entry.recoveries >= int(cfg.get("max_attempts", 3)):
+                recovery_journal.give_up(entry)
+                return None
+            logger.warning(
+                f"Userscript '{conn_id}' dropped request {request_id}; "
+                f"waiting up to {grace:g}s for a connection"
+            )
+            conn = await pool.acquire_wait(request_id, entry.required, grace)
+            if conn is None:
+                recovery_journal.give_up(entry)
+                return None
+            payload = entry.payload
+            if entry.chars:
+                # Text already went to the client: ask for the rest of it
+                payload = await convert_openai_to_lmarena_payload(
+                    continuation_request(
+                        entry.openai_req,
+                        entry.output(),
+                        cfg.get("continue_prompt", CONTINUE_PROMPT),
+                    ),
+                    session_id,
+                    message_id,
+                    model_name,
+                    models.name_to_id,
+                    models.endpoint_map,
+                    CONFIG,
+                    endpoint_config=chosen_endpoint,
+                )
+            # The old tab may have been told to pause; the new one never was
+            channel.paused = False
+            await conn.send_json({"request_id": request_id, "payload": payload})
+            recovery_journal.recovered(entry)
+            logger.info(
+                f"Request {request_id} sent again on '{conn.id}' "
+                f"after {entry.chars} streamed chars"
+            )
+            return conn, payload
+
+        def events(idle_after=None):
+            return _response_events(
+                request_id,
+                channel,
+                browser_ws,
+                lmarena_payload,
+                REFRESHING_BY_REQUEST,
+                idle_after=idle_after,
+                recover=recover,
+            )
 
         if want_stream:
-            return StreamingResponse(stream_generator(), media_type="text/event-stream")
-        else:
-            # Aggregate into a single JSON response (OpenAI-style)
-            try:
-                queue = response_channels[request_id]
-                timeout_seconds = CONFIG.get("stream_response_timeout_seconds", 360)
-                content_parts = []
-
-                while True:
-                    try:
-                        data = await asyncio.wait_for(
-                            queue.get(), timeout=timeout_seconds
-                        )
+            return StreamingResponse(
+                _sse_writer(events, model_name, request_id, finish_request),
+                media_type="text/event-stream",
+            )
 
-                        # Check for Cloudflare detection
-                        if isinstance(data, str):
-                            # Check if this looks like a Cloudflare page using configurable patterns
-                            cloudflare_patterns = CONFIG.get(
-                                "cloudflare_patterns",
-                                [
-                                    "Just a moment...",
-                                    "Enable JavaScript and cookies to continue",
-                                    "Checking your browser before accessing",
-                                ],
-                            )
-                            if any(pattern in data for pattern in cloudflare_patterns):
-                                max_refresh_attempts = CONFIG.get(
-                                    "max_refresh_attempts", 1
-                                )
-                                current_refresh_attempts = REFRESHING_BY_REQUEST.get(
-                                    request_id, 0
-                                )
-                                if current_refresh_attempts < max_refresh_attempts:
-                                    # First time seeing Cloudflare, trigger refresh
-                                    logger.info(
-                                        f"Detected Cloudflare challenge, sending refresh command (attempt {current_refresh_attempts + 1}/{max_refresh_attempts})"
-                                    )
-                                    REFRESHING_BY_REQUEST[request_id] = (
-                                        current_refresh_attempts + 1
-                                    )
-                                    await browser_ws.send_json({"command": "refresh"})
-                                    # Wait for a short backoff period before retrying
-                                    await asyncio.sleep(5.0)  # 5 second backoff
-                                    # Retry by sending the same request again
-                                    await browser_ws.send_json(
-                                        {
-                                            "request_id": request_id,
-                                            "payload": lmarena_payload,
-                                        }
-                                    )
-                                    # Clear the content parts and continue waiting for the new response
-                                    content_parts = []
-                                    continue  # Continue to wait for response again
-                                else:
-                                    # Already tried refreshing up to max attempts, return error
-                                    raise HTTPException(
-                                        status_code=503,
-                                        detail=f"Cloudflare security challenge still present after {max_refresh_attempts} refresh attempts. Please manually refresh the browser.",
-                                    )
-
-                        if isinstance(data, dict) and "error" in data:
-                            logger.error(f"Error from browser: {data['error']}")
-                            raise HTTPException(status_code=502, detail=data["error"])
-                        if data == "[DONE]":
-                            # Reset per-request refresh flag after successful completion
-                            REFRESHING_BY_REQUEST.pop(request_id, None)
+        # Aggregate into a single JSON response (OpenAI-style)
+        ok = False
+        try:
+            body = _ResponseAggregator(int(CONFIG.get("max_response_chars", 2_000_000)))
+            finish_reason = "stop"
+            stream = events()
+            try:
+                async for kind, value in stream:
+                    if kind in ("text", "image"):
+                        if not body.add(value):
+                            finish_reason = "length"
                             break
-                        content_parts.append(str(data))
-                    except asyncio.TimeoutError:
-                        logger.error(
-                            f"Timeout waiting for response for request_id: {request_id}"
-                        )
-                        raise HTTPException(
-                            status_code=408,
-                            detail=f"Response timeout after {timeout_seconds} seconds",
-                        )
-
-                content = "".join(content_parts)
-
-                # Check if this looks like a content filter response
-                finish_reason = "stop"
-                if any(
-                    phrase in content.lower()
-                    for phrase in [
-                        "content filter",
-                        "filtered",
-                        "inappropriate",
-                        "not allowed",
-                    ]
-                ):
-                    finish_reason = "content_filter"
-                    # Add explanation for content filter
-                    content += "\n\nResponse was truncated (filter/limit). Consider reducing length or simplifying."
-
-                # Create full OpenAI ChatCompletion response
-                response = {
-                    "id": request_id,
-                    "object": "chat.completion",
-                    "created": int(time.time()),
-                    "model": model_name,
-                    "choices": [
-                        {
-                            "index": 0,
-                            "message": {"role": "assistant", "content": content},
-                            "finish_reason": finish_reason,
-                        }
-                    ],
-                    "usage": {
-                        "prompt_tokens": 0,  # Not calculated in this implementation
-                        "completion_tokens": 0,  # Not calculated in this implementation
-                        "total_tokens": 0,  # Not calculated in this implementation
-                    },
-                }
-                return JSONResponse(response)
+                    elif kind == "restart":
+                        # Cloudflare refresh resent the request: start over
+                        body.reset()
+                    elif kind == "cloudflare":
+                        raise HTTPException(status_code=503, detail=value)
+                    elif kind == "timeout":
+                        raise HTTPException(status_code=408, detail=value)
             finally:
-                # Reset per-request refresh flag in all exit paths to prevent getting stuck
-                REFRESHING_BY_REQUEST.pop(request_id, None)
-                if request_id in response_channels:
-                    del response_channels[request_id]
+                await stream.aclose()
+            content = body.text()
+            ok = True
+
+            # Check if this looks like a content filter response
+            if finish_reason == "stop" and any(
+                phrase in content.lower()
+                for phrase in [
+                    "content filter",
+                    "filtered",
+                    "inappropriate",
+                    "not allowed",
+                ]
+            ):
+                finish_reason = "content_filter"
+                # Add explanation for content filter
+                content += (
+                    "\n\nResponse was truncated (filter/limit). "
+                    "Consider reducing length or simplifying."
+                )
+
+            # Create full OpenAI ChatCompletion response
+            response = {
+                "id": request_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model_name,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,  # Not calculated in this implementation
+                    "completion_tokens": 0,  # Not calculated in this implementation
+                    "total_tokens": 0,  # Not calculated in this implementation
+                },
+            }
+            return JSONResponse(response)
+        finally:
+            finish_request(ok)
     except HTTPException:
+        finish_request(False)
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        if request_id in response_channels:
-            del response_channels[request_id]
-        REFRESHING_BY_REQUEST.pop(request_id, None)
+        finish_request(False)
         logger.error(f"Error processing chat completion: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -521,6 +662,7 @@ async def update_available_models_handler(request: Request):
                                 # Save models to models.json
                                 with open("models.json", "w", encoding="utf-8") as f:
                                     json.dump(models_dict, f, indent=2)
+                                model_registry.reload()
                                 logger.info(
                                     f"Updated {len(models_dict)} models from HTML source"
                                 )
@@ -560,6 +702,7 @@ async def update_available_models_handler(request: Request):
                         # Save models to models.json
                         with open("models.json", "w", encoding="utf-8") as f:
                             json.dump(models_dict, f, indent=2)
+                        model_registry.reload()
                         logger.info(
                             f"Updated {len(models_dict)} models from script tag"
                         )
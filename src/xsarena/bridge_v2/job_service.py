@@ -15,11 +15,9 @@ class JobService:
 
     def list_jobs(self) -> List[Dict]:
         """List all jobs with statistics."""
+        # The store returns jobs newest first
         jobs = self.job_manager.list_jobs()
 
-        # Sort by creation time, newest first
-        jobs.sort(key=lambda j: j.created_at, reverse=True)
-
         job_list = []
         for job in jobs:
             # Get job events to calculate stats
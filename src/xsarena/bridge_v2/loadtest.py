@@ -0,0 +1,165 @@
+# src/xsarena/bridge_v2/loadtest.py
+"""Concurrent load generator for an OpenAI-compatible endpoint (the bridge's api_server)."""
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+
+@dataclass
+class RequestSample:
+    """Timing of one load-test request."""
+
+    ok: bool
+    status: Optional[int]
+    latency: float
+    ttft: Optional[float] = None
+    chars: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadTestReport:
+    """All samples of a load-test run plus its wall-clock duration."""
+
+    samples: List[RequestSample] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    concurrency: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        ok = [s for s in self.samples if s.ok]
+        errors: Dict[str, int] = {}
+        for s in self.samples:
+            if not s.ok:
+                label = str(s.status) if s.status else (s.error or "error")
+                errors[label] = errors.get(label, 0) + 1
+        wall = self.wall_seconds or 1e-9
+        return {
+            "requests": len(self.samples),
+            "ok": len(ok),
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "throughput_rps": round(len(ok) / wall, 3),
+            "throughput_chars_per_s": round(sum(s.chars for s in ok) / wall, 1),
+            "latency": _percentiles([s.latency for s in ok]),
+            "ttft": _percentiles([s.ttft for s in ok if s.ttft is not None]),
+        }
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[max(0, math.ceil(p / 100.0 * len(ordered)) - 1)], 3)
+
+    return {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": round(ordered[-1], 3)}
+
+
+async def _sse_events(resp: aiohttp.ClientResponse) -> AsyncIterator[Dict[str, Any]]:
+    """Parsed `data:` events of an SSE response, up to `[DONE]`."""
+    async for raw in resp.content:
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+async def _one_request(
+    session: aiohttp.ClientSession,
+    url: str,
+    payload: Dict[str, Any],
+    headers: Dict[str, str],
+    timeout: float,
+) -> RequestSample:
+    started = time.monotonic()
+    ttft = None
+    chars = 0
+    try:
+        async with session.post(
+            url,
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as resp:
+            if resp.status != 200:
+                await resp.read()
+                return RequestSample(False, resp.status, time.monotonic() - started)
+            if not payload.get("stream"):
+                body = await resp.json()
+                ttft = time.monotonic() - started
+                content = body.get("choices", [{}])[0].get("message", {}).get("content")
+                chars = len(content or "")
+            else:
+                async for event in _sse_events(resp):
+                    if "error" in event:
+                        err = event["error"]
+                        kind = err.get("type") if isinstance(err, dict) else None
+                        return RequestSample(
+                            False,
+                            None,
+                            time.monotonic() - started,
+                            error=str(kind or "stream_error"),
+                        )
+                    delta = (event.get("choices") or [{}])[0].get("delta", {})
+                    text = delta.get("content") or ""
+                    if text and ttft is None:
+                        ttft = time.monotonic() - started
+                    chars += len(text)
+            return RequestSample(True, resp.status, time.monotonic() - started, ttft, chars)
+    except asyncio.TimeoutError:
+        return RequestSample(False, None, time.monotonic() - started, error="timeout")
+    except aiohttp.ClientError as e:
+        return RequestSample(
+            False, None, time.monotonic() - started, error=type(e).__name__
+        )
+
+
+async def run_loadtest(
+    base_url: str = "http://127.0.0.1:5102/v1",
+    requests: int = 50,
+    concurrency: int = 8,
+    model: str = "mock",
+    stream: bool = True,
+    prompt: str = "Write a paragraph about load testing.",
+    api_key: Optional[str] = None,
+    timeout: float = 120.0,
+) -> LoadTestReport:
+    """Send `requests` chat completions with `concurrency` in flight and time them."""
+    url = f"{base_url.rstrip('/')}/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    payload = {
+        "model": model,
+        "stream": stream,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    report = LoadTestReport(concurrency=concurrency)
+    remaining = iter(range(requests))
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        for _ in remaining:
+            report.samples.append(
+                await _one_request(session, url, payload, headers, timeout)
+            )
+
+    connector = aiohttp.TCPConnector(limit=max(1, concurrency))
+    started = time.monotonic()
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(
+            *(worker(session) for _ in range(max(1, min(concurrency, requests))))
+        )
+    report.wall_seconds = time.monotonic() - started
+    return report
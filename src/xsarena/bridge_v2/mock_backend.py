@@ -0,0 +1,305 @@
+# src/xsarena/bridge_v2/mock_backend.py
+"""
+Configurable stand-ins for the userscript and for OpenRouter, for load tests.
+
+`run_mock_userscript` connects to the bridge's /ws like a browser tab and
+streams synthetic completions; `create_mock_openai_app` serves an
+OpenAI-compatible /v1/chat/completions (SSE or JSON) in place of OpenRouter.
+Both draw latency and faults from one `MockProfile`.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+TTFT_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+CLOUDFLARE_PAGE = (
+    "<!DOCTYPE html><html><head><title>Just a moment...</title></head>"
+    "<body>Checking your browser before accessing the site. "
+    "Enable JavaScript and cookies to continue</body></html>"
+)
+
+_PROSE = (
+    "the model writes a steady stream of plausible prose about the subject while "
+    "the bridge forwards each token to the client and the harness measures latency"
+)
+_WORDS = _PROSE.split()
+
+
+@dataclass
+class MockProfile:
+    """Latency and fault knobs shared by the mock userscript and mock OpenRouter."""
+
+    tokens_per_second: float = 40.0
+    response_tokens: int = 200
+    ttft: float = 0.8  # mean seconds to first token
+    ttft_distribution: str = "lognormal"
+    ttft_spread: float = 0.5  # uniform: +/- fraction of ttft; lognormal: sigma
+    jitter: float = 0.2  # +/- fraction applied to every inter-token gap
+    error_rate: float = 0.0  # upstream error instead of a completion
+    rate_limit_rate: float = 0.0  # 429 with Retry-After
+    retry_after: float = 2.0
+    cloudflare_rate: float = 0.0  # Cloudflare challenge page instead of output
+    disconnect_rate: float = 0.0  # drop the connection mid-stream
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.ttft_distribution not in TTFT_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown TTFT distribution '{self.ttft_distribution}' "
+                f"(expected one of {TTFT_DISTRIBUTIONS})"
+            )
+        self.rng = random.Random(self.seed)
+
+    def sample_ttft(self) -> float:
+        mean = max(0.0, self.ttft)
+        if self.ttft_distribution == "uniform":
+            spread = mean * self.ttft_spread
+            return max(0.0, self.rng.uniform(mean - spread, mean + spread))
+        if self.ttft_distribution == "exponential":
+            return self.rng.expovariate(1.0 / mean) if mean else 0.0
+        if self.ttft_distribution == "lognormal":
+            if not mean:
+                return 0.0
+            sigma = self.ttft_spread
+            # Choose mu so the distribution's mean equals `ttft`; the tail stays long
+            return self.rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+        return mean
+
+    def token_gap(self) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        gap = 1.0 / self.tokens_per_second
+        return max(0.0, gap * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    def pick_fault(self) -> Optional[str]:
+        """None for a normal completion, else "error", "429", "cloudflare" or "disconnect"."""
+        roll = self.rng.random()
+        for fault, rate in (
+            ("error", self.error_rate),
+            ("429", self.rate_limit_rate),
+            ("cloudflare", self.cloudflare_rate),
+            ("disconnect", self.disconnect_rate),
+        ):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def tokens(self) -> List[str]:
+        count = max(1, self.response_tokens)
+        return [_WORDS[i % len(_WORDS)] + " " for i in range(count)]
+
+
+# --- Userscript stand-in ----------------------------------------------------
+
+
+async def _serve_request(ws, request_id: str, profile: MockProfile) -> str:
+    """Answer one bridge request; returns the outcome ("ok" or the fault injected)."""
+    fault = profile.pick_fault()
+    await asyncio.sleep(profile.sample_ttft())
+    if fault == "error":
+        await ws.send(
+            json.dumps({"request_id": request_id, "data": {"error": "Mock upstream error"}})
+        )
+        return fault
+    if fault == "429":
+        await ws.send(
+            json.dumps(
+                {
+                    "request_id": request_id,
+                    "data": {"error": "429 Too Many Requests", "status": 429},
+                }
+            )
+        )
+        return fault
+    if fault == "cloudflare":
+        await ws.send(json.dumps({"request_id": request_id, "data": CLOUDFLARE_PAGE}))
+        return fault
+
+    tokens = profile.tokens()
+    cut = len(tokens) // 2 if fault == "disconnect" else None
+    for i, token in enumerate(tokens):
+        if i and cut is not None and i >= cut:
+            await ws.close()
+            return fault
+        await ws.send(json.dumps({"request_id": request_id, "data": token}))
+        await asyncio.sleep(profile.token_gap())
+    await ws.send(json.dumps({"request_id": request_id, "data": "[DONE]"}))
+    return "ok"
+
+
+async def run_mock_userscript(
+    url: str = "ws://127.0.0.1:5102/ws",
+    profile: Optional[MockProfile] = None,
+    conn_id: Optional[str] = None,
+    capabilities: str = "",
+    reconnect_delay: float = 1.0,
+    stop: Optional[asyncio.Event] = None,
+) -> Dict[str, int]:
+    """
+    Act as a userscript tab until `stop` is set (or forever), reconnecting after drops.
+
+    Requests are answered concurrently, like a tab with several fetches open.
+    Returns counts of each outcome served.
+    """
+    import websockets
+
+    profile = profile or MockProfile()
+    stop = stop or asyncio.Event()
+    conn_id = conn_id or f"mock-{uuid.uuid4().hex[:6]}"
+    query = f"?id={conn_id}" + (f"&capabilities={capabilities}" if capabilities else "")
+    outcomes: Dict[str, int] = {}
+
+    def _count(task: "asyncio.Task[str]") -> None:
+        failed = task.cancelled() or task.exception() is not None
+        outcome = "dropped" if failed else task.result()
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    while not stop.is_set():
+        tasks: List["asyncio.Task[str]"] = []
+        try:
+            async with websockets.connect(url + query) as ws:
+                logger.info(f"Mock userscript '{conn_id}' connected to {url}")
+                while not stop.is_set():
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        continue
+                    message = json.loads(raw)
+                    if message.get("command") or not message.get("payload"):
+                        continue
+                    task = asyncio.ensure_future(
+                        _serve_request(ws, message["request_id"], profile)
+                    )
+                    task.add_done_callback(_count)
+                    tasks.append(task)
+                    tasks = [t for t in tasks if not t.done()]
+        except (OSError, websockets.exceptions.ConnectionClosed) as e:
+            logger.info(f"Mock userscript '{conn_id}' disconnected: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+        if not stop.is_set():
+            await asyncio.sleep(reconnect_delay)
+    return outcomes
+
+
+# --- OpenRouter stand-in ----------------------------------------------------
+
+
+def _completion(model: str, content: str) -> Dict[str, Any]:
+    return {
+        "id": f"mock-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+    }
+
+
+def _fault_response(fault: Optional[str], profile: MockProfile) -> Optional[web.Response]:
+    """The canned reply for a fault that answers instead of streaming, if any."""
+    if fault == "error":
+        return web.json_response({"error": {"message": "Mock upstream error"}}, status=500)
+    if fault == "429":
+        return web.json_response(
+            {"error": {"message": "Rate limit exceeded"}},
+            status=429,
+            headers={"Retry-After": f"{profile.retry_after:g}"},
+        )
+    if fault == "cloudflare":
+        return web.Response(text=CLOUDFLARE_PAGE, status=503, content_type="text/html")
+    return None
+
+
+async def _stream_tokens(
+    request: web.Request,
+    model: str,
+    tokens: List[str],
+    cut: Optional[int],
+    profile: MockProfile,
+) -> web.StreamResponse:
+    """SSE-stream `tokens`, dropping the connection at index `cut` if set."""
+    resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await resp.prepare(request)
+    for i, token in enumerate(tokens):
+        if i and cut is not None and i >= cut:
+            if request.transport is not None:
+                request.transport.close()
+            return resp
+        chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": token}}]}
+        await resp.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        await asyncio.sleep(profile.token_gap())
+    await resp.write(b"data: [DONE]\n\n")
+    await resp.write_eof()
+    return resp
+
+
+def create_mock_openai_app(profile: Optional[MockProfile] = None) -> web.Application:
+    """aiohttp app serving an OpenAI-compatible chat API with injected faults."""
+    profile = profile or MockProfile()
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        model = body.get("model", "mock")
+        fault = profile.pick_fault()
+        await asyncio.sleep(profile.sample_ttft())
+        failed = _fault_response(fault, profile)
+        if failed is not None:
+            return failed
+
+        tokens = profile.tokens()
+        cut = len(tokens) // 2 if fault == "disconnect" else None
+        if body.get("stream"):
+            return await _stream_tokens(request, model, tokens, cut, profile)
+        await asyncio.sleep(sum(profile.token_gap() for _ in tokens))
+        if cut is not None and request.transport is not None:
+            request.transport.close()
+        return web.json_response(_completion(model, "".join(tokens)))
+
+    async def models(request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": "mock", "object": "model"}]})
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "ws_connected": True})
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/v1/models", models)
+    app.router.add_get("/health", health)
+    return app
+
+
+async def serve_mock_openai(
+    host: str = "127.0.0.1",
+    port: int = 5199,
+    profile: Optional[MockProfile] = None,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """Serve `create_mock_openai_app` until `stop` is set (or forever)."""
+    runner = web.AppRunner(create_mock_openai_app(profile))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Mock OpenAI-compatible server on http://{host}:{port}/v1")
+    try:
+        await (stop or asyncio.Event()).wait()
+    finally:
+        await runner.cleanup()
+
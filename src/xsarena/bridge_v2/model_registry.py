@@ -0,0 +1,193 @@
+# src/xsarena/bridge_v2/model_registry.py
+"""Parsed models.json / model_endpoint_map.json, hot-reloaded when the files change."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FileSignature = Optional[Tuple[int, int]]  # (mtime_ns, size); None if missing
+
+
+def _signature(path: str) -> FileSignature:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return json.loads(content) if content.strip() else {}
+
+
+def validate_models(raw: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """models.json as {name: id or info dict}; returns (models, names rejected)."""
+    if isinstance(raw, list):
+        raw = {name: name for name in raw if isinstance(name, str)}
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected an object or a list, got {type(raw).__name__}")
+    models: Dict[str, Any] = {}
+    rejected = []
+    for name, value in raw.items():
+        if name and isinstance(value, (str, dict)):
+            models[name] = value
+        else:
+            rejected.append(name)
+    return models, rejected
+
+
+def validate_endpoint_map(raw: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """model_endpoint_map.json as {name: config or [configs]}; returns (map, names rejected)."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected an object, got {type(raw).__name__}")
+    endpoints: Dict[str, Any] = {}
+    rejected = []
+    for name, value in raw.items():
+        if isinstance(value, list):
+            value = [c for c in value if isinstance(c, dict)]
+        if name and (isinstance(value, dict) or (isinstance(value, list) and value)):
+            endpoints[name] = value
+        else:
+            rejected.append(name)
+    return endpoints, rejected
+
+
+class ModelSnapshot:
+    """One consistent, read-only view of both files plus the prebuilt /v1/models body."""
+
+    def __init__(
+        self,
+        name_to_id: Dict[str, Any],
+        endpoint_map: Dict[str, Any],
+        signatures: Dict[str, FileSignature],
+        rejected: Optional[Dict[str, int]] = None,
+        created: int = 0,
+    ):
+        self.name_to_id = name_to_id
+        self.endpoint_map = endpoint_map
+        self.signatures = signatures
+        self.rejected = rejected or {}  # path -> invalid entries skipped
+        self.loaded_at = time.time()
+        self.models_body = json.dumps(
+            {
+                "object": "list",
+                "data": [
+                    {"id": name, "object": "model", "created": created, "owned_by": "user"}
+                    for name in name_to_id
+                ],
+            }
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.models_body).hexdigest()[:20]}"'
+
+    def is_image_model(self, model_name: str) -> bool:
+        info = self.name_to_id.get(model_name)
+        return isinstance(info, dict) and info.get("type") == "image"
+
+
+class ModelRegistry:
+    """
+    The current ModelSnapshot, rebuilt when either file's mtime or size changes.
+
+    A reload parses and validates off to the side and then swaps `current`
+    in one assignment, so a request always sees both maps from the same
+    load. A file that fails to parse keeps its last good contents.
+    """
+
+    def __init__(
+        self,
+        models_path: str = "models.json",
+        endpoint_map_path: str = "model_endpoint_map.json",
+    ):
+        self.models_path = models_path
+        self.endpoint_map_path = endpoint_map_path
+        self.current = ModelSnapshot({}, {}, {})
+        self.reloads = 0
+        self.errors = 0
+
+    def _load(
+        self,
+        path: str,
+        validate: Callable[[Any], Tuple[Dict[str, Any], List[str]]],
+        previous: Dict[str, Any],
+    ) -> Tuple[Dict[str, Any], int]:
+        try:
+            data, rejected = validate(_read_json(path))
+        except FileNotFoundError:
+            logger.warning(f"{path} not found. Using an empty map.")
+            return {}, 0
+        except (json.JSONDecodeError, ValueError, OSError) as e:
+            self.errors += 1
+            logger.error(f"Failed to load '{path}': {e}. Keeping the previous contents.")
+            return previous, 0
+        if rejected:
+            logger.warning(
+                f"Ignoring {len(rejected)} invalid entries in '{path}': {rejected[:5]}"
+            )
+        logger.info(f"Successfully loaded {len(data)} entries from '{path}'.")
+        return data, len(rejected)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read whichever files changed (all of them if `force`); True if anything did."""
+        old = self.current
+        signatures = {
+            self.models_path: _signature(self.models_path),
+            self.endpoint_map_path: _signature(self.endpoint_map_path),
+        }
+        if not force and signatures == old.signatures:
+            return False
+
+        name_to_id, endpoint_map = old.name_to_id, old.endpoint_map
+        rejected = dict(old.rejected)
+        if force or signatures[self.models_path] != old.signatures.get(self.models_path):
+            name_to_id, rejected[self.models_path] = self._load(
+                self.models_path, validate_models, name_to_id
+            )
+        if force or signatures[self.endpoint_map_path] != old.signatures.get(
+            self.endpoint_map_path
+        ):
+            endpoint_map, rejected[self.endpoint_map_path] = self._load(
+                self.endpoint_map_path, validate_endpoint_map, endpoint_map
+            )
+        models_sig = signatures[self.models_path]
+        self.current = ModelSnapshot(
+            name_to_id,
+            endpoint_map,
+            signatures,
+            rejected,
+            # From the file, not the clock, so an unchanged list keeps its ETag
+            created=models_sig[0] // 1_000_000_000 if models_sig else 0,
+        )
+        self.reloads += 1
+        return True
+
+    async def watch_forever(self, get_interval: Callable[[], float]) -> None:
+        """Background task: pick up edits to either file every `get_interval()` seconds."""
+        while True:
+            await asyncio.sleep(max(0.2, get_interval()))
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Model registry reload failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        current = self.current
+        return {
+            "models": len(current.name_to_id),
+            "endpoint_mappings": len(current.endpoint_map),
+            "rejected_entries": sum(current.rejected.values()),
+            "etag": current.etag,
+            "loaded_at": current.loaded_at,
+            "reloads": self.reloads,
+            "errors": self.errors,
+        }
+
+
+model_registry = ModelRegistry()
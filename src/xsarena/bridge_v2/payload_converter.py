@@ -1,6 +1,4 @@
 # src/xsarena/bridge_v2/payload_converter.py
-import json
-import random
 
 
 async def convert_openai_to_lmarena_payload(
@@ -11,6 +9,7 @@ async def convert_openai_to_lmarena_payload(
     model_name_to_id_map: dict,
     model_endpoint_map: dict,
     config: dict,
+    endpoint_config: dict = None,
 ) -> dict:
     messages = openai_data.get("messages", [])
 
@@ -33,21 +32,21 @@ async def convert_openai_to_lmarena_payload(
     battle_target = "a"  # default
 
     # Check if model has specific endpoint mapping with mode/battle_target
-    if model_name in model_endpoint_map:
+    # (the caller passes the endpoint it balanced onto; otherwise take the first)
+    if endpoint_config is None and model_name in model_endpoint_map:
         endpoint_config = model_endpoint_map[model_name]
         if isinstance(endpoint_config, list):
-            # If it's a list, pick randomly
-            endpoint_config = random.choice(endpoint_config)
-
-        if isinstance(endpoint_config, dict):
-            # Prefer mapping values if provided
-            if "mode" in endpoint_config and endpoint_config["mode"] is not None:
-                mode = endpoint_config["mode"]
-            if (
-                "battle_target" in endpoint_config
-                and endpoint_config["battle_target"] is not None
-            ):
-                battle_target = endpoint_config["battle_target"]
+            endpoint_config = endpoint_config[0] if endpoint_config else None
+
+    if isinstance(endpoint_config, dict):
+        # Prefer mapping values if provided
+        if "mode" in endpoint_config and endpoint_config["mode"] is not None:
+            mode = endpoint_config["mode"]
+        if (
+            "battle_target" in endpoint_config
+            and endpoint_config["battle_target"] is not None
+        ):
+            battle_target = endpoint_config["battle_target"]
 
     # If not set by mapping, read from config keys
     if mode == "direct_chat":  # Only update if still default
@@ -140,17 +139,10 @@ async def convert_openai_to_lmarena_payload(
 
     # Apply bypass mode if enabled and for text models
     is_image_request = False
-    # Check if this is an image request based on models.json
-    if model_name in model_name_to_id_map:
-        try:
-            with open("models.json", "r", encoding="utf-8") as f:
-                models_data = json.load(f)
-            model_info = models_data.get(model_name)
-            if model_info and isinstance(model_info, dict):
-                if model_info.get("type") == "image":
-                    is_image_request = True
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
+    # Check if this is an image request (the map is the parsed models.json)
+    model_info = model_name_to_id_map.get(model_name)
+    if isinstance(model_info, dict) and model_info.get("type") == "image":
+        is_image_request = True
 
     # First-message guard: if the first message is an assistant message, insert a fake user message
     if final_messages and final_messages[0]["role"] == "assistant":
@@ -0,0 +1,111 @@
+# src/xsarena/bridge_v2/ratelimit.py
+"""Token-bucket rate limiting for the bridge with a bounded (LRU) bucket table."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """`burst` tokens, refilled continuously at `rate` tokens per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float, cost: float = 1.0) -> float:
+        """Seconds until `cost` tokens are available (0.0 if they are now)."""
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost: float = 1.0) -> None:
+        self.tokens -= cost
+
+
+def limit_from_config(cfg: Optional[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+    """(rate per second, burst) from a `{burst, window_seconds}` mapping, or None."""
+    if not cfg:
+        return None
+    burst = float(cfg.get("burst", 10))
+    window = float(cfg.get("window_seconds", 10))
+    if burst <= 0:
+        return None
+    return (burst / window if window > 0 else float("inf")), burst
+
+
+class RateLimiter:
+    """
+    Named token buckets, at most `max_entries` of them.
+
+    The least recently used bucket is dropped when the table is full; a
+    dropped bucket comes back full, which only ever errs towards admitting
+    an idle client. Every check is O(1).
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.evicted = 0
+        self.limited = 0
+
+    def _bucket(self, key: str, rate: float, burst: float, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst, now)
+            self._buckets[key] = bucket
+            while len(self._buckets) > max(1, self.max_entries):
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._buckets.move_to_end(key)
+            if (bucket.rate, bucket.burst) != (rate, burst):
+                # Limits changed in config: keep the fill level, within the new burst
+                bucket._refill(now)
+                bucket.rate, bucket.burst = rate, burst
+                bucket.tokens = min(bucket.tokens, burst)
+        return bucket
+
+    def check(self, *limits: Tuple[str, Optional[Tuple[float, float]]]) -> float:
+        """
+        Spend one token from each `(key, (rate, burst))` bucket, all or nothing.
+
+        Returns 0.0 when the request is allowed, otherwise the seconds until
+        every bucket involved could admit it (the Retry-After).
+        """
+        now = time.monotonic()
+        buckets = [
+            self._bucket(key, limit[0], limit[1], now)
+            for key, limit in limits
+            if limit is not None
+        ]
+        wait = max((b.wait_time(now) for b in buckets), default=0.0)
+        if wait > 0:
+            self.limited += 1
+            return wait
+        for bucket in buckets:
+            bucket.take()
+        return 0.0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "buckets": len(self._buckets),
+            "max_buckets": self.max_entries,
+            "evicted": self.evicted,
+            "limited": self.limited,
+        }
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,139 @@
+# src/xsarena/bridge_v2/recovery.py
+"""Journal of in-flight bridge requests, so they survive a userscript reconnect."""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+DISCONNECTED = "disconnected"  # key of the channel message sent when a tab goes away
+
+CONTINUE_PROMPT = (
+    "Your previous reply was cut off by a connection drop. Continue exactly from "
+    "where it stopped; do not repeat anything or restart; no preamble."
+)
+
+
+class JournalEntry:
+    """What is needed to dispatch a request again, plus the output it already produced."""
+
+    __slots__ = (
+        "request_id",
+        "openai_req",
+        "payload",
+        "required",
+        "_chunks",
+        "chars",
+        "recoveries",
+        "orphaned_at",
+    )
+
+    def __init__(
+        self,
+        request_id: str,
+        openai_req: Dict[str, Any],
+        payload: Dict[str, Any],
+        required: Iterable[str] = (),
+    ):
+        self.request_id = request_id
+        self.openai_req = openai_req
+        self.payload = payload
+        self.required: Set[str] = set(required)
+        self._chunks: List[str] = []
+        self.chars = 0
+        self.recoveries = 0
+        self.orphaned_at: Optional[float] = None
+
+    def add_output(self, text: str) -> None:
+        self._chunks.append(text)
+        self.chars += len(text)
+
+    def reset_output(self) -> None:
+        self._chunks.clear()
+        self.chars = 0
+
+    def output(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+
+def continuation_request(
+    openai_req: Dict[str, Any], partial: str, prompt: str = CONTINUE_PROMPT
+) -> Dict[str, Any]:
+    """`openai_req` extended with the partial reply and a request to carry on from it."""
+    resumed = dict(openai_req)
+    resumed["messages"] = list(openai_req.get("messages") or []) + [
+        {"role": "assistant", "content": partial},
+        {"role": "user", "content": prompt},
+    ]
+    return resumed
+
+
+class RecoveryJournal:
+    """
+    request_id -> JournalEntry for every request dispatched to a userscript.
+
+    When a tab disconnects, its requests are orphaned rather than failed.
+    The handler waiting on each one then waits up to a grace period for a
+    suitable connection and sends the request again: unchanged if nothing
+    was streamed yet, otherwise as a continuation of the text already sent.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, JournalEntry] = {}
+        self.redispatched = 0
+        self.resumed = 0
+        self.lost = 0
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._entries
+
+    def get(self, request_id: str) -> Optional[JournalEntry]:
+        return self._entries.get(request_id)
+
+    def record(
+        self,
+        request_id: str,
+        openai_req: Dict[str, Any],
+        payload: Dict[str, Any],
+        required: Iterable[str] = (),
+    ) -> JournalEntry:
+        entry = JournalEntry(request_id, openai_req, payload, required)
+        self._entries[request_id] = entry
+        return entry
+
+    def orphan(self, request_id: str) -> None:
+        entry = self._entries.get(request_id)
+        if entry is not None and entry.orphaned_at is None:
+            entry.orphaned_at = time.monotonic()
+
+    def recovered(self, entry: JournalEntry) -> None:
+        entry.orphaned_at = None
+        entry.recoveries += 1
+        if entry.chars:
+            self.resumed += 1
+        else:
+            self.redispatched += 1
+
+    def give_up(self, entry: JournalEntry) -> None:
+        entry.orphaned_at = None
+        self.lost += 1
+
+    def forget(self, request_id: str) -> None:
+        self._entries.pop(request_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        orphaned = [
+            e.orphaned_at for e in self._entries.values() if e.orphaned_at is not None
+        ]
+        return {
+            "inflight": len(self._entries),
+            "orphaned": len(orphaned),
+            "oldest_orphan": round(now - min(orphaned), 1) if orphaned else 0.0,
+            "redispatched": self.redispatched,
+            "resumed": self.resumed,
+            "lost": self.lost,
+        }
+
+
+recovery_journal = RecoveryJournal()
@@ -7,16 +7,160 @@ import queue
 import sys
 import threading
 import time
+import uuid
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from .channels import ChannelRegistry
+from .recovery import DISCONNECTED, recovery_journal
+
 logger = logging.getLogger(__name__)
 
+
+class BrowserConnection:
+    """One connected userscript (browser tab)."""
+
+    def __init__(
+        self, conn_id: str, websocket: WebSocket, capabilities: Iterable[str] = ()
+    ):
+        self.id = conn_id
+        self.websocket = websocket
+        self.capabilities: Set[str] = set(capabilities)
+        self.inflight: Set[str] = set()
+        self.connected_at = datetime.now()
+        self.total_requests = 0
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        await self.websocket.send_json(data)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "capabilities": sorted(self.capabilities),
+            "inflight": len(self.inflight),
+            "total_requests": self.total_requests,
+            "connected_at": self.connected_at.isoformat(),
+        }
+
+
+class ConnectionPool:
+    """
+    Userscript connections with least-loaded routing.
+
+    Each request is pinned to the connection it was sent on until it is
+    released, so all of its stream comes back through that tab and a
+    disconnect only affects the requests that connection owned.
+    """
+
+    def __init__(self):
+        self.connections: Dict[str, BrowserConnection] = {}
+        self._owner: Dict[str, str] = {}  # request_id -> connection id
+        self._waiters: List["asyncio.Future[None]"] = []
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def __bool__(self) -> bool:
+        return bool(self.connections)
+
+    def add(self, conn: BrowserConnection) -> Optional[BrowserConnection]:
+        """Register a connection; returns the one it replaced (same id), if any."""
+        old = self.connections.get(conn.id)
+        self.connections[conn.id] = conn
+        self.wake()
+        return old
+
+    def wake(self) -> None:
+        """Let requests waiting in `acquire_wait` look at the connections again."""
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def remove(self, conn: BrowserConnection) -> List[str]:
+        """Drop a connection (if still current) and return the request ids it owned."""
+        if self.connections.get(conn.id) is conn:
+            del self.connections[conn.id]
+        owned = list(conn.inflight)
+        for request_id in owned:
+            if self._owner.get(request_id) == conn.id:
+                del self._owner[request_id]
+        conn.inflight.clear()
+        return owned
+
+    def acquire(
+        self, request_id: str, required: Iterable[str] = ()
+    ) -> Optional[BrowserConnection]:
+        """Pin `request_id` to the least-loaded connection offering `required` capabilities."""
+        need = set(required)
+        best: Optional[BrowserConnection] = None
+        for conn in self.connections.values():
+            if not need <= conn.capabilities:
+                continue
+            if best is None or (len(conn.inflight), conn.total_requests) < (
+                len(best.inflight),
+                best.total_requests,
+            ):
+                best = conn
+        if best is not None:
+            best.inflight.add(request_id)
+            best.total_requests += 1
+            self._owner[request_id] = best.id
+        return best
+
+    async def acquire_wait(
+        self, request_id: str, required: Iterable[str] = (), timeout: float = 0.0
+    ) -> Optional[BrowserConnection]:
+        """`acquire`, waiting up to `timeout` seconds for a suitable connection to appear."""
+        deadline = time.monotonic() + timeout
+        while True:
+            conn = self.acquire(request_id, required)
+            remaining = deadline - time.monotonic()
+            if conn is not None or remaining <= 0:
+                return conn
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def release(self, request_id: str) -> None:
+        """Unpin a finished request."""
+        conn_id = self._owner.pop(request_id, None)
+        conn = self.connections.get(conn_id) if conn_id else None
+        if conn is not None:
+            conn.inflight.discard(request_id)
+
+    def owner_of(self, request_id: str) -> Optional[BrowserConnection]:
+        conn_id = self._owner.get(request_id)
+        return self.connections.get(conn_id) if conn_id else None
+
+    def least_loaded(self) -> Optional[BrowserConnection]:
+        """Connection to use for commands that are not tied to a request."""
+        if not self.connections:
+            return None
+        return min(self.connections.values(), key=lambda c: len(c.inflight))
+
+    async def broadcast(self, data: Dict[str, Any]) -> None:
+        for conn in list(self.connections.values()):
+            try:
+                await conn.send_json(data)
+            except Exception as e:
+                logger.warning(f"Could not send to userscript {conn.id}: {e}")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [conn.snapshot() for conn in self.connections.values()]
+
+
 # Global variables for WebSocket state
-browser_ws: WebSocket | None = None
-response_channels: Dict[str, asyncio.Queue] = {}
+pool = ConnectionPool()
+response_channels = ChannelRegistry()
 last_activity_time = datetime.now()
 cloudflare_verified = False  # Track Cloudflare verification status per request
 REFRESHING_BY_REQUEST: Dict[
@@ -28,32 +172,48 @@ idle_restart_thread = None
 idle_restart_stop_event = None
 
 
+def _parse_capabilities(raw: Any) -> Set[str]:
+    if isinstance(raw, str):
+        return {c.strip() for c in raw.split(",") if c.strip()}
+    if isinstance(raw, dict):
+        return {str(k) for k, v in raw.items() if v}
+    if isinstance(raw, (list, tuple, set)):
+        return {str(c) for c in raw}
+    return set()
+
+
 async def websocket_endpoint(websocket: WebSocket, CONFIG):
-    """WebSocket endpoint to handle connections from the userscript."""
-    global browser_ws, REFRESHING_BY_REQUEST
-    await websocket.accept()
-    if browser_ws:
-        logger.warning("New userscript connection received, replacing the old one.")
-    browser_ws = websocket
-    logger.info("✅ Userscript connected via WebSocket.")
+    """WebSocket endpoint to handle connections from the userscript.
 
-    # Reset Cloudflare verification flag and refresh status on new connection
+    Several userscripts (browser tabs) may be connected at once. A connection
+    is identified by the `id` query parameter (or a generated one) and may
+    declare `capabilities` (comma-separated) in the query string or in a
+    `hello` command. A new connection only replaces an existing one with the
+    same id.
+    """
     global cloudflare_verified
+    await websocket.accept()
+    params = websocket.query_params
+    conn = BrowserConnection(
+        params.get("id") or uuid.uuid4().hex[:8],
+        websocket,
+        _parse_capabilities(params.get("capabilities", "")),
+    )
+    replaced = pool.add(conn)
+    if replaced is not None:
+        logger.warning(
+            f"New userscript connection '{conn.id}' received, replacing the old one."
+        )
+        await _orphan_requests(pool.remove(replaced), replaced.id)
+    logger.info(
+        f"✅ Userscript '{conn.id}' connected via WebSocket ({len(pool)} connected)."
+    )
+
+    # Reset Cloudflare verification flag on new connection
     cloudflare_verified = False
-    REFRESHING_BY_REQUEST.clear()  # Clear all per-request refresh flags
 
     try:
         while True:
-            # Check for commands from background threads
-            try:
-                # Non-blocking check for commands from background threads
-                cmd_type, cmd_data = command_queue.get_nowait()
-                if cmd_type == "reconnect" and browser_ws:
-                    await browser_ws.send_json({"command": "reconnect"})
-                    logger.info("Sent reconnect command from background thread")
-            except queue.Empty:
-                pass  # No commands in queue, continue with normal processing
-
             # Receive message from userscript
             message = await websocket.receive_json()
             request_id = message.get("request_id")
@@ -62,11 +222,20 @@ async def websocket_endpoint(websocket: WebSocket, CONFIG):
 
             if command:
                 # Handle commands from userscript
-                if command == "refresh":
-                    logger.info("Received refresh command from userscript")
+                if command == "hello":
+                    conn.capabilities = _parse_capabilities(
+                        message.get("capabilities", [])
+                    )
+                    logger.info(
+                        f"Userscript '{conn.id}' capabilities: {sorted(conn.capabilities)}"
+                    )
+                    pool.wake()
+                elif command == "refresh":
+                    logger.info(f"Received refresh command from userscript '{conn.id}'")
                     # This means Cloudflare challenge was handled, reset verification flag
                     cloudflare_verified = False
-                    REFRESHING_BY_REQUEST.clear()  # Clear all per-request refresh flags
+                    for owned in conn.inflight:
+                        REFRESHING_BY_REQUEST.pop(owned, None)
                 elif command == "reconnect":
                     logger.info("Received reconnect command from userscript")
                     # This means userscript wants to reconnect
@@ -87,12 +256,39 @@ async def websocket_endpoint(websocket: WebSocket, CONFIG):
                     f"Received data for unknown or closed request_id: {request_id}"
                 )
     except WebSocketDisconnect:
-        logger.warning("❌ Userscript disconnected.")
+        logger.warning(f"❌ Userscript '{conn.id}' disconnected.")
     finally:
-        browser_ws = None
-        for resp_q in response_channels.values():
-            await resp_q.put({"error": "Browser disconnected."})
-        response_channels.clear()
+        # Only the requests this tab was serving are affected
+        await _orphan_requests(pool.remove(conn), conn.id)
+
+
+async def _orphan_requests(request_ids: List[str], conn_id: str) -> None:
+    """
+    Tell the handlers waiting on `request_ids` that their browser went away.
+
+    The message is queued behind any output still buffered, so each handler
+    knows exactly what was streamed before it decides to wait for a
+    reconnect (and resume) or to fail.
+    """
+    for request_id in request_ids:
+        recovery_journal.orphan(request_id)
+        resp_q = response_channels.get(request_id)
+        if resp_q is not None:
+            await resp_q.put({DISCONNECTED: conn_id})
+        REFRESHING_BY_REQUEST.pop(request_id, None)
+
+
+async def drain_commands_forever(interval: float = 1.0) -> None:
+    """Background task: forward commands queued by background threads to the userscripts."""
+    while True:
+        try:
+            cmd_type, cmd_data = command_queue.get_nowait()
+        except queue.Empty:
+            await asyncio.sleep(interval)
+            continue
+        if cmd_type == "reconnect":
+            await pool.broadcast({"command": "reconnect"})
+            logger.info("Sent reconnect command from background thread")
 
 
 def idle_restart_worker(CONFIG):
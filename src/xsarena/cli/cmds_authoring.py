@@ -124,13 +124,18 @@ def ingest_ack(
     typer.echo(f"Ingest ACK mode: {len(parts)} chunks (~{chunk_kb} KB each)")
 
     async def _run_loop():
-        for idx, chunk in enumerate(parts, start=1):
-            user_prompt = ingest_user_ack(idx, len(parts), chunk)
-            reply = await cli.engine.send_and_collect(
-                user_prompt, system_prompt=INGEST_SYSTEM_ACK
-            )
-            ack_text = reply.strip()
-            typer.echo(f"OK {idx}/{len(parts)} - {ack_text}")
+        # Chunks are acknowledged independently, so send them concurrently
+        prompts = [
+            ingest_user_ack(idx, len(parts), chunk)
+            for idx, chunk in enumerate(parts, start=1)
+        ]
+        async for result in cli.engine.send_many(
+            prompts, system_prompt=INGEST_SYSTEM_ACK
+        ):
+            if not result.ok:
+                raise result.error
+            ack_text = result.value.strip()
+            typer.echo(f"OK {result.index + 1}/{len(parts)} - {ack_text}")
 
     asyncio.run(_run_loop())
     typer.echo(f"Acknowledgment complete. Processed {len(parts)} chunks.")
@@ -0,0 +1,76 @@
+"""Response cache commands for XSArena."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import typer
+
+from ..core.backends.cache import DEFAULT_CACHE_PATH, ResponseCache
+from ..core.project_config import get_project_settings
+
+app = typer.Typer(help="Inspect and purge the on-disk backend response cache.")
+
+
+def _open_cache() -> ResponseCache:
+    settings = get_project_settings().cache
+    return ResponseCache(
+        DEFAULT_CACHE_PATH,
+        max_bytes=int(settings.max_mb * 1024 * 1024),
+        ttl_seconds=settings.ttl_hours * 3600,
+    )
+
+
+@app.command("stats")
+def cache_stats(json_out: bool = typer.Option(False, "--json", help="Emit JSON")):
+    """Show cache size, entry count and hit ratio."""
+    if not DEFAULT_CACHE_PATH.exists():
+        typer.echo("No response cache yet.")
+        return
+    cache = _open_cache()
+    try:
+        stats = cache.stats()
+    finally:
+        cache.close()
+    stats["enabled"] = get_project_settings().cache.enabled
+    if json_out:
+        typer.echo(json.dumps(stats, indent=2))
+        return
+    oldest = (
+        time.strftime("%Y-%m-%d %H:%M", time.localtime(stats["oldest"]))
+        if stats["oldest"]
+        else "-"
+    )
+    typer.echo(f"Path:      {stats['path']}")
+    typer.echo(f"Enabled:   {stats['enabled']}")
+    typer.echo(f"Entries:   {stats['entries']} (oldest {oldest})")
+    typer.echo(
+        f"Size:      {stats['bytes'] / 1048576:.1f} / {stats['max_bytes'] / 1048576:.0f} MB"
+    )
+    typer.echo(
+        f"Hits:      {stats['hits']}  Misses: {stats['misses']}  "
+        f"Hit ratio: {stats['hit_ratio']:.1%}  Evictions: {stats['evictions']}"
+    )
+
+
+@app.command("purge")
+def cache_purge(
+    expired: bool = typer.Option(
+        False, "--expired", help="Only drop entries older than the TTL"
+    ),
+    yes: bool = typer.Option(False, "--yes", help="Apply (required to purge all)"),
+):
+    """Delete cached responses (all of them, or only expired ones)."""
+    if not DEFAULT_CACHE_PATH.exists():
+        typer.echo("No response cache yet.")
+        return
+    if not expired and not yes:
+        typer.echo("Would delete every cached response. Use --yes to apply.")
+        return
+    cache = _open_cache()
+    try:
+        removed = cache.purge(expired_only=expired)
+    finally:
+        cache.close()
+    typer.echo(f"Removed {removed} cached response(s)")
@@ -1,7 +1,9 @@
 """Development and simulation commands for XSArena."""
 
 import asyncio
+import contextlib
 from pathlib import Path
+from typing import List, Optional
 
 import typer
 
@@ -82,3 +84,155 @@ def dev_simulate(
 
     typer.echo(f"Simulation completed! Job ID: {job_id}")
     typer.echo(f"Output saved to: {run_spec.out_path}")
+
+
+def _mock_profile(knobs: Optional[List[str]]):
+    """Build a MockProfile from repeated `--knob name=value` options."""
+    from dataclasses import fields
+
+    from ..bridge_v2.mock_backend import MockProfile
+
+    types = {f.name: f.type for f in fields(MockProfile)}
+    values = {}
+    for knob in knobs or []:
+        name, sep, raw = knob.partition("=")
+        name = name.strip().replace("-", "_")
+        if not sep or name not in types:
+            typer.echo(
+                f"Error: Invalid knob '{knob}'. Use name=value with one of: {', '.join(types)}"
+            )
+            raise typer.Exit(1)
+        if name == "ttft_distribution":
+            values[name] = raw.strip()
+        elif name in ("response_tokens", "seed"):
+            values[name] = int(raw)
+        else:
+            values[name] = float(raw)
+    try:
+        return MockProfile(**values)
+    except ValueError as e:
+        typer.echo(f"Error: {e}")
+        raise typer.Exit(1) from e
+
+
+_KNOB_HELP = (
+    "Mock behaviour as name=value (repeatable): tokens_per_second, response_tokens, "
+    "ttft, ttft_distribution (fixed|uniform|exponential|lognormal), ttft_spread, "
+    "jitter, error_rate, rate_limit_rate, retry_after, cloudflare_rate, "
+    "disconnect_rate, seed"
+)
+# Shared by the mock commands; a module-level default keeps the list option out of the signature
+_KNOB_OPTION = typer.Option(None, "--knob", "-k", help=_KNOB_HELP)
+
+
+@app.command("mock-userscript")
+def dev_mock_userscript(
+    url: str = typer.Option("ws://127.0.0.1:5102/ws", "--url", help="Bridge WebSocket URL"),
+    tabs: int = typer.Option(1, "--tabs", help="Number of simulated browser tabs"),
+    knob: Optional[List[str]] = _KNOB_OPTION,
+):
+    """Stand in for the userscript: answer bridge requests with synthetic streams."""
+    from ..bridge_v2.mock_backend import run_mock_userscript
+
+    profile = _mock_profile(knob)
+    typer.echo(f"Mock userscript: {tabs} tab(s) → {url} (Ctrl+C to stop)")
+
+    async def _run():
+        await asyncio.gather(
+            *(
+                run_mock_userscript(url, profile, conn_id=f"mock-{i + 1}")
+                for i in range(max(1, tabs))
+            )
+        )
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run())
+
+
+@app.command("mock-openrouter")
+def dev_mock_openrouter(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(5199, "--port"),
+    knob: Optional[List[str]] = _KNOB_OPTION,
+):
+    """Serve a mock OpenAI-compatible API (point OPENROUTER_BASE_URL at it)."""
+    from ..bridge_v2.mock_backend import serve_mock_openai
+
+    profile = _mock_profile(knob)
+    typer.echo(f"Mock OpenRouter on http://{host}:{port}/v1 (Ctrl+C to stop)")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve_mock_openai(host, port, profile))
+
+
+@app.command("loadtest")
+def dev_loadtest(
+    url: str = typer.Option(
+        "http://127.0.0.1:5102/v1", "--url", help="Base URL of the bridge api_server"
+    ),
+    requests: int = typer.Option(50, "--requests", "-n", help="Total requests to send"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Requests in flight"),
+    model: str = typer.Option("mock", "--model"),
+    stream: bool = typer.Option(True, "--stream/--no-stream"),
+    mock_tabs: int = typer.Option(
+        0,
+        "--mock-tabs",
+        help="Also run this many mock userscript tabs against the bridge",
+    ),
+    knob: Optional[List[str]] = _KNOB_OPTION,
+    api_key: Optional[str] = typer.Option(None, "--api-key", envvar="XSA_BRIDGE_API_KEY"),
+    json_output: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Drive concurrent chat completions through the bridge and report TTFT/latency."""
+    import json
+
+    from ..bridge_v2.loadtest import run_loadtest
+    from ..bridge_v2.mock_backend import run_mock_userscript
+
+    profile = _mock_profile(knob)
+    ws_url = url.replace("http", "ws", 1).rsplit("/v1", 1)[0] + "/ws"
+
+    async def _run():
+        stop = asyncio.Event()
+        tabs = [
+            asyncio.ensure_future(
+                run_mock_userscript(ws_url, profile, conn_id=f"loadtest-{i + 1}", stop=stop)
+            )
+            for i in range(max(0, mock_tabs))
+        ]
+        if tabs:
+            await asyncio.sleep(1.0)  # let the tabs register with the bridge
+        try:
+            return await run_loadtest(
+                url,
+                requests=requests,
+                concurrency=concurrency,
+                model=model,
+                stream=stream,
+                api_key=api_key,
+            )
+        finally:
+            stop.set()
+            await asyncio.gather(*tabs, return_exceptions=True)
+
+    summary = asyncio.run(_run()).summary()
+    if json_output:
+        typer.echo(json.dumps(summary, indent=2))
+        return
+
+    typer.echo(
+        f"{summary['ok']}/{summary['requests']} ok in {summary['wall_seconds']}s "
+        f"at concurrency {summary['concurrency']}"
+    )
+    typer.echo(
+        f"Throughput: {summary['throughput_rps']} req/s, "
+        f"{summary['throughput_chars_per_s']} chars/s"
+    )
+    for label in ("ttft", "latency"):
+        p = summary[label]
+        typer.echo(
+            f"{label.upper():>8}: p50={p['p50']}s p95={p['p95']}s p99={p['p99']}s max={p['max']}s"
+        )
+    if summary["errors"]:
+        typer.echo(
+            "Errors: " + ", ".join(f"{k}×{v}" for k, v in sorted(summary["errors"].items()))
+        )
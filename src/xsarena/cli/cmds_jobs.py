@@ -8,8 +8,10 @@ from pathlib import Path
 
 import typer
 
+from ..core.jobs.index import JobSummary
 from ..core.jobs.model import JobManager, JobV3
 from ..core.jobs.scheduler import Scheduler
+from ..core.jobs.store import JobStore
 
 app = typer.Typer(help="Jobs manager (list, monitor, control jobs)")
 
@@ -21,7 +23,7 @@ def ls(
 ):
     """List all jobs (with totals)."""
     job_runner = JobManager()
-    jobs: list[JobV3] = job_runner.list_jobs()
+    jobs: list[JobSummary] = job_runner.list_jobs()
     sched = Scheduler()
     status = sched.get_status()
 
@@ -334,18 +336,8 @@ def boost(
     # Get the scheduler instance and update the job's priority
     scheduler = Scheduler()
 
-    # Check if the job is in the queue
-    job_found = False
-    for i, (current_priority, queued_job_id) in enumerate(scheduler.job_queue):
-        if queued_job_id == job_id:
-            # Update the priority
-            scheduler.job_queue[i] = (priority, queued_job_id)
-            scheduler._sort_queue()  # Re-sort the queue
-            scheduler._persist_queue()  # Persist the changes
-            job_found = True
-            break
-
-    if job_found:
+    # Update the priority if the job is queued (persisted for the running scheduler)
+    if scheduler.set_priority(job_id, priority):
         typer.echo(f"✓ Priority updated for job {job_id} to {priority}")
     else:
         # Check if the job exists at all
@@ -375,10 +367,11 @@ def gc(
         return
     now = time.time()
     deleted = 0
+    store = JobStore()
     if base.exists():
         for d in base.iterdir():
             if d.is_dir() and now - d.stat().st_mtime > days * 86400:
-                shutil.rmtree(d, ignore_errors=True)
+                store.delete(d.name)
                 deleted += 1
     typer.echo(f"Deleted {deleted} job(s)")
 
@@ -410,7 +403,7 @@ def clone(job_id: str, new_name: str = typer.Option("", "--name", "-n")):
                 "%Y-%m-%dT%H:%M:%S"
             )
             data["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
-            job_json.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            JobStore().save(JobV3(**data))
         typer.echo(f"✓ Cloned {job_id} → {new_id}")
     except Exception as e:
         typer.echo(f"Clone failed: {e}", err=True)
@@ -424,19 +417,16 @@ def recent(
 ):
     """Show recent jobs (most recent first)."""
     job_runner = JobManager()
-    jobs: list[JobV3] = job_runner.list_jobs()
+    # Newest first, limited in the store
+    recent_jobs: list[JobSummary] = job_runner.job_store.list_all(limit=count)
 
-    if not jobs:
+    if not recent_jobs:
         if json_output:
             typer.echo(json.dumps([]))
         else:
             typer.echo("No jobs found.")
         return
 
-    # Sort by creation time, newest first
-    jobs.sort(key=lambda j: j.created_at, reverse=True)
-    recent_jobs = jobs[:count]
-
     if json_output:
         jobs_list = []
         for job in recent_jobs:
@@ -462,8 +452,15 @@ def rm(job_id: str, yes: bool = typer.Option(False, "--yes")):
     if not yes:
         typer.echo(f"Would delete {d}. Use --yes to apply.")
         return
-    if d.exists():
-        shutil.rmtree(d, ignore_errors=True)
+    if JobStore().delete(job_id):
         typer.echo(f"Deleted {job_id}")
     else:
         typer.echo(f"Not found: {job_id}")
+
+
+@app.command("reindex")
+def reindex():
+    """Rebuild the job index from the job directories."""
+    store = JobStore(use_index=True)
+    count = store.rebuild_index()
+    typer.echo(f"Indexed {count} job(s)")
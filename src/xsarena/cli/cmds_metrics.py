@@ -25,6 +25,18 @@ def metrics_show():
             typer.echo("Costs by model:")
             for model, cost in metrics_collector._job_costs.items():
                 typer.echo(f"  {model}: ${cost:.4f}")
+
+        coalesced = metrics_collector.get_coalesced()
+        if coalesced:
+            typer.echo("Coalesced requests by backend:")
+            for backend, count in coalesced.items():
+                typer.echo(f"  {backend}: {count}")
+
+        transitions = metrics_collector.get_breaker_transitions()
+        if transitions:
+            typer.echo("Circuit breaker transitions:")
+            for (transport, state), count in sorted(transitions.items()):
+                typer.echo(f"  {transport} -> {state}: {count}")
     except Exception as e:
         typer.echo(f"Metrics not available: {e}")
         typer.echo(
@@ -675,6 +675,31 @@ def project_init_cmd(
 #   bypass_enabled: false
 #   enable_idle_restart: true
 #   stream_response_timeout_seconds: 300
+#   models_reload_seconds: 2     # how often the model files are checked for edits
+#   stream_coalesce_ms: 20       # merge stream deltas arriving within this window (0 = off)
+#   stream_coalesce_chars: 512   # ...or until this many characters are held
+#   max_channels: 200            # requests active at once; the rest queue
+#   admission:
+#     max_queue: 1000            # waiting requests before 503 + Retry-After
+#     max_wait_seconds: 30       # per-request queueing deadline
+#     default_lane: interactive  # lane for clients without X-XSArena-Lane
+#   rate_limit:                  # token bucket: `burst` requests per `window_seconds`
+#     burst: 10
+#     window_seconds: 10
+#     max_peers: 10000           # least recently seen clients are forgotten beyond this
+#     keys:                      # per-API-key overrides
+#       "some-api-key": {burst: 100, window_seconds: 10}
+#     models:                    # shared limit per model, across all clients
+#       "some-model": {burst: 30, window_seconds: 60}
+#   channels:                    # per-request buffer between the userscript and the client
+#     max_items: 256             # queued messages before new text is merged into the last
+#     max_chars: 128000          # buffered characters before the stream is paused
+#     hard_limit_chars: 512000   # buffered characters before the request is failed
+#     reap_after_seconds: 120    # drop channels nobody has read for this long
+#   recovery:                    # requests whose userscript tab disconnects
+#     grace_seconds: 30          # wait this long for a tab to (re)connect; 0 = fail at once
+#     max_attempts: 3            # recoveries per request
+#     continue_prompt: "..."     # sent with the partial reply when output was already streamed
 
 # Default model and backend settings
 # model: "default"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import os
 import time
@@ -133,6 +134,18 @@ class CLIContext:
     def save(self):
         self.state.save_to_file(str(self.state_path))
 
+    async def aclose(self) -> None:
+        """Close the engine's backend transport (pooled HTTP sessions)."""
+        await self.engine.aclose()
+
+    def close(self) -> None:
+        """Synchronous counterpart of aclose(), run when the CLI invocation ends."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            with contextlib.suppress(Exception):
+                asyncio.run(self.aclose())
+
     def fix(self) -> list[str]:
         """Attempt self-fixes: base_url shape, backend validity, engine rebuild."""
         notes: list[str] = []
@@ -9,6 +9,7 @@ from ..core.config import Config
 from .cmds_audio import app as audio_app
 from .cmds_bilingual import app as bilingual_app
 from .cmds_booster import app as booster_app
+from .cmds_cache import app as cache_app
 
 try:
     from .cmds_chad import app as chad_app
@@ -20,6 +21,7 @@ from .cmds_coach import app as coach_app
 from .cmds_coder import app as coder_app
 from .cmds_controls import app as controls_app
 from .cmds_debug import app as debug_app
+from .cmds_dev import app as dev_app
 
 # Import roles and overlays commands
 from .cmds_directives import overlays_list, overlays_show, roles_list, roles_show
@@ -76,6 +78,7 @@ def _init_ctx(
             base_url=base_url or "http://127.0.0.1:5102/v1",
         )
     ctx.obj = CLIContext.load(cfg=cfg_over)
+    ctx.call_on_close(ctx.obj.close)
 
 
 # --- Essential Top-Level Commands ---
@@ -151,6 +154,10 @@ ops_app.add_typer(snapshot_app, name="snapshot")
 ops_app.add_typer(
     config_app, name="config", help="Configuration and backend management"
 )
+ops_app.add_typer(cache_app, name="cache", help="Backend response cache")
+
+# Under ops rather than top-level (see the note on 'dev' below)
+ops_app.add_typer(dev_app, name="dev", help="Simulation, mock backends and load tests")
 # Import and register the new command groups
 from .cmds_handoff import app as handoff_app
 from .cmds_orders import app as orders_app
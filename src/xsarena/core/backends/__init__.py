@@ -1,10 +1,17 @@
 """Backends package for XSArena."""
 
+import asyncio
 import os
+import re
+import sqlite3
 from dataclasses import dataclass
 
+from .balanced import BalancedTransport, Endpoint
 from .bridge_v2 import BridgeV2Transport, OpenRouterTransport
+from .cache import CachingTransport, get_response_cache
 from .circuit_breaker import CircuitBreakerTransport
+from .coalesce import CoalescingTransport
+from .hedge import HedgingTransport
 from .transport import BackendTransport
 
 
@@ -19,22 +26,31 @@ class Message:
 class NullTransport(BackendTransport):
     """Offline shim backend for tests/demos."""
 
-    def __init__(self, script: list = None):
+    def __init__(self, script: list = None, token_delay: float = 0.0):
         self._calls = 0
         self._script = script or [
             "Offline sample. NEXT: [Continue]",
             "Offline final. NEXT: [END]",
         ]
+        self.token_delay = token_delay  # Seconds between streamed tokens
 
-    async def send(self, payload: dict) -> dict:
+    def _next_content(self) -> str:
         self._calls += 1
         if self._calls <= len(self._script):
-            content = self._script[self._calls - 1]
-        else:
-            # If we've exhausted the script, return a default response
-            content = f"Offline continuation {self._calls}. NEXT: [END]"
+            return self._script[self._calls - 1]
+        # If we've exhausted the script, return a default response
+        return f"Offline continuation {self._calls}. NEXT: [END]"
+
+    async def send(self, payload: dict) -> dict:
+        content = self._next_content()
         return {"choices": [{"message": {"content": content}}]}
 
+    async def stream(self, payload: dict):
+        for token in re.findall(r"\s*\S+\s*", self._next_content()):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
     async def health_check(self) -> bool:
         return True
 
@@ -46,12 +62,43 @@ def create_backend(backend_type: str, **kwargs) -> BackendTransport:
     """Factory function to create the appropriate backend transport."""
     # Create the base transport
     if backend_type in ("null", "offline"):
-        base_transport = NullTransport(script=kwargs.get("script"))
+        base_transport = NullTransport(
+            script=kwargs.get("script"), token_delay=kwargs.get("token_delay", 0.0)
+        )
+    elif backend_type == "bridge" and (balanced := _bridge_endpoints(kwargs)):
+        # Several endpoints: each gets its own circuit breaker inside the balancer
+        endpoints, bridge_settings = balanced
+        return _with_request_layers(
+            BalancedTransport(
+                endpoints,
+                strategy=kwargs.get("balance", bridge_settings.balance),
+                eject_below=bridge_settings.eject_below,
+                eject_seconds=bridge_settings.eject_seconds,
+                transport_factory=lambda ep, name: CircuitBreakerTransport(
+                    BridgeV2Transport(
+                        base_url=ep.base_url,
+                        session_id=ep.session_id,
+                        message_id=ep.message_id,
+                        limit_per_host=kwargs.get("limit_per_host", 8),
+                    ),
+                    failure_threshold=kwargs.get("circuit_breaker_threshold", 5),
+                    recovery_timeout=kwargs.get("circuit_breaker_timeout", 30),
+                    failure_ratio=kwargs.get("circuit_breaker_ratio", 0.5),
+                    name=name,
+                    scope=f"{name}:{ep.key}",
+                ),
+            ),
+            backend_type,
+            kwargs.get("cache"),
+            kwargs.get("coalesce"),
+            kwargs.get("hedge"),
+        )
     elif backend_type == "bridge":
         base_transport = BridgeV2Transport(
             base_url=kwargs.get("base_url", "http://127.0.0.1:5102/v1"),
             session_id=kwargs.get("session_id"),
             message_id=kwargs.get("message_id"),
+            limit_per_host=kwargs.get("limit_per_host", 8),
         )
     elif backend_type in ("lmarena", "lmarena-ws"):
         # DEPRECATED: Use 'bridge' instead
@@ -72,15 +119,121 @@ def create_backend(backend_type: str, **kwargs) -> BackendTransport:
                 "OpenRouter API key not configured. Set OPENROUTER_API_KEY or pass api_key=..."
             )
         base_transport = OpenRouterTransport(
-            api_key=api_key, model=kwargs.get("model", "openai/gpt-4o")
+            api_key=api_key,
+            model=kwargs.get("model", "openai/gpt-4o"),
+            limit_per_host=kwargs.get("limit_per_host", 8),
         )
     else:
         raise ValueError(f"Unsupported backend type: {backend_type}")
 
-    # Wrap with circuit breaker
-    return CircuitBreakerTransport(
+    # Wrap with circuit breaker (aclose() is forwarded to the base transport)
+    transport = CircuitBreakerTransport(
         wrapped_transport=base_transport,
         failure_threshold=kwargs.get("circuit_breaker_threshold", 5),
         recovery_timeout=kwargs.get("circuit_breaker_timeout", 30),
         failure_ratio=kwargs.get("circuit_breaker_ratio", 0.5),
+        name="bridge" if backend_type in ("lmarena", "lmarena-ws") else backend_type,
+        scope=_breaker_scope(backend_type, base_transport),
+    )
+    return _with_request_layers(
+        transport,
+        backend_type,
+        kwargs.get("cache"),
+        kwargs.get("coalesce"),
+        kwargs.get("hedge"),
+    )
+
+
+def _breaker_scope(backend_type: str, base_transport: BackendTransport):
+    """Identity under which breakers share state: backend plus endpoint/model."""
+    if backend_type in ("null", "offline"):
+        return None
+    name = "bridge" if backend_type in ("lmarena", "lmarena-ws") else backend_type
+    parts = [
+        str(getattr(base_transport, attr))
+        for attr in ("base_url", "session_id", "message_id", "model")
+        if getattr(base_transport, attr, None)
+    ]
+    return ":".join([name, *parts])
+
+
+def _bridge_endpoints(kwargs: dict):
+    """Endpoints to balance over: explicit `endpoints=`, else the project's bridge list.
+
+    Returns None when a single endpoint is meant (explicit session/message ids
+    pin one LMArena session, and one configured endpoint needs no balancer).
+    """
+    from ..project_config import BridgeSettings, get_project_settings
+
+    try:
+        bridge_settings = get_project_settings().bridge
+    except Exception:
+        bridge_settings = BridgeSettings()
+    endpoints = kwargs.get("endpoints")
+    if endpoints is None:
+        if kwargs.get("session_id") or kwargs.get("message_id"):
+            return None
+        endpoints = bridge_settings.endpoints
+    if not endpoints or len(endpoints) < 2:
+        return None
+    return [Endpoint.from_value(e) for e in endpoints], bridge_settings
+
+
+def _with_request_layers(
+    transport: BackendTransport,
+    backend_type: str,
+    cache=None,
+    coalesce=None,
+    hedge=None,
+) -> BackendTransport:
+    """Stack hedging, request coalescing and the response cache on the breaker.
+
+    `cache`, `coalesce` and `hedge` (True/False) override the project
+    settings; the offline backend only gets these layers when explicitly
+    asked, since its scripted replies depend on call order. Hedging sits
+    below coalescing so a hedge is never merged into its own primary.
+    """
+    offline = backend_type in ("null", "offline")
+    from ..project_config import CacheSettings, HedgeSettings, get_project_settings
+
+    try:
+        project = get_project_settings()
+        settings, hedge_settings = project.cache, project.hedge
+    except Exception:
+        settings, hedge_settings = CacheSettings(), HedgeSettings()
+
+    # One bridge endpoint would get the duplicate in the session the primary is
+    # stuck in: twice the load for no independence, so only hedge it on request
+    single_bridge = backend_type == "bridge" and not isinstance(
+        transport, BalancedTransport
+    )
+    if hedge is True or (
+        hedge is None and hedge_settings.enabled and not (offline or single_bridge)
+    ):
+        transport = HedgingTransport(
+            transport,
+            percentile=hedge_settings.percentile,
+            initial_delay=hedge_settings.initial_delay,
+            min_delay=hedge_settings.min_delay,
+            budget_ratio=hedge_settings.budget_ratio,
+            budget_burst=hedge_settings.budget_burst,
+        )
+
+    if coalesce is True or (coalesce is None and settings.coalesce and not offline):
+        transport = CoalescingTransport(
+            transport, max_temperature=settings.max_temperature
+        )
+
+    if cache is False or (cache is None and (offline or not settings.enabled)):
+        return transport
+    try:
+        response_cache = get_response_cache(
+            max_bytes=int(settings.max_mb * 1024 * 1024),
+            ttl_seconds=settings.ttl_hours * 3600,
+        )
+    except (OSError, sqlite3.Error):
+        # Read-only working directory etc.: run uncached rather than fail
+        return transport
+    return CachingTransport(
+        transport, response_cache, max_temperature=settings.max_temperature
     )
@@ -0,0 +1,301 @@
+"""Client-side load balancing across several bridge endpoints."""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .circuit_breaker import CircuitBreakerTransport, overload_reason
+from .transport import BackendTransport, BaseEvent
+
+logger = logging.getLogger(__name__)
+
+BALANCE_STRATEGIES = ("least_outstanding", "ewma")
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One bridge endpoint: a base URL plus the LMArena session/message ids to use."""
+
+    base_url: str = "http://127.0.0.1:5102/v1"
+    session_id: Optional[str] = None
+    message_id: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.base_url}#{self.session_id or '-'}/{self.message_id or '-'}"
+
+    @classmethod
+    def from_value(cls, value: Union["Endpoint", Dict[str, Any]]) -> "Endpoint":
+        if isinstance(value, Endpoint):
+            return value
+        return cls(
+            base_url=value.get("base_url") or cls.base_url,
+            session_id=value.get("session_id"),
+            message_id=value.get("message_id"),
+        )
+
+
+class _EndpointState:
+    """Live load and health bookkeeping for one endpoint."""
+
+    def __init__(self, endpoint: Endpoint, transport: CircuitBreakerTransport):
+        self.endpoint = endpoint
+        self.transport = transport
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency_ewma: Optional[float] = None
+        self.health = 1.0  # EWMA of request success (1.0 = every request succeeded)
+        self.samples = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def breaker_blocks(self, model: Optional[str]) -> bool:
+        return self.transport.blocks(model)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint.key,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_ewma": (
+                round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+            ),
+            "health": round(self.health, 3),
+            "breaker": self.transport.state.value,
+            "ejected_for": max(0.0, round(self.ejected_until - now, 1)),
+            "ejections": self.ejections,
+        }
+
+
+def _default_endpoint_transport(
+    endpoint: Endpoint, name: str
+) -> CircuitBreakerTransport:
+    from .bridge_v2 import BridgeV2Transport
+
+    return CircuitBreakerTransport(
+        BridgeV2Transport(
+            base_url=endpoint.base_url,
+            session_id=endpoint.session_id,
+            message_id=endpoint.message_id,
+        ),
+        name=name,
+    )
+
+
+class BalancedTransport(BackendTransport):
+    """
+    Spread requests over a pool of bridge endpoints.
+
+    Each request goes to the endpoint with the fewest outstanding requests
+    ("least_outstanding", ties broken by latency EWMA) or the lowest
+    ``(outstanding + 1) * latency_ewma`` ("ewma"). Every endpoint has its own
+    circuit breaker and a success-rate health score; an endpoint whose score
+    drops below `eject_below` is ejected for `eject_seconds` (doubling on each
+    repeat, up to `max_eject_seconds`) and then re-admitted with a clean score.
+    Failures that indicate overload or an open breaker fail over to another
+    endpoint (streams only before the first delta).
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Union[Endpoint, Dict[str, Any]]],
+        strategy: str = "least_outstanding",
+        eject_below: float = 0.5,
+        min_samples: int = 5,
+        eject_seconds: float = 30.0,
+        max_eject_seconds: float = 300.0,
+        ewma_alpha: float = 0.3,
+        failover: int = 1,
+        name: str = "bridge",
+        transport_factory: Optional[
+            Callable[[Endpoint, str], CircuitBreakerTransport]
+        ] = None,
+    ):
+        if not endpoints:
+            raise ValueError("BalancedTransport needs at least one endpoint")
+        if strategy not in BALANCE_STRATEGIES:
+            raise ValueError(
+                f"Unknown balance strategy '{strategy}' (expected one of {BALANCE_STRATEGIES})"
+            )
+        factory = transport_factory or _default_endpoint_transport
+        self.name = name
+        self.strategy = strategy
+        self.eject_below = eject_below
+        self.min_samples = min_samples
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.ewma_alpha = ewma_alpha
+        self.failover = failover
+        self._states: List[_EndpointState] = []
+        for value in endpoints:
+            endpoint = Endpoint.from_value(value)
+            self._states.append(_EndpointState(endpoint, factory(endpoint, name)))
+
+    def _score(self, state: _EndpointState):
+        latency = state.latency_ewma or 0.0  # unmeasured endpoints get explored first
+        if self.strategy == "ewma":
+            return (
+                (state.outstanding + 1) * latency,
+                state.outstanding,
+                state.requests,
+            )
+        return (state.outstanding, latency, state.requests)
+
+    def _pick(
+        self, model: Optional[str], exclude: Sequence[_EndpointState] = ()
+    ) -> _EndpointState:
+        now = time.monotonic()
+        candidates = []
+        for state in self._states:
+            if state in exclude:
+                continue
+            if state.ejected_until and now >= state.ejected_until:
+                # Re-admit on probation: a clean score, and the breaker still guards it
+                state.ejected_until = 0.0
+                state.health = 1.0
+                state.samples = 0
+                logger.info(f"Re-admitted bridge endpoint {state.endpoint.key}")
+            if state.ejected_until or state.breaker_blocks(model):
+                continue
+            candidates.append(state)
+        if candidates:
+            return min(candidates, key=self._score)
+        # Everything is ejected or open: try whichever comes back first
+        remaining = [s for s in self._states if s not in exclude] or self._states
+        return min(remaining, key=lambda s: (s.ejected_until, self._score(s)))
+
+    def _record(
+        self, state: _EndpointState, started: float, error: Optional[BaseException]
+    ) -> None:
+        state.outstanding -= 1
+        state.requests += 1
+        state.samples += 1
+        ok = error is None
+        if ok:
+            latency = time.monotonic() - started
+            if state.latency_ewma is None:
+                state.latency_ewma = latency
+            else:
+                state.latency_ewma += self.ewma_alpha * (latency - state.latency_ewma)
+        else:
+            state.failures += 1
+        state.health += self.ewma_alpha * ((1.0 if ok else 0.0) - state.health)
+        if ok and state.ejections and state.samples >= 2 * self.min_samples:
+            # Healthy for a while after re-admission: forget the ejection backoff
+            state.ejections = 0
+        if (
+            not ok
+            and not state.ejected_until
+            and state.samples >= self.min_samples
+            and state.health < self.eject_below
+        ):
+            seconds = min(
+                self.eject_seconds * (2**state.ejections), self.max_eject_seconds
+            )
+            state.ejected_until = time.monotonic() + seconds
+            state.ejections += 1
+            logger.warning(
+                f"Ejected bridge endpoint {state.endpoint.key} for {seconds:.0f}s "
+                f"(health {state.health:.2f})"
+            )
+
+    def _should_fail_over(self, error: BaseException) -> bool:
+        if overload_reason(error) is not None:
+            return True
+        return "Circuit breaker is open" in str(error)
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        tried: List[_EndpointState] = []
+        while True:
+            state = self._pick(payload.get("model"), tried)
+            tried.append(state)
+            state.outstanding += 1
+            started = time.monotonic()
+            try:
+                result = await state.transport.send(payload)
+            except Exception as e:
+                self._record(state, started, e)
+                if (
+                    len(tried) <= self.failover
+                    and len(tried) < len(self._states)
+                    and self._should_fail_over(e)
+                ):
+                    logger.info(f"Failing over from {state.endpoint.key}: {e}")
+                    continue
+                raise
+            except BaseException as e:
+                # Cancellation says nothing about endpoint health
+                state.outstanding -= 1
+                raise e
+            self._record(state, started, None)
+            return result
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        tried: List[_EndpointState] = []
+        while True:
+            state = self._pick(payload.get("model"), tried)
+            tried.append(state)
+            state.outstanding += 1
+            started = time.monotonic()
+            yielded = False
+            try:
+                async for delta in state.transport.stream(payload):
+                    yielded = True
+                    yield delta
+            except Exception as e:
+                self._record(state, started, e)
+                if (
+                    not yielded
+                    and len(tried) <= self.failover
+                    and len(tried) < len(self._states)
+                    and self._should_fail_over(e)
+                ):
+                    logger.info(f"Failing over from {state.endpoint.key}: {e}")
+                    continue
+                raise
+            except BaseException as e:
+                state.outstanding -= 1
+                raise e
+            self._record(state, started, None)
+            return
+
+    async def health_check(self) -> bool:
+        for state in self._states:
+            try:
+                if await state.transport.health_check():
+                    return True
+            except Exception:
+                continue
+        return False
+
+    async def stream_events(self) -> List[BaseEvent]:
+        return []
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-endpoint load, latency, health and ejection state."""
+        now = time.monotonic()
+        return [state.snapshot(now) for state in self._states]
+
+    def add_outcome_listener(self, listener) -> None:
+        for state in self._states:
+            state.transport.add_outcome_listener(listener)
+
+    def remove_outcome_listener(self, listener) -> None:
+        for state in self._states:
+            state.transport.remove_outcome_listener(listener)
+
+    async def aclose(self) -> None:
+        for state in self._states:
+            await state.transport.aclose()
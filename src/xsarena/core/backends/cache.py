@@ -0,0 +1,346 @@
+"""Content-addressed response cache for XSArena transports."""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from .transport import BackendTransport, BaseEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(".xsarena") / "cache" / "responses.sqlite3"
+
+# Per-call switches read by the caching/coalescing layers, never sent upstream
+CONTROL_KEYS = frozenset({"cache", "coalesce"})
+# Payload keys that never affect the response
+_NON_KEY_FIELDS = CONTROL_KEYS | {"stream"}
+
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "xsarena_cache_bypass", default=False
+)
+
+
+@contextlib.contextmanager
+def no_cache() -> Iterator[None]:
+    """Bypass response caching for calls made inside this block (and tasks it spawns)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def strip_control_keys(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the payload without per-call cache/coalesce switches."""
+    if CONTROL_KEYS.isdisjoint(payload):
+        return payload
+    return {k: v for k, v in payload.items() if k not in CONTROL_KEYS}
+
+
+def transport_identity(transport: BackendTransport) -> str:
+    """Name of the innermost transport class plus its fixed model, if any."""
+    inner = transport
+    while getattr(inner, "wrapped_transport", None) is not None:
+        inner = inner.wrapped_transport
+    return f"{type(inner).__name__}:{getattr(inner, 'model', None)}"
+
+
+def cache_key(payload: Dict[str, Any], namespace: str = "") -> str:
+    """Canonical hash of a request: messages, model, sampling parameters and backend."""
+    canonical = {k: v for k, v in payload.items() if k not in _NON_KEY_FIELDS}
+    blob = json.dumps(
+        {"ns": namespace, "req": canonical},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Disk-backed LRU of backend responses (SQLite).
+
+    Entries expire after `ttl_seconds`; once the stored bytes exceed
+    `max_bytes`, the least recently used entries are evicted.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        last_access REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+    CREATE TABLE IF NOT EXISTS stats (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+
+    def _bump(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO stats(name, value) VALUES(?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for `key`, or None (expired entries are dropped)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self._bump("misses")
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._bump("hits")
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response and evict least recently used entries over the size cap."""
+        value = json.dumps(response, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, value, size, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        doomed: List[str] = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM responses WHERE key = ?", [(k,) for k in doomed]
+        )
+        for _ in doomed:
+            self._bump("evictions")
+
+    def purge(self, expired_only: bool = False) -> int:
+        """Delete expired entries (or everything); returns the number removed."""
+        with self._lock:
+            if expired_only:
+                cur = self._conn.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+            else:
+                cur = self._conn.execute("DELETE FROM responses")
+                self._conn.execute("DELETE FROM stats")
+            removed = cur.rowcount
+        if not expired_only:
+            with contextlib.suppress(sqlite3.Error):
+                self._conn.execute("VACUUM")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and hit/miss/eviction counters."""
+        with self._lock:
+            entries, size, oldest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(created) FROM responses"
+            ).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM stats"))
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "oldest": oldest,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Dict[str, ResponseCache] = {}
+
+
+def get_response_cache(
+    path: Union[str, Path] = DEFAULT_CACHE_PATH,
+    max_bytes: int = 256 * 1024 * 1024,
+    ttl_seconds: float = 7 * 24 * 3600,
+) -> ResponseCache:
+    """Return the process-wide ResponseCache for `path` (limits are refreshed)."""
+    resolved = str(Path(path).resolve())
+    cache = _shared.get(resolved)
+    if cache is None:
+        cache = ResponseCache(path, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        _shared[resolved] = cache
+    else:
+        cache.max_bytes = max_bytes
+        cache.ttl_seconds = ttl_seconds
+    return cache
+
+
+class CachingTransport(BackendTransport):
+    """
+    Transport wrapper that serves repeated requests from a ResponseCache.
+
+    Caching is opt-in: a request is cached when it sets
+    ``payload["cache"] = True`` or an explicit temperature of at most
+    `max_temperature`. Without either, the backend's own sampling applies,
+    so its reply is not reusable. ``payload["cache"] = False`` and
+    `no_cache()` always bypass the cache.
+    """
+
+    def __init__(
+        self,
+        wrapped_transport: BackendTransport,
+        cache: ResponseCache,
+        max_temperature: float = 0.5,
+        namespace: str = "",
+    ):
+        self.wrapped_transport = wrapped_transport
+        self.cache = cache
+        self.max_temperature = max_temperature
+        # Backend identity (and its fixed model, if any) is part of every key
+        self.namespace = namespace or transport_identity(wrapped_transport)
+
+    @property
+    def name(self) -> str:
+        return getattr(
+            self.wrapped_transport, "name", type(self.wrapped_transport).__name__
+        )
+
+    def _key_for(self, payload: Dict[str, Any]) -> Optional[str]:
+        opt = payload.get("cache")
+        if opt is False or _bypass.get():
+            return None
+        if opt is not True:
+            temperature = payload.get("temperature")
+            if temperature is None:
+                return None
+            try:
+                if float(temperature) > self.max_temperature:
+                    return None
+            except (TypeError, ValueError):
+                return None
+        return cache_key(payload, self.namespace)
+
+    def _lookup(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None:
+            return None
+        try:
+            return self.cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def _store(self, key: Optional[str], response: Dict[str, Any]) -> None:
+        if key is None:
+            return
+        try:
+            self.cache.put(key, response)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a cached response when available, otherwise send and cache it."""
+        key = self._key_for(payload)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = await self.wrapped_transport.send(strip_control_keys(payload))
+        self._store(key, response)
+        return response
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Replay a cached response as one delta, or stream and cache the full text."""
+        key = self._key_for(payload)
+        cached = self._lookup(key)
+        if cached is not None:
+            choices = cached.get("choices") or [{}]
+            content = choices[0].get("message", {}).get("content", "")
+            if content:
+                yield content
+            return
+        parts: List[str] = []
+        async for delta in self.wrapped_transport.stream(strip_control_keys(payload)):
+            parts.append(delta)
+            yield delta
+        self._store(
+            key, {"choices": [{"message": {"content": "".join(parts)}}]}
+        )
+
+    async def health_check(self) -> bool:
+        return await self.wrapped_transport.health_check()
+
+    async def stream_events(self) -> List[BaseEvent]:
+        return await self.wrapped_transport.stream_events()
+
+    def add_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "add_outcome_listener"):
+            self.wrapped_transport.add_outcome_listener(listener)
+
+    def remove_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "remove_outcome_listener"):
+            self.wrapped_transport.remove_outcome_listener(listener)
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport (the cache file stays open for reuse)."""
+        await self.wrapped_transport.aclose()
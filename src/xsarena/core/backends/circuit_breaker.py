@@ -2,14 +2,57 @@
 
 import asyncio
 import logging
+import re
 import time
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
 
 from .transport import BackendTransport, BaseEvent
 
 logger = logging.getLogger(__name__)
 
+_STATUS_IN_MESSAGE = re.compile(r"\berror (\d{3})\b")
+
+
+def status_from_error(error: BaseException) -> Optional[int]:
+    """HTTP status carried by a transport error, if any."""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status
+    m = _STATUS_IN_MESSAGE.search(str(error))
+    return int(m.group(1)) if m else None
+
+
+def overload_reason(error: BaseException) -> Optional[str]:
+    """Classify an error as an overload signal ("429", "5xx", "timeout") or None."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    status = status_from_error(error)
+    if status == 429:
+        return "429"
+    if status is not None and status >= 500:
+        return "5xx"
+    return None
+
+
+@dataclass
+class RequestOutcome:
+    """Result of one request that actually reached the wrapped transport."""
+
+    transport: str
+    ok: bool
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def overload(self) -> Optional[str]:
+        return overload_reason(self.error) if self.error is not None else None
+
+
+OutcomeListener = Callable[[RequestOutcome], None]
+
 
 class CircuitState(Enum):
     CLOSED = "closed"  # Normal operation
@@ -17,8 +60,86 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing if failure condition is resolved
 
 
+class RollingWindow:
+    """Outcome counts and latency over the last `window_seconds`, in time buckets."""
+
+    def __init__(self, window_seconds: float = 60.0, buckets: int = 12):
+        self.buckets = max(1, buckets)
+        self.width = window_seconds / self.buckets
+        # Each bucket: [epoch, successes, failures, slow, latency_sum]
+        self._data: List[List[float]] = [
+            [-1, 0, 0, 0, 0.0] for _ in range(self.buckets)
+        ]
+
+    def _bucket(self, now: float) -> List[float]:
+        epoch = int(now // self.width)
+        bucket = self._data[epoch % self.buckets]
+        if bucket[0] != epoch:
+            bucket[:] = [epoch, 0, 0, 0, 0.0]
+        return bucket
+
+    def record(self, ok: bool, latency: float, slow: bool = False) -> None:
+        bucket = self._bucket(time.monotonic())
+        bucket[1 if ok else 2] += 1
+        if slow:
+            bucket[3] += 1
+        bucket[4] += latency
+
+    def totals(self) -> Dict[str, float]:
+        """Requests, failures, slow calls and mean latency inside the window."""
+        oldest = int(time.monotonic() // self.width) - self.buckets + 1
+        ok = failed = slow = 0
+        latency = 0.0
+        for epoch, succ, fail, slw, lat in self._data:
+            if epoch >= oldest:
+                ok += succ
+                failed += fail
+                slow += slw
+                latency += lat
+        requests = ok + failed
+        return {
+            "requests": requests,
+            "failures": failed,
+            "slow": slow,
+            "mean_latency": latency / requests if requests else 0.0,
+        }
+
+    def reset(self) -> None:
+        for bucket in self._data:
+            bucket[:] = [-1, 0, 0, 0, 0.0]
+
+
+class _Circuit:
+    """Breaker state for one key (model) of one transport."""
+
+    def __init__(self, window_seconds: float, buckets: int):
+        self.state = CircuitState.CLOSED
+        self.window = RollingWindow(window_seconds, buckets)
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_failure_time = 0.0
+        self.probes = 0
+
+
+# Circuits shared by every breaker created with the same scope (endpoint identity)
+_shared_circuits: Dict[str, Dict[str, _Circuit]] = {}
+
+
 class CircuitBreakerTransport(BackendTransport):
-    """Transport wrapper that adds circuit breaker functionality."""
+    """
+    Transport wrapper that adds circuit breaker functionality.
+
+    Outcomes are kept in a rolling time window, so old failures age out. A
+    circuit opens after `failure_threshold` consecutive failures, or when at
+    least `min_requests` calls in the window failed (or were slower than
+    `slow_call_threshold`) at `failure_ratio` or more. After
+    `recovery_timeout` it goes HALF_OPEN and admits at most
+    `half_open_max_probes` concurrent probes; a successful probe closes it,
+    a failed one re-opens it. Calls that were already in flight when it
+    opened do not count as probes. With `per_model` each model gets its own circuit.
+    Breakers given the same `scope` (e.g. one bridge endpoint) share circuits,
+    so every transport instance talking to that endpoint sees the same state.
+    """
 
     def __init__(
         self,
@@ -26,121 +147,296 @@ class CircuitBreakerTransport(BackendTransport):
         failure_threshold: int = 5,
         recovery_timeout: int = 30,
         failure_ratio: float = 0.5,
+        name: Optional[str] = None,
+        window_seconds: float = 60.0,
+        window_buckets: int = 12,
+        min_requests: int = 10,
+        half_open_max_probes: int = 1,
+        slow_call_threshold: Optional[float] = None,
+        per_model: bool = True,
+        scope: Optional[str] = None,
     ):
         """
         Initialize circuit breaker wrapper.
 
         Args:
             wrapped_transport: The transport to wrap
-            failure_threshold: Number of failures before opening circuit
+            failure_threshold: Consecutive failures that open the circuit
             recovery_timeout: Time in seconds before allowing test requests
-            failure_ratio: Ratio of failed requests that triggers the breaker
+            failure_ratio: Failure (or slow-call) ratio in the window that opens it
+            name: Backend name reported to outcome listeners
+            window_seconds: Length of the rolling outcome window
+            window_buckets: Number of time buckets in the window
+            min_requests: Calls needed in the window before the ratio applies
+            half_open_max_probes: Concurrent requests admitted while HALF_OPEN
+            slow_call_threshold: Seconds after which a success counts as slow
+            per_model: Keep a separate circuit per payload model
+            scope: Share circuits with other breakers of the same scope
         """
         self.wrapped_transport = wrapped_transport
+        self.name = name or type(wrapped_transport).__name__
+        self._outcome_listeners: List[OutcomeListener] = []
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.failure_ratio = failure_ratio
+        self.window_seconds = window_seconds
+        self.window_buckets = window_buckets
+        self.min_requests = min_requests
+        self.half_open_max_probes = max(1, half_open_max_probes)
+        self.slow_call_threshold = slow_call_threshold
+        self.per_model = per_model
 
-        # Circuit breaker state
-        self.state = CircuitState.CLOSED
-        self.failure_count = 0
-        self.last_failure_time = 0.0
-        self.total_requests = 0
-        self.failed_requests = 0
-        self._lock = asyncio.Lock()
+        # Circuit breaker state, per key (shared across instances of one scope)
+        self.scope = scope
+        self._circuits: Dict[str, _Circuit] = (
+            _shared_circuits.setdefault(scope, {}) if scope else {}
+        )
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=50)
 
-    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Send a payload with circuit breaker protection."""
-        async with self._lock:
-            # Check if circuit is open
-            if self.state == CircuitState.OPEN:
-                if time.time() - self.last_failure_time > self.recovery_timeout:
-                    # Move to half-open state to test recovery
-                    self.state = CircuitState.HALF_OPEN
-                    logger.info(
-                        "send_breaker_half_open",
-                        extra={"transport": type(self.wrapped_transport).__name__},
-                    )
-                else:
-                    # Still in open state, short-circuit with error
-                    logger.warning(
-                        "send_breaker_open",
-                        extra={
-                            "transport": type(self.wrapped_transport).__name__,
-                            "reason": "circuit is open",
-                        },
-                    )
-                    raise RuntimeError(
-                        "Circuit breaker is open - temporarily unavailable; retrying soon"
-                    )
-
-            # If in half-open state, allow one request to test recovery
-            if self.state == CircuitState.HALF_OPEN:
-                # Allow this one request, then we'll update state based on result
-                pass
-
-        # Actually send the request (outside lock to avoid blocking other requests)
+    def _key(self, payload: Optional[Dict[str, Any]]) -> str:
+        if self.per_model and payload:
+            return str(payload.get("model") or "*")
+        return "*"
+
+    def _circuit(self, key: str) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits[key] = _Circuit(
+                self.window_seconds, self.window_buckets
+            )
+        return circuit
+
+    @property
+    def state(self) -> CircuitState:
+        """Worst state across this transport's circuits."""
+        states = {c.state for c in self._circuits.values()}
+        for candidate in (CircuitState.OPEN, CircuitState.HALF_OPEN):
+            if candidate in states:
+                return candidate
+        return CircuitState.CLOSED
+
+    def blocks(self, model: Optional[str] = None) -> bool:
+        """True if a request for `model` would currently be rejected."""
+        circuit = self._circuits.get(self._key({"model": model}))
+        if circuit is None:
+            return False
+        if circuit.state == CircuitState.OPEN:
+            return time.time() - circuit.opened_at <= self.recovery_timeout
+        if circuit.state == CircuitState.HALF_OPEN:
+            return circuit.probes >= self.half_open_max_probes
+        return False
+
+    def _transition(self, key: str, circuit: _Circuit, to: CircuitState) -> None:
+        before = circuit.state
+        if before == to:
+            return
+        circuit.state = to
+        self.transitions.append(
+            {
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "key": key,
+                "from": before.value,
+                "to": to.value,
+            }
+        )
         try:
-            result = await self.wrapped_transport.send(payload)
+            from ...utils.metrics import get_metrics
+
+            get_metrics().record_breaker_transition(self.name, key, to.value)
+        except Exception as e:  # metrics must never break a request
+            logger.debug(f"breaker metrics unavailable: {e}")
+
+    def _before_request(self, key: str) -> bool:
+        """Raise if the circuit rejects the call; returns True if it is a half-open probe."""
+        circuit = self._circuit(key)
+        if circuit.state == CircuitState.OPEN:
+            if time.time() - circuit.opened_at > self.recovery_timeout:
+                # Move to half-open state to test recovery
+                self._transition(key, circuit, CircuitState.HALF_OPEN)
+                logger.info(
+                    "send_breaker_half_open",
+                    extra={"transport": self.name, "key": key},
+                )
+            else:
+                # Still in open state, short-circuit with error
+                logger.warning(
+                    "send_breaker_open",
+                    extra={
+                        "transport": self.name,
+                        "key": key,
+                        "reason": "circuit is open",
+                    },
+                )
+                raise RuntimeError(
+                    "Circuit breaker is open - temporarily unavailable; retrying soon"
+                )
+
+        if circuit.state == CircuitState.HALF_OPEN:
+            if circuit.probes >= self.half_open_max_probes:
+                raise RuntimeError(
+                    "Circuit breaker is open - recovery probe in flight; retrying soon"
+                )
+            circuit.probes += 1
+            return True
+        return False
+
+    def _after_request(
+        self,
+        key: str,
+        probe: bool,
+        started: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Record the outcome in the window and move the circuit accordingly."""
+        circuit = self._circuit(key)
+        if probe:
+            circuit.probes = max(0, circuit.probes - 1)
+        latency = time.monotonic() - started
+        ok = error is None
+        slow = (
+            ok
+            and self.slow_call_threshold is not None
+            and latency > self.slow_call_threshold
+        )
+        circuit.window.record(ok, latency, slow)
 
-            # Update circuit breaker state on success
-            async with self._lock:
-                self.total_requests += 1
-                if self.state == CircuitState.HALF_OPEN:
-                    # Success in half-open state means we can close the circuit
-                    self.state = CircuitState.CLOSED
-                    self.failure_count = 0
-                    logger.info(
-                        "send_retry",
-                        extra={
-                            "transport": type(self.wrapped_transport).__name__,
-                            "status": "recovered",
-                        },
-                    )
+        # Only admitted probes decide a HALF_OPEN circuit; a call that started
+        # before it opened says nothing about whether the backend recovered
+        deciding_probe = probe and circuit.state == CircuitState.HALF_OPEN
+        if ok:
+            circuit.consecutive_failures = 0
+            if deciding_probe:
+                # Recovered: start over with a clean window
+                circuit.window.reset()
+                self._transition(key, circuit, CircuitState.CLOSED)
                 logger.info(
-                    "send_success",
-                    extra={"transport": type(self.wrapped_transport).__name__},
+                    "send_retry",
+                    extra={"transport": self.name, "key": key, "status": "recovered"},
                 )
-            return result
+            logger.info("send_success", extra={"transport": self.name})
+            if not slow:
+                return
+        else:
+            circuit.consecutive_failures += 1
+            circuit.last_failure_time = time.time()
 
+        totals = circuit.window.totals()
+        bad_rate = (totals["failures"] + totals["slow"]) / max(totals["requests"], 1)
+        if (
+            deciding_probe
+            or circuit.consecutive_failures >= self.failure_threshold
+            or (
+                totals["requests"] >= self.min_requests
+                and bad_rate >= self.failure_ratio
+            )
+        ):
+            circuit.opened_at = time.time()
+            self._transition(key, circuit, CircuitState.OPEN)
+            logger.warning(
+                "send_breaker_open",
+                extra={
+                    "transport": self.name,
+                    "key": key,
+                    "consecutive_failures": circuit.consecutive_failures,
+                    "failure_rate": bad_rate,
+                    "window_requests": totals["requests"],
+                },
+            )
+        elif error is not None:
+            logger.warning(
+                "send_retry",
+                extra={
+                    "transport": self.name,
+                    "key": key,
+                    "consecutive_failures": circuit.consecutive_failures,
+                    "error": str(error),
+                },
+            )
+
+    def _release_probe(self, key: str, probe: bool) -> None:
+        """Free a half-open probe slot without recording an outcome (cancellation)."""
+        if probe:
+            circuit = self._circuit(key)
+            circuit.probes = max(0, circuit.probes - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-key state and rolling-window totals, plus recent transitions."""
+        return {
+            "name": self.name,
+            "circuits": {
+                key: {
+                    "state": c.state.value,
+                    "consecutive_failures": c.consecutive_failures,
+                    "probes": c.probes,
+                    **c.window.totals(),
+                }
+                for key, c in self._circuits.items()
+            },
+            "transitions": list(self.transitions),
+        }
+
+    def add_outcome_listener(self, listener: OutcomeListener) -> None:
+        """Call `listener` with a RequestOutcome after every request that was let through."""
+        if listener not in self._outcome_listeners:
+            self._outcome_listeners.append(listener)
+
+    def remove_outcome_listener(self, listener: OutcomeListener) -> None:
+        if listener in self._outcome_listeners:
+            self._outcome_listeners.remove(listener)
+
+    def _emit_outcome(
+        self, started: float, error: Optional[BaseException] = None
+    ) -> None:
+        if not self._outcome_listeners:
+            return
+        outcome = RequestOutcome(
+            transport=self.name,
+            ok=error is None,
+            latency=time.monotonic() - started,
+            error=error,
+        )
+        for listener in list(self._outcome_listeners):
+            try:
+                listener(outcome)
+            except Exception as e:
+                logger.warning(f"Outcome listener failed: {e}")
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a payload with circuit breaker protection."""
+        key = self._key(payload)
+        probe = self._before_request(key)
+
+        started = time.monotonic()
+        try:
+            result = await self.wrapped_transport.send(payload)
         except Exception as e:
-            # Update circuit breaker state on failure
-            async with self._lock:
-                self.total_requests += 1
-                self.failed_requests += 1
-                self.failure_count += 1
-                self.last_failure_time = time.time()
-
-                # Calculate failure rate
-                failure_rate = self.failed_requests / max(self.total_requests, 1)
-
-                # Check if we should open the circuit
-                if (
-                    self.failure_count >= self.failure_threshold
-                    or failure_rate >= self.failure_ratio
-                ):
-                    self.state = CircuitState.OPEN
-                    logger.warning(
-                        "send_breaker_open",
-                        extra={
-                            "transport": type(self.wrapped_transport).__name__,
-                            "failure_count": self.failure_count,
-                            "failure_rate": failure_rate,
-                            "total_requests": self.total_requests,
-                            "failed_requests": self.failed_requests,
-                        },
-                    )
-                else:
-                    logger.warning(
-                        "send_retry",
-                        extra={
-                            "transport": type(self.wrapped_transport).__name__,
-                            "failure_count": self.failure_count,
-                            "error": str(e),
-                        },
-                    )
+            self._after_request(key, probe, started, e)
+            self._emit_outcome(started, e)
+            raise e
+        except BaseException:
+            self._release_probe(key, probe)
+            raise
+        self._after_request(key, probe, started)
+        self._emit_outcome(started)
+        return result
 
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream deltas with circuit breaker protection; the outcome is recorded at the end."""
+        key = self._key(payload)
+        probe = self._before_request(key)
+        started = time.monotonic()
+        try:
+            async for delta in self.wrapped_transport.stream(payload):
+                yield delta
+        except Exception as e:
+            self._after_request(key, probe, started, e)
+            self._emit_outcome(started, e)
             raise e
+        except BaseException:
+            self._release_probe(key, probe)
+            raise
+        self._after_request(key, probe, started)
+        self._emit_outcome(started)
 
     async def health_check(self) -> bool:
         """Check health of wrapped transport."""
@@ -149,3 +445,7 @@ class CircuitBreakerTransport(BackendTransport):
     async def stream_events(self) -> List[BaseEvent]:
         """Stream events from wrapped transport."""
         return await self.wrapped_transport.stream_events()
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self.wrapped_transport.aclose()
@@ -0,0 +1,142 @@
+"""Single-flight coalescing of identical in-flight backend requests."""
+
+import asyncio
+import copy
+import logging
+from typing import Any, Dict, List, Optional
+
+from .cache import cache_key, strip_control_keys, transport_identity
+from .transport import BackendTransport, BaseEvent
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One in-flight backend call shared by every caller with the same key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Dict[str, Any]]"):
+        self.task = task
+        self.waiters = 0
+
+
+class CoalescingTransport(BackendTransport):
+    """
+    Transport wrapper that lets concurrent identical `send()` calls share one request.
+
+    The first caller for a key starts the backend call; callers arriving while
+    it is in flight await the same result (or exception). A caller that is
+    cancelled only detaches itself; the shared call is cancelled once nobody is
+    waiting on it. Requests hotter than `max_temperature`, or carrying
+    ``payload["coalesce"] = False``, always go out on their own. Streams are
+    passed through untouched.
+    """
+
+    def __init__(
+        self,
+        wrapped_transport: BackendTransport,
+        max_temperature: float = 0.5,
+        namespace: str = "",
+    ):
+        self.wrapped_transport = wrapped_transport
+        self.max_temperature = max_temperature
+        self.namespace = namespace or transport_identity(wrapped_transport)
+        self._inflight: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.joined = 0
+
+    @property
+    def name(self) -> str:
+        return getattr(
+            self.wrapped_transport, "name", type(self.wrapped_transport).__name__
+        )
+
+    def _key_for(self, payload: Dict[str, Any]) -> Optional[str]:
+        if payload.get("coalesce") is False:
+            return None
+        temperature = payload.get("temperature")
+        if temperature is not None:
+            try:
+                if float(temperature) > self.max_temperature:
+                    return None
+            except (TypeError, ValueError):
+                return None
+        return cache_key(payload, self.namespace)
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the payload, joining an identical request that is already in flight."""
+        key = self._key_for(payload)
+        clean = strip_control_keys(payload)
+        if key is None:
+            return await self.wrapped_transport.send(clean)
+
+        flight = self._inflight.get(key)
+        leader = flight is None
+        if leader:
+            task = asyncio.ensure_future(self.wrapped_transport.send(clean))
+            flight = _Flight(task)
+            self._inflight[key] = flight
+            task.add_done_callback(lambda _t, k=key, f=flight: self._done(k, f))
+            self.leaders += 1
+        else:
+            self.joined += 1
+            self._record_joined()
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+            # Followers get their own copy so no caller can mutate another's reply
+            return result if leader else copy.deepcopy(result)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _done(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        # Retrieve the exception so an abandoned flight doesn't log "never retrieved"
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def _record_joined(self) -> None:
+        try:
+            from ...utils.metrics import get_metrics
+
+            get_metrics().record_coalesced(self.name)
+        except Exception as e:  # metrics must never break a request
+            logger.debug(f"coalesce metrics unavailable: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Counters: requests sent (leaders), callers served by a shared flight, in flight now."""
+        return {
+            "leaders": self.leaders,
+            "joined": self.joined,
+            "inflight": len(self._inflight),
+        }
+
+    async def stream(self, payload: Dict[str, Any]):
+        async for delta in self.wrapped_transport.stream(strip_control_keys(payload)):
+            yield delta
+
+    async def health_check(self) -> bool:
+        return await self.wrapped_transport.health_check()
+
+    async def stream_events(self) -> List[BaseEvent]:
+        return await self.wrapped_transport.stream_events()
+
+    def add_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "add_outcome_listener"):
+            self.wrapped_transport.add_outcome_listener(listener)
+
+    def remove_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "remove_outcome_listener"):
+            self.wrapped_transport.remove_outcome_listener(listener)
+
+    async def aclose(self) -> None:
+        for flight in list(self._inflight.values()):
+            flight.task.cancel()
+        await self.wrapped_transport.aclose()
@@ -0,0 +1,283 @@
+"""Hedged requests: race a delayed duplicate against slow backend calls."""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .transport import BackendTransport, BaseEvent
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeBudget:
+    """
+    Cap on duplicate requests: at most ``burst + ratio * requests`` hedges.
+
+    `ratio`/`burst` left as None are filled in from the first transport that
+    spends from the budget.
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[int] = None):
+        self.ratio = ratio
+        self.burst = burst
+        self.requests = 0
+        self.hedges = 0
+
+    def configure(self, ratio: float, burst: int) -> None:
+        if self.ratio is None:
+            self.ratio = ratio
+        if self.burst is None:
+            self.burst = burst
+
+    def note_request(self) -> None:
+        self.requests += 1
+
+    def try_spend(self) -> bool:
+        if self.hedges >= (self.burst or 0) + (self.ratio or 0.0) * self.requests:
+            return False
+        self.hedges += 1
+        return True
+
+
+_scope_budget: contextvars.ContextVar[Optional[HedgeBudget]] = contextvars.ContextVar(
+    "xsarena_hedge_budget", default=None
+)
+
+
+@contextlib.contextmanager
+def hedge_scope(budget: Optional[HedgeBudget] = None) -> Iterator[HedgeBudget]:
+    """Give calls inside this block (e.g. one job) their own hedge budget."""
+    budget = budget or HedgeBudget()
+    token = _scope_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _scope_budget.reset(token)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    rank = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+async def _cancel(task: Optional["asyncio.Future[Any]"]) -> None:
+    if task is None or task.done():
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await task
+
+
+class HedgingTransport(BackendTransport):
+    """
+    Transport wrapper that sends a duplicate when a request runs unusually long.
+
+    If a `send()` has not completed (or a `stream()` has not produced its first
+    delta) after the hedge delay, the same payload is sent again and whichever
+    answers first wins; the loser is cancelled. The delay is the observed
+    `percentile` latency for the model (`initial_delay` until `min_samples`
+    have been seen), never below `min_delay`. Duplicates are capped by a budget:
+    per job when the caller runs inside `hedge_scope()`, otherwise one shared
+    by this transport. Wrapping a BalancedTransport sends the duplicate to the
+    least-loaded other endpoint, since the primary is outstanding on its own.
+    Over a single bridge endpoint the duplicate would land in the same session
+    as the primary, so the backend factory does not hedge that setup unless
+    asked to explicitly.
+    """
+
+    def __init__(
+        self,
+        wrapped_transport: BackendTransport,
+        percentile: float = 95.0,
+        initial_delay: float = 60.0,
+        min_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200,
+        budget_ratio: float = 0.1,
+        budget_burst: int = 2,
+    ):
+        self.wrapped_transport = wrapped_transport
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self._shared_budget = HedgeBudget(budget_ratio, budget_burst)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.fired = 0
+        self.won = 0
+        self.denied = 0
+
+    @property
+    def name(self) -> str:
+        return getattr(
+            self.wrapped_transport, "name", type(self.wrapped_transport).__name__
+        )
+
+    def _budget(self) -> HedgeBudget:
+        budget = _scope_budget.get() or self._shared_budget
+        budget.configure(self.budget_ratio, self.budget_burst)
+        return budget
+
+    def _observe(self, key: str, latency: float) -> None:
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def hedge_delay(self, key: str) -> float:
+        """Seconds to wait before hedging a request of this kind."""
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return max(self.min_delay, self.initial_delay)
+        return max(self.min_delay, _percentile(list(samples), self.percentile))
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the payload, racing a duplicate if it outlives the hedge delay."""
+        key = f"send:{payload.get('model') or '-'}"
+        budget = self._budget()
+        budget.note_request()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.wrapped_transport.send(payload))
+        hedge: Optional["asyncio.Future[Dict[str, Any]]"] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(key))
+            if not done:
+                if not budget.try_spend():
+                    self.denied += 1
+                    result = await primary
+                    self._observe(key, time.monotonic() - started)
+                    return result
+                self.fired += 1
+                hedge_started = time.monotonic()
+                hedge = asyncio.ensure_future(self.wrapped_transport.send(payload))
+                pending = {primary, hedge}
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None:
+                            if task is hedge:
+                                self.won += 1
+                                self._observe(key, time.monotonic() - hedge_started)
+                            else:
+                                self._observe(key, time.monotonic() - started)
+                            return task.result()
+                # Both failed: surface the primary's error
+                return primary.result()
+            result = primary.result()
+            self._observe(key, time.monotonic() - started)
+            return result
+        finally:
+            await _cancel(primary)
+            await _cancel(hedge)
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream deltas; hedge if the first delta outlives the hedge delay."""
+        key = f"stream:{payload.get('model') or '-'}"
+        budget = self._budget()
+        budget.note_request()
+        started = time.monotonic()
+        primary_gen = self.wrapped_transport.stream(payload).__aiter__()
+        hedge_gen = None
+        primary_first = asyncio.ensure_future(primary_gen.__anext__())
+        hedge_first: Optional["asyncio.Future[str]"] = None
+        winner_gen = primary_gen
+        winner_first = primary_first
+        try:
+            done, _ = await asyncio.wait(
+                {primary_first}, timeout=self.hedge_delay(key)
+            )
+            if not done and budget.try_spend():
+                self.fired += 1
+                hedge_gen = self.wrapped_transport.stream(payload).__aiter__()
+                hedge_first = asyncio.ensure_future(hedge_gen.__anext__())
+                winner_gen, winner_first = await self._race_streams(
+                    primary_gen, primary_first, hedge_gen, hedge_first
+                )
+            elif not done:
+                self.denied += 1
+
+            try:
+                first = await winner_first
+            except StopAsyncIteration:
+                return
+            self._observe(key, time.monotonic() - started)
+            yield first
+            async for delta in winner_gen:
+                yield delta
+        finally:
+            await _cancel(primary_first)
+            await _cancel(hedge_first)
+            for gen in (primary_gen, hedge_gen):
+                if gen is not None:
+                    with contextlib.suppress(Exception):
+                        await gen.aclose()
+
+    async def _race_streams(
+        self,
+        primary_gen: AsyncIterator[str],
+        primary_first: "asyncio.Future[str]",
+        hedge_gen: AsyncIterator[str],
+        hedge_first: "asyncio.Future[str]",
+    ) -> Tuple[AsyncIterator[str], "asyncio.Future[str]"]:
+        """Wait for the first stream to answer; close the other and return the winner."""
+        pending = {primary_first, hedge_first}
+        winner_first = primary_first  # if both fail, surface the primary's error
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # An empty stream (StopAsyncIteration) is a finished answer too
+            answered = [
+                t
+                for t in done
+                if t.exception() is None or isinstance(t.exception(), StopAsyncIteration)
+            ]
+            if answered:
+                winner_first = answered[0]
+                break
+        if winner_first is hedge_first:
+            self.won += 1
+            winner_gen, loser_gen, loser_first = hedge_gen, primary_gen, primary_first
+        else:
+            winner_gen, loser_gen, loser_first = primary_gen, hedge_gen, hedge_first
+        await _cancel(loser_first)
+        with contextlib.suppress(Exception):
+            await loser_gen.aclose()
+        return winner_gen, winner_first
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedges fired/won/denied and the current delay per request kind."""
+        return {
+            "fired": self.fired,
+            "won": self.won,
+            "denied": self.denied,
+            "delays": {
+                key: round(self.hedge_delay(key), 3) for key in self._latencies
+            },
+        }
+
+    async def health_check(self) -> bool:
+        return await self.wrapped_transport.health_check()
+
+    async def stream_events(self) -> List[BaseEvent]:
+        return await self.wrapped_transport.stream_events()
+
+    def add_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "add_outcome_listener"):
+            self.wrapped_transport.add_outcome_listener(listener)
+
+    def remove_outcome_listener(self, listener) -> None:
+        if hasattr(self.wrapped_transport, "remove_outcome_listener"):
+            self.wrapped_transport.remove_outcome_listener(listener)
+
+    async def aclose(self) -> None:
+        await self.wrapped_transport.aclose()
@@ -0,0 +1,275 @@
+"""Shared retry and timeout policy for XSArena transports and the job executor."""
+
+import asyncio
+import email.utils
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackendHTTPError(RuntimeError):
+    """Non-2xx response from a backend, carrying the status and any Retry-After."""
+
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not isinstance(value, str) or not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Retriable failure class ("429", "5xx", "timeout", "connection") or None."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        if status == 429:
+            return "429"
+        if status >= 500:
+            return "5xx"
+        return None
+    name = type(error).__name__
+    if isinstance(error, ConnectionError) or (
+        type(error).__module__.startswith("aiohttp")
+        and ("Connect" in name or name in ("ServerDisconnectedError", "ClientOSError"))
+    ):
+        return "connection"
+    return None
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """Next backoff: uniform between `base` and 3x the previous delay, capped."""
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+class LatencyTracker:
+    """Recent successful-call latencies per key (model), for percentile timeouts."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, key: str, latency: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(latency)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+    def timeout_for(
+        self,
+        key: str,
+        default: float,
+        pct: float = 99.0,
+        multiplier: float = 3.0,
+        floor: float = 10.0,
+        ceiling: Optional[float] = None,
+    ) -> float:
+        """`multiplier` x the `pct` latency for `key`, clamped; `default` until warmed up."""
+        observed = self.percentile(key, pct)
+        if observed is None:
+            return default
+        timeout = max(floor, observed * multiplier)
+        return min(timeout, ceiling) if ceiling else timeout
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            key: {
+                "samples": len(samples),
+                "p50": self.percentile(key, 50),
+                "p95": self.percentile(key, 95),
+                "p99": self.percentile(key, 99),
+            }
+            for key, samples in self._samples.items()
+        }
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries so they cannot amplify an outage.
+
+    Within the last `window_seconds`, retries may not exceed
+    ``min_retries + ratio * requests``.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_retries: int = 10, window_seconds: float = 10.0
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.denied = 0
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        for stamps in (self._requests, self._retries):
+            while stamps and stamps[0] < horizon:
+                stamps.popleft()
+
+    def note_request(self) -> None:
+        now = time.monotonic()
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_retry(self) -> bool:
+        """Spend one retry from the budget; False when it is exhausted."""
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            self.denied += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        return {
+            "requests": len(self._requests),
+            "retries": len(self._retries),
+            "denied": self.denied,
+        }
+
+
+_global_budget = RetryBudget()
+_global_latency = LatencyTracker()
+
+
+def global_retry_budget() -> RetryBudget:
+    return _global_budget
+
+
+def global_latency_tracker() -> LatencyTracker:
+    return _global_latency
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed backend call.
+
+    Retries only retriable failures (see `classify_error`), honours a server's
+    Retry-After (up to `max_retry_after`), otherwise sleeps with decorrelated
+    jitter between `base_delay` and `max_delay`, and draws every retry from a
+    shared RetryBudget.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_retry_after: float = 300.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget or _global_budget
+
+    def is_retriable(self, error: BaseException) -> bool:
+        return classify_error(error) is not None
+
+    def next_delay(
+        self, previous: float, error: Optional[BaseException] = None
+    ) -> float:
+        """Delay before the next attempt: Retry-After if given, else jittered backoff."""
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after >= 0:
+            return min(float(retry_after), self.max_retry_after)
+        return decorrelated_jitter(
+            previous or self.base_delay, self.base_delay, self.max_delay
+        )
+
+    def should_retry(self, attempt: int, error: BaseException) -> bool:
+        """`attempt` is the 1-based number of the attempt that just failed."""
+        if attempt >= self.max_attempts or not self.is_retriable(error):
+            return False
+        return self.budget.try_retry()
+
+    async def run(self, call: Callable[[], Awaitable[T]], label: str = "request") -> T:
+        """Await `call()` and retry it according to this policy."""
+        delay = 0.0
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempt == 1:
+                self.budget.note_request()
+            try:
+                return await call()
+            except Exception as e:
+                if not self.should_retry(attempt, e):
+                    raise
+                delay = self.next_delay(delay, e)
+                logger.info(
+                    f"{label} failed ({classify_error(e)}: {e}); "
+                    f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def stream(
+        self, open_stream: Callable[[], AsyncIterator[str]], label: str = "stream"
+    ) -> AsyncIterator[str]:
+        """Yield from `open_stream()`, retrying per this policy until the first delta."""
+        delay = 0.0
+        attempt = 0
+        self.budget.note_request()
+        while True:
+            attempt += 1
+            yielded = False
+            try:
+                async for delta in open_stream():
+                    yielded = True
+                    yield delta
+                return
+            except Exception as e:
+                # Once output has been handed out the stream cannot be replayed
+                if yielded or not self.should_retry(attempt, e):
+                    raise
+                delay = self.next_delay(delay, e)
+                logger.info(
+                    f"{label} failed ({classify_error(e)}: {e}); "
+                    f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
@@ -1,8 +1,10 @@
 """Transport interface and event models for XSArena backends."""
 
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 from pydantic import BaseModel
 
@@ -76,6 +78,35 @@ class JobCompleted(BaseEvent):
     total_tokens: Optional[int] = None
 
 
+@dataclass
+class BatchResult:
+    """Outcome of one item of a `send_many` batch: its value or the error it raised."""
+
+    index: int
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def default_batch_concurrency(transport: "BackendTransport") -> int:
+    """Per-backend concurrency limit from the project settings (the scheduler's limits)."""
+    inner = transport
+    while getattr(inner, "wrapped_transport", None) is not None:
+        inner = inner.wrapped_transport
+    try:
+        from ..project_config import get_project_settings
+
+        concurrency = get_project_settings().concurrency
+    except Exception:
+        return 2
+    if "OpenRouter" in type(inner).__name__:
+        return concurrency.openrouter
+    return concurrency.bridge
+
+
 class BackendTransport(ABC):
     """Abstract base class for backend transport implementations."""
 
@@ -84,6 +115,57 @@ class BackendTransport(ABC):
         """Send a payload to the backend and return the response."""
         pass
 
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Send a payload and yield the completion text incrementally as deltas.
+
+        Transports without native streaming fall back to a single delta carrying
+        the whole `send()` response.
+        """
+        response = await self.send(payload)
+        content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if content:
+            yield content
+
+    async def send_many(
+        self,
+        payloads: Iterable[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        ordered: bool = True,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Send independent payloads concurrently and yield a BatchResult for each.
+
+        At most `concurrency` requests are in flight (default: the project's
+        per-backend limit). With `ordered`, results come back in input order as
+        soon as each prefix is complete; otherwise as they finish. An item that
+        fails yields its exception instead of aborting the batch. Closing the
+        iterator early cancels the items still pending.
+        """
+        payloads = list(payloads)
+        limit = max(1, concurrency or default_batch_concurrency(self))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def one(index: int, payload: Dict[str, Any]) -> BatchResult:
+            async with semaphore:
+                try:
+                    return BatchResult(index, await self.send(payload))
+                except Exception as e:
+                    return BatchResult(index, error=e)
+
+        tasks = [asyncio.ensure_future(one(i, p)) for i, p in enumerate(payloads)]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield await task
+            else:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     @abstractmethod
     async def health_check(self) -> bool:
         """Check if the backend is healthy and responsive."""
@@ -93,3 +175,13 @@ class BackendTransport(ABC):
     async def stream_events(self) -> List[BaseEvent]:
         """Stream events from the backend."""
         pass
+
+    async def aclose(self) -> None:
+        """Release pooled resources (HTTP sessions, connectors). Safe to call twice."""
+        return None
+
+    async def __aenter__(self) -> "BackendTransport":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
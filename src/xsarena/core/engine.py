@@ -1,8 +1,8 @@
 """New engine implementation for XSArena using the v3 architecture."""
 
-from typing import Callable, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
 
-from .backends.transport import BackendTransport
+from .backends.transport import BackendTransport, BatchResult
 from .state import SessionState
 from .v2_orchestrator.orchestrator import Orchestrator
 
@@ -16,11 +16,12 @@ class Engine:
         self.orchestrator = Orchestrator(transport=backend)
         self.redaction_filter: Optional[Callable[[str], str]] = None
 
-    async def send_and_collect(
-        self, user_prompt: str, system_prompt: Optional[str] = None
-    ) -> str:
-        """Send a message and collect the response."""
-        # Prepare the payload
+    def _build_payload(
+        self,
+        user_prompt: str,
+        system_prompt: Optional[str] = None,
+        cache: bool = False,
+    ) -> Dict[str, Any]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
@@ -30,11 +31,11 @@ class Engine:
             "messages": messages,
             "model": getattr(self.state, "model", "default"),
         }
+        if cache:
+            payload["cache"] = True
+        return payload
 
-        # Send using the backend transport
-        response = await self.backend.send(payload)
-
-        # Extract the content from the response
+    def _extract_content(self, response: Dict[str, Any]) -> str:
         choices = response.get("choices", [])
         if choices:
             content = choices[0].get("message", {}).get("content", "")
@@ -45,10 +46,47 @@ class Engine:
         else:
             return "No response from backend"
 
+    async def send_and_collect(
+        self, user_prompt: str, system_prompt: Optional[str] = None, cache: bool = False
+    ) -> str:
+        """Send a message and collect the response.
+
+        `cache=True` lets the response cache serve a repeat of the same
+        request; use it only where the same input should yield the same text.
+        """
+        response = await self.backend.send(
+            self._build_payload(user_prompt, system_prompt, cache)
+        )
+        return self._extract_content(response)
+
+    async def send_many(
+        self,
+        user_prompts: Iterable[str],
+        system_prompt: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        ordered: bool = True,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Send independent prompts concurrently; yield results with the reply text.
+
+        See `BackendTransport.send_many` for ordering, concurrency and errors.
+        """
+        payloads = [self._build_payload(p, system_prompt) for p in user_prompts]
+        async for result in self.backend.send_many(
+            payloads, concurrency=concurrency, ordered=ordered
+        ):
+            if result.ok:
+                result.value = self._extract_content(result.value)
+            yield result
+
     async def send(self, user_prompt: str, system_prompt: Optional[str] = None):
         """Send a message (async generator for streaming if needed)."""
         return await self.send_and_collect(user_prompt, system_prompt)
 
+    async def aclose(self) -> None:
+        """Close the backend transport and its pooled connections."""
+        await self.backend.aclose()
+
     def set_redaction_filter(self, filter_func: Optional[Callable[[str], str]]):
         """Set a redaction filter function."""
         self.redaction_filter = filter_func
@@ -0,0 +1,178 @@
+"""Adaptive (AIMD) per-backend admission limits for the job scheduler."""
+
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class AdaptiveLimit:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit for one backend.
+
+    The limit starts at the configured ceiling. Overload signals (429, 5xx,
+    timeouts) multiply it by `decrease_factor`; a latency EWMA that drifts past
+    `latency_tolerance` times the best latency seen multiplies it by
+    `latency_decrease_factor` (that baseline creeps up by `baseline_drift` per
+    sample). After a full window of healthy requests (as many as the current
+    limit) it grows by one, never above the ceiling. Decreases are
+    rate-limited by `cooldown` so one overload episode only counts once.
+    """
+
+    def __init__(
+        self,
+        ceiling: int,
+        floor: int = 1,
+        decrease_factor: float = 0.5,
+        latency_decrease_factor: float = 0.8,
+        latency_tolerance: float = 3.0,
+        cooldown: float = 10.0,
+        ewma_alpha: float = 0.2,
+        min_samples: int = 5,
+        baseline_drift: float = 0.01,
+    ):
+        self.ceiling = max(1, ceiling)
+        self.floor = max(1, min(floor, self.ceiling))
+        self.limit = self.ceiling
+        self.decrease_factor = decrease_factor
+        self.latency_decrease_factor = latency_decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        self.min_samples = min_samples
+        self.baseline_drift = baseline_drift
+        self.latency_ewma: Optional[float] = None
+        self.latency_best: Optional[float] = None
+        self._samples = 0
+        self._healthy_in_window = 0
+        self._last_decrease = 0.0
+
+    def set_ceiling(self, ceiling: int) -> None:
+        """Apply a new configured ceiling (the limit is clamped to it)."""
+        self.ceiling = max(1, ceiling)
+        self.floor = min(self.floor, self.ceiling)
+        self.limit = min(self.limit, self.ceiling)
+
+    def on_success(self, latency: float) -> Optional[str]:
+        """Record a successful request; returns the decision reason if the limit changed."""
+        self._samples += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.ewma_alpha * (latency - self.latency_ewma)
+        if self.latency_best is None:
+            self.latency_best = self.latency_ewma
+        else:
+            # The baseline drifts up slowly so a backend that is permanently
+            # slower is eventually accepted as the new normal.
+            self.latency_best = min(
+                self.latency_ewma, self.latency_best * (1 + self.baseline_drift)
+            )
+
+        if (
+            self._samples >= self.min_samples
+            and self.latency_ewma > self.latency_best * self.latency_tolerance
+        ):
+            return self._decrease(self.latency_decrease_factor, "latency")
+
+        self._healthy_in_window += 1
+        if self._healthy_in_window >= self.limit and self.limit < self.ceiling:
+            self._healthy_in_window = 0
+            self.limit += 1
+            return "healthy"
+        return None
+
+    def on_overload(self, reason: str) -> Optional[str]:
+        """Record an overload signal; returns the decision reason if the limit changed."""
+        return self._decrease(self.decrease_factor, reason)
+
+    def _decrease(self, factor: float, reason: str) -> Optional[str]:
+        self._healthy_in_window = 0
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return None
+        new_limit = max(self.floor, math.floor(self.limit * factor))
+        self._last_decrease = now
+        if new_limit == self.limit:
+            return None
+        self.limit = new_limit
+        return reason
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "ceiling": self.ceiling,
+            "latency_ewma": (
+                round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+            ),
+            "latency_best": (
+                round(self.latency_best, 3) if self.latency_best is not None else None
+            ),
+        }
+
+
+class AdmissionController:
+    """Adaptive limits for every backend, with a bounded history of decisions."""
+
+    def __init__(
+        self,
+        ceiling_for: Callable[[str], int],
+        enabled: bool = True,
+        history_size: int = 50,
+        **limit_kwargs: Any,
+    ):
+        self._ceiling_for = ceiling_for
+        self.enabled = enabled
+        self._limit_kwargs = limit_kwargs
+        self._limits: Dict[str, AdaptiveLimit] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+
+    def _get(self, backend: str) -> AdaptiveLimit:
+        lim = self._limits.get(backend)
+        if lim is None:
+            lim = AdaptiveLimit(self._ceiling_for(backend), **self._limit_kwargs)
+            self._limits[backend] = lim
+        return lim
+
+    def limit(self, backend: str) -> int:
+        """Current admission limit for a backend (the ceiling when disabled)."""
+        if not self.enabled:
+            return self._ceiling_for(backend)
+        return self._get(backend).limit
+
+    def record(
+        self,
+        backend: str,
+        ok: bool,
+        latency: float,
+        overload: Optional[str] = None,
+    ) -> bool:
+        """Feed one request outcome; returns True if the backend's limit grew."""
+        if not self.enabled:
+            return False
+        lim = self._get(backend)
+        before = lim.limit
+        if ok:
+            reason = lim.on_success(latency)
+        elif overload:
+            reason = lim.on_overload(overload)
+        else:
+            # Errors that say nothing about load (bad request, parse errors)
+            return False
+        if reason is not None:
+            self.history.append(
+                {
+                    "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "backend": backend,
+                    "from": before,
+                    "to": lim.limit,
+                    "reason": reason,
+                }
+            )
+        return lim.limit > before
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {backend: lim.snapshot() for backend, lim in self._limits.items()}
+
+    def decisions(self) -> List[Dict[str, Any]]:
+        return list(self.history)
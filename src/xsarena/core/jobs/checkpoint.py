@@ -0,0 +1,57 @@
+"""Per-job resume checkpoint for XSArena v0.3."""
+
+import hashlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+def tail_digest(data: bytes) -> str:
+    """Hash used to recognise the last committed chunk in the output file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """
+    Where a job's output stood after its last committed chunk.
+
+    `out_offset` is the output file size right after the chunk was committed;
+    `tail_len`/`tail_sha256` describe the bytes of that chunk (ending at
+    `out_offset`) so resume can check the file still matches before trusting
+    the offset.
+    """
+
+    chunk_idx: int
+    out_offset: int
+    tail_len: int
+    tail_sha256: str
+    hint: Optional[str] = None
+    updated_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Checkpoint":
+        return cls(
+            chunk_idx=int(data["chunk_idx"]),
+            out_offset=int(data["out_offset"]),
+            tail_len=int(data["tail_len"]),
+            tail_sha256=str(data["tail_sha256"]),
+            hint=data.get("hint"),
+            updated_at=str(data.get("updated_at", "")),
+        )
+
+    def matches_output(self, out_path: Union[str, Path]) -> bool:
+        """True if the committed bytes of the output file are as recorded."""
+        p = Path(out_path)
+        try:
+            if p.stat().st_size < self.out_offset:
+                return False
+            with open(p, "rb") as f:
+                f.seek(self.out_offset - self.tail_len)
+                tail = f.read(self.tail_len)
+        except (OSError, ValueError):
+            return False
+        return len(tail) == self.tail_len and tail_digest(tail) == self.tail_sha256
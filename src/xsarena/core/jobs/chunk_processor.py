@@ -4,7 +4,6 @@ import asyncio
 import time
 import uuid
 from datetime import datetime
-from pathlib import Path
 from typing import Awaitable, Callable, Dict, Optional
 
 from ...utils.token_estimator import chars_to_tokens_approx, tokens_to_chars_approx
@@ -17,6 +16,8 @@ from .model import JobV3, get_user_friendly_error_message, map_exception_to_erro
 # Import from new modules
 from .processing.extension_handler import perform_micro_extension
 from .processing.metrics_tracker import apply_lossless_metrics_and_compression
+from .processing.output_tail import OutputTail
+from .processing.stream_writer import NextTrailerFilter, StreamingChunkWriter
 from .store import JobStore
 
 
@@ -47,6 +48,8 @@ class ChunkProcessor:
         max_chunks: int = 1,
         watchdog_secs: int = 300,
         max_retries: int = 3,
+        output_tail: Optional[OutputTail] = None,
+        stream_writer: Optional[StreamingChunkWriter] = None,
     ):
         """Process a single chunk with the given transport and callbacks."""
 
@@ -88,18 +91,19 @@ class ChunkProcessor:
         # For chunk_idx > 1, get a local anchor from current file tail
         anchor = None
         if chunk_idx > 1:
-            out_path = (
-                job.run_spec.out_path
-                or f"./books/{job.run_spec.subject.replace(' ', '_')}.final.md"
-            )
-            if Path(out_path).exists():
+            if output_tail is None:
+                out_path = (
+                    job.run_spec.out_path
+                    or f"./books/{job.run_spec.subject.replace(' ', '_')}.final.md"
+                )
+                output_tail = OutputTail.from_file(out_path)
+            if output_tail.text:
                 try:
-                    content = Path(out_path).read_text(encoding="utf-8")
                     use_semantic = session_state and getattr(
                         session_state, "semantic_anchor_enabled", False
                     )
                     anchor = await create_anchor(
-                        content, use_semantic=use_semantic, transport=transport
+                        output_tail.text, use_semantic=use_semantic, transport=transport
                     )
                 except Exception:
                     anchor = None
@@ -145,9 +149,8 @@ class ChunkProcessor:
         }
 
         try:
-            response = await transport.send(payload)
-            content = (
-                response.get("choices", [{}])[0].get("message", {}).get("content", "")
+            content = await self._stream_chunk(
+                transport, payload, job, chunk_idx, stream_writer
             )
 
             # Strip NEXT: lines from content and extract hint
@@ -197,6 +200,7 @@ class ChunkProcessor:
                 resume_events=self.resume_events,
                 job_store=self.job_store,
                 ctl_lock=self._ctl_lock,
+                output_tail=output_tail,
             )
 
             # Check if the extension was cancelled
@@ -249,6 +253,47 @@ class ChunkProcessor:
             )
             raise
 
+    async def _stream_chunk(
+        self,
+        transport: BackendTransport,
+        payload: Dict,
+        job: JobV3,
+        chunk_idx: int,
+        stream_writer: Optional[StreamingChunkWriter] = None,
+    ) -> str:
+        """Stream the chunk's completion, writing deltas to the output as they arrive."""
+        trailer = NextTrailerFilter()
+        parts = []
+        started = time.time()
+        if stream_writer is not None:
+            stream_writer.begin(chunk_idx)
+
+        try:
+            async for delta in transport.stream(payload):
+                if not delta:
+                    continue
+                if not parts:
+                    self.job_store._log_event(
+                        job.id,
+                        {
+                            "type": "first_token",
+                            "chunk_idx": chunk_idx,
+                            "ttft_seconds": round(time.time() - started, 3),
+                        },
+                    )
+                parts.append(delta)
+                if stream_writer is not None:
+                    stream_writer.write(trailer.feed(delta))
+        except BaseException:
+            if stream_writer is not None:
+                stream_writer.close()
+            raise
+
+        if stream_writer is not None:
+            stream_writer.write(trailer.flush())
+            stream_writer.flush()
+        return "".join(parts)
+
     async def _extend_if_needed(
         self,
         content: str,
@@ -0,0 +1,178 @@
+"""Group-commit writer for a job's events.jsonl."""
+
+import asyncio
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Union
+
+# Durability policies: fsync after every event, at chunk boundaries, or every N ms
+FSYNC_POLICIES = ("event", "chunk", "interval")
+
+# Events that close out a unit of work; the "chunk" policy fsyncs on these
+BOUNDARY_EVENTS = frozenset(
+    {
+        "chunk_done",
+        "job_completed",
+        "job_failed",
+        "job_cancelled",
+        "job_paused",
+        "job_ended",
+    }
+)
+
+_OPEN_WRITERS: "weakref.WeakSet[EventLogWriter]" = weakref.WeakSet()
+
+
+class EventLogWriter:
+    """
+    Append events to one events.jsonl through a single file handle.
+
+    Outside an event loop each event is written synchronously. Inside a loop,
+    events are queued and a background task writes them in batches on a worker
+    thread, so neither the write nor the fsync blocks the loop. Events that
+    arrive together share one write and at most one fsync (group commit).
+
+    The fsync policy decides when written data is made durable:
+    ``event`` after every batch, ``chunk`` when a batch contains a chunk or job
+    boundary event, ``interval`` at most every ``interval_ms``. `close` always
+    writes and fsyncs whatever is pending.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        policy: str = "chunk",
+        interval_ms: int = 200,
+    ):
+        if policy not in FSYNC_POLICIES:
+            raise ValueError(
+                f"Unknown fsync policy '{policy}' (expected one of {', '.join(FSYNC_POLICIES)})"
+            )
+        self.path = Path(path)
+        self.policy = policy
+        self.interval = max(0, interval_ms) / 1000.0
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._boundary_pending = False
+        self._fh: Optional[TextIO] = None
+        self._dirty = False  # written to the OS but not yet fsynced
+        self._last_sync = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        _OPEN_WRITERS.add(self)
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Queue an event; it is written immediately when no loop is running."""
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            self._pending.append(line)
+            if event.get("type") in BOUNDARY_EVENTS:
+                self._boundary_pending = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._commit()
+            return
+        self._ensure_task(loop)
+        self._wake.set()
+
+    def flush(self, sync: bool = False) -> None:
+        """Write pending events now (and fsync them if `sync`)."""
+        self._commit(force_sync=sync)
+
+    def close(self) -> None:
+        """Write and fsync pending events, then close the file handle."""
+        self._commit(force_sync=True)
+        with self._lock:
+            if self._fh is not None:
+                with contextlib.suppress(OSError):
+                    self._fh.close()
+                self._fh = None
+
+    async def aclose(self) -> None:
+        """Stop the background writer and close without blocking the loop."""
+        task = self._task
+        if task is not None and not task.done():
+            try:
+                same_loop = task.get_loop() is asyncio.get_running_loop()
+            except RuntimeError:
+                same_loop = False
+            if same_loop:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._task = None
+        await asyncio.to_thread(self.close)
+
+    def _ensure_task(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._task = loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while True:
+            timeout = None
+            if self.policy == "interval" and self._dirty:
+                timeout = max(0.0, self.interval - (time.monotonic() - self._last_sync))
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            self._wake.clear()
+            await asyncio.to_thread(self._commit)
+            if not self._pending and not self._dirty:
+                # Idle; the next append starts a new drain task
+                return
+
+    def _open(self) -> TextIO:
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            torn = False
+            if self.path.exists() and self.path.stat().st_size > 0:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            # Held open across appends on purpose; close() releases it
+            self._fh = open(self.path, "a", encoding="utf-8")  # noqa: SIM115
+            if torn:
+                # A crash mid-write left a partial line; start ours on a fresh one
+                self._fh.write("\n")
+        return self._fh
+
+    def _commit(self, force_sync: bool = False) -> None:
+        with self._lock:
+            lines, self._pending = self._pending, []
+            boundary, self._boundary_pending = self._boundary_pending, False
+            if lines:
+                fh = self._open()
+                fh.write("".join(lines))
+                fh.flush()
+                self._dirty = True
+            if not self._dirty:
+                return
+            now = time.monotonic()
+            if (
+                force_sync
+                or self.policy == "event"
+                or (self.policy == "chunk" and boundary)
+                or (self.policy == "interval" and now - self._last_sync >= self.interval)
+            ):
+                with contextlib.suppress(OSError):
+                    os.fsync(self._fh.fileno())
+                self._dirty = False
+                self._last_sync = now
+
+
+@atexit.register
+def _close_open_writers() -> None:
+    """Make pending events durable on interpreter exit."""
+    for writer in list(_OPEN_WRITERS):
+        with contextlib.suppress(Exception):
+            writer.close()
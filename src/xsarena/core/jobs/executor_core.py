@@ -1,19 +1,27 @@
 """Job execution layer for XSArena v0.3."""
 
 import asyncio
-import contextlib
-import os
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Awaitable, Callable, Dict, Optional
 
+from ..backends.bridge_v2 import request_lane
+from ..backends.cache import no_cache
+from ..backends.hedge import hedge_scope
+from ..backends.retry import RetryPolicy
 from ..backends.transport import BackendTransport, BaseEvent
+from .checkpoint import Checkpoint, tail_digest
 from .chunk_processor import ChunkProcessor
 from .model import JobV3, get_user_friendly_error_message, map_exception_to_error_code
+from .processing.output_tail import OutputTail
+from .processing.stream_writer import StreamingChunkWriter, truncate_to
 from .store import JobStore
 
+# Error codes that fail the job at once instead of being retried
+NON_RETRIABLE_ERRORS = frozenset({"auth_error", "invalid_config", "quota_exceeded"})
+
 
 class JobExecutor:
     """Encapsulates job execution logic (single-job run loop)."""
@@ -36,6 +44,23 @@ class JobExecutor:
         resume_event: asyncio.Event,
     ):
         """Execute a job with the given transport and callbacks."""
+        # Chunks are never served from the response cache: retries and
+        # regenerations resend the same prompt and need a fresh completion.
+        # Each job also gets its own hedge budget, and queues in the bridge's
+        # batch lane behind interactive requests.
+        with no_cache(), hedge_scope(), request_lane("batch"):
+            return await self._run(
+                job, transport, on_event, control_queue, resume_event
+            )
+
+    async def _run(
+        self,
+        job: JobV3,
+        transport: BackendTransport,
+        on_event: Callable[[BaseEvent], Awaitable[None]],
+        control_queue: asyncio.Queue,
+        resume_event: asyncio.Event,
+    ):
         # Update job state to RUNNING
         job.state = "RUNNING"
         job.updated_at = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
@@ -58,6 +83,42 @@ class JobExecutor:
         )
         Path(out_path).parent.mkdir(parents=True, exist_ok=True)
 
+        # Resume from the checkpoint sidecar when it still matches the output;
+        # anything written past its offset is a partial chunk and is dropped.
+        checkpoint = self.job_store.load_checkpoint(job.id)
+        if checkpoint is not None:
+            if checkpoint.matches_output(out_path):
+                dropped = truncate_to(out_path, checkpoint.out_offset)
+                if dropped:
+                    self.job_store._log_event(
+                        job.id,
+                        {
+                            "type": "partial_chunk_truncated",
+                            "chunk_idx": checkpoint.chunk_idx + 1,
+                            "bytes": dropped,
+                        },
+                    )
+            else:
+                self.job_store._log_event(
+                    job.id,
+                    {"type": "checkpoint_mismatch", "chunk_idx": checkpoint.chunk_idx},
+                )
+                checkpoint = None
+        resume_from = (
+            checkpoint.chunk_idx
+            if checkpoint is not None
+            else self.job_store._scan_last_completed_chunk(job.id)
+        )
+
+        # Keep the output tail in memory so anchors don't re-read the whole book;
+        # on resume only the last few KB of the file are read.
+        output_tail = OutputTail.from_file(out_path)
+        # Streams each chunk into the output file and commits the final text
+        stream_writer = StreamingChunkWriter(
+            out_path,
+            committed_offset=checkpoint.out_offset if checkpoint is not None else None,
+        )
+
         # Extract run parameters from spec
         resolved = job.run_spec.resolved()
 
@@ -72,19 +133,31 @@ class JobExecutor:
 
         max_chunks = resolved["chunks"]
         watchdog_secs = getattr(job.run_spec, "timeout", 300)
-        max_retries = 3  # TODO: Make configurable
+        max_retries = getattr(job.run_spec, "max_retries", 3)
+        backoff_base = getattr(job.run_spec, "retry_backoff_base", 2.0)
+        backoff_max = getattr(job.run_spec, "retry_backoff_max", 60.0)
+
+        # Progress shared between attempts: the chunk being worked on and the
+        # last chunk whose output was written (the resume checkpoint).
+        progress = {"current_chunk": 0, "last_done": 0}
 
         async def on_chunk(idx: int, body: str, hint: Optional[str] = None):
             """Callback for when a chunk is completed."""
-            with open(out_path, "a", encoding="utf-8") as f:
-                if f.tell() == 0 or idx == 1:
-                    f.write(body)
-                else:
-                    f.write(("" if body.startswith("\n") else "\n\n") + body)
-                # Add flush/fsync for durability
-                f.flush()
-                with contextlib.suppress(Exception):
-                    os.fsync(f.fileno())
+            # Replace the streamed preview with the final body (flushed and fsynced)
+            text = stream_writer.commit(idx, body)
+            output_tail.append(text)
+            progress["last_done"] = idx
+            committed = stream_writer.last_commit_bytes
+            self.job_store.save_checkpoint(
+                job.id,
+                Checkpoint(
+                    chunk_idx=idx,
+                    out_offset=stream_writer.committed_offset,
+                    tail_len=len(committed),
+                    tail_sha256=tail_digest(committed),
+                    hint=hint,
+                ),
+            )
 
             # Log chunk completion
             self.job_store._log_event(
@@ -127,37 +200,45 @@ class JobExecutor:
                     session_state, "repetition_threshold", repetition_threshold
                 )
 
-            # Determine starting chunk index (resume from last completed + 1, or start from 1)
+            # Determine starting chunk index (resume from last completed + 1, or start from 1).
+            # This also runs on retries so that work already written is never regenerated.
             start_chunk_idx = 1
-            if job.state == "PENDING":  # If resuming, check for completed chunks
-                last_completed = self.job_store._get_last_completed_chunk(job.id)
-                if last_completed > 0:
-                    start_chunk_idx = last_completed + 1
-                    # Log that we're resuming from a specific chunk
-                    self.job_store._log_event(
-                        job.id,
-                        {
-                            "type": "resume_from_chunk",
-                            "last_completed_chunk": last_completed,
-                            "starting_chunk": start_chunk_idx,
-                        },
-                    )
+            last_completed = max(progress["last_done"], resume_from)
+            if last_completed > 0:
+                start_chunk_idx = last_completed + 1
+                progress["last_done"] = last_completed
+                # Log that we're resuming from a specific chunk
+                self.job_store._log_event(
+                    job.id,
+                    {
+                        "type": "resume_from_chunk",
+                        "last_completed_chunk": last_completed,
+                        "starting_chunk": start_chunk_idx,
+                    },
+                )
 
             # This would integrate with the new autopilot FSM
             # For now, we'll simulate the process with anchored continuation and micro-extends
             for chunk_idx in range(start_chunk_idx, max_chunks + 1):
-                # Process the chunk using the chunk processor
-                result = await self.chunk_processor.process_chunk(
-                    chunk_idx=chunk_idx,
-                    job=job,
-                    transport=transport,
-                    on_event=on_event,
-                    resolved=resolved,
-                    repetition_threshold=repetition_threshold,
-                    session_state=self._get_session_state(job),
-                    max_chunks=max_chunks,
-                    watchdog_secs=watchdog_secs,
-                    max_retries=max_retries,
+                progress["current_chunk"] = chunk_idx
+                # Process the chunk using the chunk processor; the watchdog
+                # deadline applies to each chunk rather than the whole job.
+                result = await asyncio.wait_for(
+                    self.chunk_processor.process_chunk(
+                        chunk_idx=chunk_idx,
+                        job=job,
+                        transport=transport,
+                        on_event=on_event,
+                        resolved=resolved,
+                        repetition_threshold=repetition_threshold,
+                        session_state=self._get_session_state(job),
+                        max_chunks=max_chunks,
+                        watchdog_secs=watchdog_secs,
+                        max_retries=max_retries,
+                        output_tail=output_tail,
+                        stream_writer=stream_writer,
+                    ),
+                    timeout=watchdog_secs,
                 )
 
                 # Check if job was cancelled
@@ -169,161 +250,211 @@ class JobExecutor:
 
                 await on_chunk(chunk_idx, extended_content, next_hint)
 
-        # Run with retry logic
-        attempt = 0
-        while True:
-            try:
-                await asyncio.wait_for(_do_run(), timeout=watchdog_secs)
-
-                # Mark job as completed
-                job.artifacts["final"] = out_path
-                job.state = "DONE"
-
-                # Emit job completed event
-                job_completed_event = {
-                    "event_id": str(uuid.uuid4()),
-                    "timestamp": time.time(),
-                    "job_id": job.id,
-                    "result_path": out_path,
-                    "total_chunks": max_chunks,
-                }
-                await on_event(BaseEvent(**job_completed_event))
-
-                self.job_store._log_event(
-                    job.id,
-                    {
-                        "type": "job_completed",
-                        "final": out_path,
-                        "total_chunks": max_chunks,
-                    },
-                )
-                break
-            except asyncio.TimeoutError:
-                error_code = "transport_timeout"
-                user_message = get_user_friendly_error_message(error_code)
-
-                self.job_store._log_event(
-                    job.id,
-                    {
-                        "type": "watchdog_timeout",
-                        "timeout_seconds": watchdog_secs,
-                    },
-                )
-
-                # Classify non-retriable errors
-                non_retriable_set = {"auth_error", "invalid_config", "quota_exceeded"}
-                is_retriable = error_code not in non_retriable_set
-
-                # Log the retry decision to events.jsonl
-                self.job_store._log_event(
-                    job.id,
-                    {
-                        "type": "retry_decision",
-                        "error_code": error_code,
-                        "is_retriable": is_retriable,
-                        "retry_planned": is_retriable and attempt < max_retries,
-                        "attempt": attempt,
-                        "max_retries": max_retries,
-                    },
-                )
-
-                if is_retriable and attempt < max_retries:
-                    attempt += 1
-                    self.job_store._log_event(
-                        job.id, {"type": "retry", "attempt": attempt}
-                    )
-                    await asyncio.sleep(2**attempt)  # Exponential backoff
-                    continue
-                else:
-                    job.state = "FAILED"
-                    job_failed_event = {
+        # Decorrelated jitter between job retries, or the backend's Retry-After
+        # when it sent one. Every retry is drawn from the shared retry budget.
+        retry_policy = RetryPolicy(
+            max_attempts=max_retries + 1, base_delay=backoff_base, max_delay=backoff_max
+        )
+        last_delay = {"seconds": 0.0}
+
+        def _backoff(error: Optional[BaseException] = None) -> float:
+            delay = retry_policy.next_delay(last_delay["seconds"], error)
+            last_delay["seconds"] = delay
+            return delay
+
+        # Run with retry logic. Retries resume from the last completed chunk, and
+        # the retry budget is per chunk: it resets once a retry makes progress.
+        try:
+            attempt = 0
+            failed_at = None
+            while True:
+                try:
+                    await _do_run()
+
+                    # Mark job as completed
+                    job.artifacts["final"] = out_path
+                    job.state = "DONE"
+
+                    # Emit job completed event
+                    job_completed_event = {
                         "event_id": str(uuid.uuid4()),
                         "timestamp": time.time(),
                         "job_id": job.id,
-                        "error_message": "watchdog timeout",
-                        "error_code": error_code,
-                        "user_message": user_message,
+                        "result_path": out_path,
+                        "total_chunks": max_chunks,
                     }
-                    await on_event(BaseEvent(**job_failed_event))
+                    await on_event(BaseEvent(**job_completed_event))
 
                     self.job_store._log_event(
                         job.id,
                         {
-                            "type": "job_failed",
-                            "error": "watchdog timeout",
-                            "error_code": error_code,
-                            "user_message": user_message,
+                            "type": "job_completed",
+                            "final": out_path,
+                            "total_chunks": max_chunks,
                         },
                     )
                     break
-            except Exception as ex:
-                error_code = map_exception_to_error_code(ex)
-                user_message = get_user_friendly_error_message(error_code)
+                except asyncio.TimeoutError:
+                    error_code = "transport_timeout"
+                    user_message = get_user_friendly_error_message(error_code)
+
+                    self.job_store._log_event(
+                        job.id,
+                        {
+                            "type": "watchdog_timeout",
+                            "chunk_idx": progress["current_chunk"],
+                            "timeout_seconds": watchdog_secs,
+                        },
+                    )
 
-                # Classify non-retriable errors
-                non_retriable_set = {"auth_error", "invalid_config", "quota_exceeded"}
-                is_retriable = error_code not in non_retriable_set
+                    if failed_at != progress["last_done"]:
+                        attempt = 0
+                        failed_at = progress["last_done"]
+                        last_delay["seconds"] = 0.0
 
-                # Log the retry decision to events.jsonl
-                self.job_store._log_event(
-                    job.id,
-                    {
-                        "type": "retry_decision",
-                        "error_code": error_code,
-                        "is_retriable": is_retriable,
-                        "retry_planned": is_retriable and attempt < max_retries,
-                        "attempt": attempt,
-                        "max_retries": max_retries,
-                    },
-                )
+                    # Classify non-retriable errors
+                    is_retriable = error_code not in NON_RETRIABLE_ERRORS
+                    retry_planned = is_retriable and attempt < max_retries
+                    # When jobs everywhere are failing, the budget runs out and
+                    # they fail instead of piling retries onto a sick backend
+                    budget_exhausted = retry_planned and not retry_policy.budget.try_retry()
+                    retry_planned = retry_planned and not budget_exhausted
 
-                if is_retriable and attempt < max_retries:
-                    attempt += 1
+                    # Log the retry decision to events.jsonl
                     self.job_store._log_event(
                         job.id,
                         {
-                            "type": "retry",
-                            "attempt": attempt,
-                            "error": str(ex),
+                            "type": "retry_decision",
                             "error_code": error_code,
-                            "user_message": user_message,
+                            "is_retriable": is_retriable,
+                            "retry_planned": retry_planned,
+                            "budget_exhausted": budget_exhausted,
+                            "attempt": attempt,
+                            "max_retries": max_retries,
                         },
                     )
-                    await asyncio.sleep(2**attempt)  # Exponential backoff
-                    continue
-                else:
-                    job.state = "FAILED"
-                    job_failed_event = {
-                        "event_id": str(uuid.uuid4()),
-                        "timestamp": time.time(),
-                        "job_id": job.id,
-                        "error_message": str(ex),
-                        "error_code": error_code,
-                        "user_message": user_message,
-                    }
-                    await on_event(BaseEvent(**job_failed_event))
 
+                    if retry_planned:
+                        attempt += 1
+                        self.job_store._log_event(
+                            job.id,
+                            {
+                                "type": "retry",
+                                "attempt": attempt,
+                                "chunk_idx": progress["current_chunk"],
+                                "resume_from_chunk": progress["last_done"] + 1,
+                            },
+                        )
+                        await asyncio.sleep(_backoff())
+                        continue
+                    else:
+                        if budget_exhausted:
+                            error_code = "retry_budget_exhausted"
+                            user_message = get_user_friendly_error_message(error_code)
+                        job.state = "FAILED"
+                        job_failed_event = {
+                            "event_id": str(uuid.uuid4()),
+                            "timestamp": time.time(),
+                            "job_id": job.id,
+                            "error_message": "watchdog timeout",
+                            "error_code": error_code,
+                            "user_message": user_message,
+                        }
+                        await on_event(BaseEvent(**job_failed_event))
+
+                        self.job_store._log_event(
+                            job.id,
+                            {
+                                "type": "job_failed",
+                                "error": "watchdog timeout",
+                                "error_code": error_code,
+                                "user_message": user_message,
+                            },
+                        )
+                        break
+                except Exception as ex:
+                    error_code = map_exception_to_error_code(ex)
+                    user_message = get_user_friendly_error_message(error_code)
+
+                    if failed_at != progress["last_done"]:
+                        attempt = 0
+                        failed_at = progress["last_done"]
+                        last_delay["seconds"] = 0.0
+
+                    # Classify non-retriable errors
+                    is_retriable = error_code not in NON_RETRIABLE_ERRORS
+                    retry_planned = is_retriable and attempt < max_retries
+                    # When jobs everywhere are failing, the budget runs out and
+                    # they fail instead of piling retries onto a sick backend
+                    budget_exhausted = retry_planned and not retry_policy.budget.try_retry()
+                    retry_planned = retry_planned and not budget_exhausted
+
+                    # Log the retry decision to events.jsonl
                     self.job_store._log_event(
                         job.id,
                         {
-                            "type": "job_failed",
-                            "error": str(ex),
+                            "type": "retry_decision",
                             "error_code": error_code,
-                            "user_message": user_message,
+                            "is_retriable": is_retriable,
+                            "retry_planned": retry_planned,
+                            "budget_exhausted": budget_exhausted,
+                            "attempt": attempt,
+                            "max_retries": max_retries,
                         },
                     )
-                    break
-            finally:
-                job.updated_at = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-                self.job_store.save(job)
-
-        self.job_store._log_event(job.id, {"type": "job_ended", "state": job.state})
 
-        # Clean up resources after job ends
-        if job.id in self.control_queues:
-            del self.control_queues[job.id]
-        if job.id in self.resume_events:
-            del self.resume_events[job.id]
+                    if retry_planned:
+                        attempt += 1
+                        self.job_store._log_event(
+                            job.id,
+                            {
+                                "type": "retry",
+                                "attempt": attempt,
+                                "chunk_idx": progress["current_chunk"],
+                                "resume_from_chunk": progress["last_done"] + 1,
+                                "error": str(ex),
+                                "error_code": error_code,
+                                "user_message": user_message,
+                            },
+                        )
+                        await asyncio.sleep(_backoff(ex))
+                        continue
+                    else:
+                        if budget_exhausted:
+                            error_code = "retry_budget_exhausted"
+                            user_message = get_user_friendly_error_message(error_code)
+                        job.state = "FAILED"
+                        job_failed_event = {
+                            "event_id": str(uuid.uuid4()),
+                            "timestamp": time.time(),
+                            "job_id": job.id,
+                            "error_message": str(ex),
+                            "error_code": error_code,
+                            "user_message": user_message,
+                        }
+                        await on_event(BaseEvent(**job_failed_event))
+
+                        self.job_store._log_event(
+                            job.id,
+                            {
+                                "type": "job_failed",
+                                "error": str(ex),
+                                "error_code": error_code,
+                                "user_message": user_message,
+                            },
+                        )
+                        break
+                finally:
+                    job.updated_at = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+                    self.job_store.save(job)
+        finally:
+            # Runs on cancellation and unexpected errors too: release the chunk's
+            # output handle and flush queued events before the drain task goes
+            stream_writer.close()
+            self.job_store._log_event(job.id, {"type": "job_ended", "state": job.state})
+            await self.job_store.aclose_events(job.id)
+            self.control_queues.pop(job.id, None)
+            self.resume_events.pop(job.id, None)
 
     def _get_session_state(self, job: JobV3):
         """Helper to get session state from job metadata."""
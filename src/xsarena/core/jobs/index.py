@@ -0,0 +1,186 @@
+"""SQLite index over job metadata for XSArena v0.3."""
+
+import atexit
+import contextlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+
+TERMINAL_STATES = ("DONE", "FAILED", "CANCELLED")
+
+_SUMMARY_COLUMNS = "id, name, state, backend, out_path, created_at, updated_at"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL,
+    backend TEXT NOT NULL DEFAULT '',
+    out_path TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state);
+CREATE INDEX IF NOT EXISTS idx_jobs_out_path ON jobs(out_path, state);
+CREATE INDEX IF NOT EXISTS idx_jobs_backend ON jobs(backend);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+"""
+
+
+class JobSummary(NamedTuple):
+    """The indexed columns of one job; enough for listings without parsing job.json."""
+
+    id: str
+    name: str
+    state: str
+    backend: str
+    out_path: str
+    created_at: str
+    updated_at: str
+
+
+class JobIndex:
+    """
+    Indexed lookups over job metadata.
+
+    The per-job ``job.json`` files stay the source of truth and export format;
+    this index mirrors them so listings and resume lookups don't have to scan
+    and parse every job directory. It can always be rebuilt from the files.
+    """
+
+    _UPSERT_SQL = """
+        INSERT OR REPLACE INTO jobs
+            (id, name, state, backend, out_path, created_at, updated_at, data)
+        VALUES
+            (:id, :name, :state, :backend, :out_path, :created_at, :updated_at, :data)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=10.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets the CLI read while a running job writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        existed = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='jobs'"
+        ).fetchone()
+        self._conn.executescript(_SCHEMA)
+        self.is_new = existed is None
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """
+        Insert or replace one job row.
+
+        Keys: id, name, state, backend, out_path, created_at, updated_at, data.
+        """
+        with self._lock:
+            self._conn.execute(self._UPSERT_SQL, row)
+
+    def upsert_many(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Upsert several rows in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT_SQL, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, job_id: str) -> None:
+        """Remove a job row."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def clear(self) -> None:
+        """Remove all rows (used before a rebuild)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs")
+
+    def get_fields(self, job_id: str) -> Optional[Dict[str, str]]:
+        """Return the indexed columns (without the JSON payload) for one job."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def find_active_by_out_path(self, out_path: str) -> Optional[str]:
+        """Return the newest non-terminal job writing to `out_path`."""
+        placeholders = ",".join("?" for _ in TERMINAL_STATES)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id FROM jobs WHERE out_path = ? AND state NOT IN ({placeholders}) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (out_path, *TERMINAL_STATES),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def list_summaries(
+        self,
+        state: Optional[str] = None,
+        backend: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[JobSummary]:
+        """Return job summaries, newest first, optionally filtered."""
+        clauses, params = [], []
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(state)
+        if backend is not None:
+            clauses.append("backend = ?")
+            params.append(backend)
+        sql = f"SELECT {_SUMMARY_COLUMNS} FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [JobSummary(*r) for r in rows]
+
+    def count(self) -> int:
+        """Number of indexed jobs."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Dict[str, JobIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_job_index(path: Union[str, Path]) -> JobIndex:
+    """Return the process-wide JobIndex for `path`, opening it on first use."""
+    resolved = str(Path(path).resolve())
+    with _shared_lock:
+        index = _shared.get(resolved)
+        if index is None:
+            index = JobIndex(path)
+            _shared[resolved] = index
+        return index
+
+
+@atexit.register
+def close_job_indexes() -> None:
+    """Close every shared JobIndex; the next get_job_index() reopens it."""
+    with _shared_lock:
+        indexes = list(_shared.values())
+        _shared.clear()
+    for index in indexes:
+        with contextlib.suppress(sqlite3.Error):
+            index.close()
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 
 from ..backends.transport import BackendTransport, BaseEvent
 from ..v2_orchestrator.specs import RunSpecV2
+from .index import JobSummary
 
 # Needed for exception mapping in map_exception_to_error_code
 try:
@@ -65,8 +66,13 @@ def map_exception_to_error_code(exception: Exception) -> str:
         status_code = exception.status
         if status_code == 401 or status_code == 403:
             return "auth_error"
-        elif status_code == 429:
+        elif status_code == 402 or (
+            status_code == 429 and "quota" in str(exception).lower()
+        ):
+            # Out of credits or quota: waiting out a Retry-After will not help
             return "quota_exceeded"
+        elif status_code == 429:
+            return "rate_limited"
         elif status_code >= 500:
             return "server_error"
         elif status_code >= 400:
@@ -81,6 +87,8 @@ def map_exception_to_error_code(exception: Exception) -> str:
     exc_name = type(exception).__name__
     if "auth" in exc_name.lower() or "Auth" in exc_name:
         return "auth_error"
+    elif "ratelimit" in exc_name.lower():
+        return "rate_limited"
     elif (
         "quota" in exc_name.lower()
         or "Quota" in exc_name
@@ -103,6 +111,8 @@ def get_user_friendly_error_message(error_code: str) -> str:
         "transport_timeout": "Request timed out - backend may be slow to respond",
         "auth_error": "Authentication failed - check API key or credentials",
         "quota_exceeded": "Quota exceeded - rate limit reached or account limit exceeded",
+        "rate_limited": "Rate limited - backend asked to slow down; retrying after its Retry-After",
+        "retry_budget_exhausted": "Retry budget exhausted - backend failing for many jobs",
         "api_error": "API error - backend returned an error response",
         "server_error": "Server error - backend temporarily unavailable",
         "invalid_config": "Invalid configuration - check your settings",
@@ -174,19 +184,8 @@ class JobManager:
             or f"./books/{run_spec.subject.replace(' ', '_')}.final.md"
         )
 
-        # Look for existing jobs with the same output file
-        existing_job_id = None
-        for job in self.list_jobs():
-            if job.run_spec.out_path == out_path or (
-                not job.run_spec.out_path
-                and out_path.endswith(
-                    job.run_spec.subject.replace(" ", "_") + ".final.md"
-                )
-            ):
-                # Check if the job is incomplete (not in DONE, FAILED, or CANCELLED state)
-                if job.state not in ["DONE", "FAILED", "CANCELLED"]:
-                    existing_job_id = job.id
-                    break
+        # Look for an incomplete job with the same output file (indexed lookup)
+        existing_job_id = self.job_store.find_resumable(out_path)
 
         if existing_job_id:
             # Resume the existing job
@@ -262,8 +261,8 @@ class JobManager:
 
         return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
-    def list_jobs(self) -> List[JobV3]:
-        """List all jobs."""
+    def list_jobs(self) -> List[JobSummary]:
+        """List all jobs (indexed summaries, newest first)."""
         return self.job_store.list_all()
 
     def _log_event(self, job_id: str, ev: Dict[str, Any]):
@@ -3,6 +3,7 @@
 import asyncio
 import logging
 
+from ...backends.retry import RetryPolicy
 from ...backends.transport import BackendTransport
 from ...chunking import jaccard_ngrams
 from ..helpers import drain_next_hint, strip_next_lines
@@ -10,6 +11,9 @@ from ..model import JobV3
 
 logger = logging.getLogger(__name__)
 
+# Extensions are optional polish: one quick retry, then give up on this pass
+_EXTEND_RETRY = RetryPolicy(max_attempts=2, max_delay=5.0)
+
 
 async def perform_micro_extension(
     content: str,
@@ -24,6 +28,7 @@ async def perform_micro_extension(
     resume_events: dict,
     job_store,
     ctl_lock=None,  # Accept the lock as a parameter
+    output_tail=None,
 ) -> str:
     """
     Perform micro-extensions to extend content if too short.
@@ -41,6 +46,8 @@ async def perform_micro_extension(
         resume_events: Resume events for job management
         job_store: Job store for logging
         ctl_lock: Control lock for thread safety
+        output_tail: In-memory tail of the output file, used so anchors can
+            reach back into the previous chunk when this one is still short
 
     Returns:
         Extended content
@@ -95,8 +102,13 @@ async def perform_micro_extension(
             # Get a local anchor from the current chunk content using centralized service
             from ..anchor_service import create_anchor
 
+            anchor_source = (
+                output_tail.preview(extended_content)
+                if output_tail is not None
+                else extended_content
+            )
             local_anchor = await create_anchor(
-                extended_content,
+                anchor_source,
                 use_semantic=False,
                 transport=transport,
                 tail_chars=150,
@@ -139,7 +151,10 @@ async def perform_micro_extension(
 
                 # Check for repetition before extending
                 try:
-                    extend_response = await transport.send(extend_payload)
+                    extend_response = await _EXTEND_RETRY.run(
+                        lambda payload=extend_payload: transport.send(payload),
+                        "micro-extend",
+                    )
                     extend_content = (
                         extend_response.get("choices", [{}])[0]
                         .get("message", {})
@@ -0,0 +1,68 @@
+"""Bounded in-memory tail of a job's output file for anchor construction."""
+
+import os
+from pathlib import Path
+from typing import Union
+
+
+class OutputTail:
+    """
+    Keep the last few KB of a job's output in memory.
+
+    Anchors only ever look at the last few hundred characters of the book, so
+    instead of re-reading the whole output file before every chunk we keep a
+    bounded window that is updated as chunks are appended and seeded once on
+    resume by reading only the end of the file.
+    """
+
+    def __init__(self, max_chars: int = 4096):
+        self.max_chars = max_chars
+        self._buf = ""
+
+    @classmethod
+    def from_file(
+        cls, path: Union[str, Path], max_chars: int = 4096, seed_bytes: int = 8192
+    ) -> "OutputTail":
+        """Create a tail seeded from the last `seed_bytes` of `path` (if it exists)."""
+        tail = cls(max_chars=max_chars)
+        tail.seed_from_file(path, seed_bytes=seed_bytes)
+        return tail
+
+    def seed_from_file(self, path: Union[str, Path], seed_bytes: int = 8192) -> None:
+        """Replace the window with the end of `path`, seeking from EOF."""
+        p = Path(path)
+        if not p.exists():
+            self._buf = ""
+            return
+        try:
+            with open(p, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - seed_bytes))
+                raw = f.read()
+        except OSError:
+            self._buf = ""
+            return
+        # A seek into the middle of a multibyte sequence leaves a partial
+        # character at the start; drop it rather than failing.
+        self._buf = raw.decode("utf-8", errors="ignore")[-self.max_chars :]
+
+    def append(self, text: str) -> None:
+        """Append text exactly as it was written to the output file."""
+        if text:
+            self._buf = (self._buf + text)[-self.max_chars :]
+
+    def preview(self, pending: str) -> str:
+        """Return the window as it would look with `pending` appended as a new chunk."""
+        if not self._buf:
+            return pending[-self.max_chars :]
+        joiner = "" if pending.startswith("\n") else "\n\n"
+        return (self._buf + joiner + pending)[-self.max_chars :]
+
+    @property
+    def text(self) -> str:
+        """Current tail window."""
+        return self._buf
+
+    def __len__(self) -> int:
+        return len(self._buf)
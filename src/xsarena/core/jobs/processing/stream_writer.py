@@ -0,0 +1,197 @@
+"""Progressive output writing for streamed chunks."""
+
+import contextlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import IO, List, Optional, Union
+
+_NEXT_MARKER = re.compile(r"NEXT\s*:", re.IGNORECASE)
+_NEXT_PREFIX = re.compile(r"n(?:e(?:x(?:t\s*)?)?)?", re.IGNORECASE)
+
+
+class NextTrailerFilter:
+    """
+    Hold back `NEXT: [...]` directives while a chunk streams in.
+
+    Text is released as soon as it cannot be part of a directive, so the
+    streamed preview never shows the trailer. The hint is taken from the
+    final chunk text by `strip_next_lines`, which stays the source of truth.
+    """
+
+    # A marker that has not closed within this many chars is treated as prose
+    MAX_DIRECTIVE_CHARS = 300
+
+    def __init__(self):
+        self._pending = ""
+
+    @staticmethod
+    def _partial_marker_len(text: str) -> int:
+        """Length of a suffix of `text` that could still grow into a NEXT marker."""
+        tail = text[-8:]
+        for i, ch in enumerate(tail):
+            if ch in "nN" and _NEXT_PREFIX.fullmatch(tail[i:]):
+                return len(tail) - i
+        return 0
+
+    def feed(self, delta: str) -> str:
+        """Add a delta and return the text that is safe to emit now."""
+        self._pending += delta
+        out = []
+        while True:
+            m = _NEXT_MARKER.search(self._pending)
+            if not m:
+                keep = self._partial_marker_len(self._pending)
+                cut = len(self._pending) - keep
+                out.append(self._pending[:cut])
+                self._pending = self._pending[cut:]
+                break
+            out.append(self._pending[: m.start()])
+            close = self._pending.find("]", m.end())
+            if close == -1:
+                if len(self._pending) - m.start() > self.MAX_DIRECTIVE_CHARS:
+                    # Not a directive after all; release the marker and move on
+                    out.append(self._pending[m.start() : m.end()])
+                    self._pending = self._pending[m.end() :]
+                    continue
+                self._pending = self._pending[m.start() :]
+                break
+            self._pending = self._pending[close + 1 :]
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Release whatever is still held back once the stream has ended."""
+        rest = self._pending
+        self._pending = ""
+        if _NEXT_MARKER.search(rest):
+            return ""
+        return rest
+
+
+class StreamingChunkWriter:
+    """
+    Write a chunk to the output file while it streams, then commit the final text.
+
+    Deltas go through one append handle per chunk and are flushed (not
+    fsynced) in batches of `flush_chars` characters or every `flush_interval`
+    seconds, so followers see output promptly without a write per token.
+    When the chunk is finished, `commit` closes the handle, truncates back to
+    the end of the previous chunk and writes the post-processed body durably,
+    so micro-extends, compression and NEXT stripping are reflected exactly
+    once. If a chunk fails mid-stream, `close` keeps its partial text on disk
+    until the next commit replaces it.
+    """
+
+    def __init__(
+        self,
+        out_path: Union[str, Path],
+        committed_offset: Optional[int] = None,
+        flush_chars: int = 512,
+        flush_interval: float = 0.2,
+    ):
+        self.out_path = Path(out_path)
+        if committed_offset is None:
+            committed_offset = (
+                self.out_path.stat().st_size if self.out_path.exists() else 0
+            )
+        self.committed_offset = committed_offset
+        self._separator: Optional[str] = None
+        self.last_commit_bytes = b""
+        self.flush_chars = flush_chars
+        self.flush_interval = flush_interval
+        self._handle: Optional[IO[str]] = None
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_flush = 0.0
+
+    def _separator_for(self, idx: int, body: str) -> str:
+        if self.committed_offset == 0 or idx == 1:
+            return ""
+        return "" if body.startswith("\n") else "\n\n"
+
+    def begin(self, idx: int) -> None:
+        """Start streaming chunk `idx`, discarding any uncommitted partial text."""
+        self._discard()
+        self._truncate()
+        self._separator = self._separator_for(idx, "")
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        # Lives until commit/close so each delta is not an open/close pair
+        self._handle = open(self.out_path, "a", encoding="utf-8")  # noqa: SIM115
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        """Buffer streamed text, flushing it to the output file in batches."""
+        if not text or self._handle is None:
+            return
+        if self._separator:
+            text = self._separator + text
+            self._separator = ""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if (
+            self._buffered >= self.flush_chars
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out buffered text now (end of a stream, or a batch boundary)."""
+        if self._handle is None:
+            return
+        if self._buffer:
+            self._handle.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self._handle.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush and close the chunk's handle, keeping its partial text on disk."""
+        if self._handle is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._discard()
+
+    def _discard(self) -> None:
+        self._buffer.clear()
+        self._buffered = 0
+        if self._handle is not None:
+            with contextlib.suppress(OSError):
+                self._handle.close()
+            self._handle = None
+
+    def commit(self, idx: int, body: str) -> str:
+        """Replace the streamed preview with the final body; return the text written."""
+        # The preview is about to be truncated away; unflushed text can go too
+        self._discard()
+        self._truncate()
+        text = self._separator_for(idx, body) + body
+        self.last_commit_bytes = text.encode("utf-8")
+        with open(self.out_path, "ab") as f:
+            f.write(self.last_commit_bytes)
+            # Add flush/fsync for durability
+            f.flush()
+            with contextlib.suppress(Exception):
+                os.fsync(f.fileno())
+            self.committed_offset = os.fstat(f.fileno()).st_size
+        self._separator = None
+        return text
+
+    def _truncate(self) -> None:
+        truncate_to(self.out_path, self.committed_offset)
+
+
+def truncate_to(path: Union[str, Path], offset: int) -> int:
+    """Cut `path` back to `offset` bytes; return how many bytes were removed."""
+    p = Path(path)
+    if not p.exists():
+        return 0
+    extra = p.stat().st_size - offset
+    if extra <= 0:
+        return 0
+    with open(p, "r+b") as f:
+        f.truncate(offset)
+    return extra
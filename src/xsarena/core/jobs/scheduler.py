@@ -2,16 +2,31 @@
 
 import asyncio
 import contextlib
-from datetime import datetime
+import heapq
+import itertools
+import json
+from collections import Counter
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
 from ...utils.io import atomic_write
 from ..backends.transport import BackendTransport
 from ..project_config import get_project_settings
+from .admission import AdmissionController
 from .model import JobManager
+from .store import JobStore
+
+# Submits and completions in this process wake the loop directly. Jobs queued by
+# another process (a separate CLI call) only show up in queue.json, so the idle
+# loop also stats it this often; the file is re-read only when its mtime changed.
+QUEUE_FILE_CHECK_INTERVAL = 5.0
+
+# Heap entry: (priority, submission sequence, job ID); the sequence keeps FIFO order
+# among equal priorities.
+_Entry = Tuple[int, int, str]
 
 
 class Scheduler:
@@ -23,17 +38,35 @@ class Scheduler:
         self.max_concurrent = max_concurrent
         self.quiet_hours = quiet_hours or {}
         self.running_jobs: Dict[str, asyncio.Task] = {}
-        self.job_queue: List[
-            tuple[int, str]
-        ] = (
-            []
-        )  # Queue of (priority, job ID) tuples, where lower number = higher priority
         self.transport: Optional[BackendTransport] = None
         self._project = self._load_project_cfg()
         self._project_settings = get_project_settings()
+        self._job_store = JobStore()
+
+        # Ready queue: one heap per backend so a saturated backend never blocks
+        # dispatch for the others. `_queued` holds the live entry per job;
+        # heap entries that no longer match it are stale and skipped lazily.
+        self._heaps: Dict[str, List[_Entry]] = {}
+        self._queued: Dict[str, _Entry] = {}
+        self._seq = itertools.count()
+        self._backend_cache: Dict[str, str] = {}
+        self._running_backend: Dict[str, str] = {}
+        self._running_by_backend: Counter = Counter()
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+
+        # Per-backend limits adapt to observed load; the configured values are ceilings
+        concurrency = self._project_settings.concurrency
+        self._admission = AdmissionController(
+            self._get_concurrent_limit_for_backend,
+            enabled=concurrency.adaptive,
+            floor=concurrency.adaptive_min,
+        )
 
         # Initialize and load persisted queue
         self._queue_file = Path(".xsarena/ops/queue.json")
+        self._queue_mtime_ns: Optional[int] = None
         self._load_persisted_queue()
 
     def _load_project_cfg(self) -> Dict[str, Any]:
@@ -47,11 +80,29 @@ class Scheduler:
 
     def set_transport(self, transport: BackendTransport):
         """Set the transport for the scheduler."""
+        if self.transport is not None and hasattr(
+            self.transport, "remove_outcome_listener"
+        ):
+            self.transport.remove_outcome_listener(self._on_request_outcome)
         self.transport = transport
+        # Request outcomes (via the circuit breaker) drive adaptive concurrency
+        if hasattr(transport, "add_outcome_listener"):
+            transport.add_outcome_listener(self._on_request_outcome)
+
+    def _on_request_outcome(self, outcome) -> None:
+        """Feed a transport request outcome into the admission controller."""
+        grew = self._admission.record(
+            outcome.transport, outcome.ok, outcome.latency, outcome.overload
+        )
+        if grew and self._dispatch():
+            self._persist_queue()
+
+    def _quiet_cfg(self) -> Dict[str, Any]:
+        return (self._project.get("scheduler") or {}).get("quiet_hours") or {}
 
     def is_quiet_time(self) -> bool:
         """Check if it's currently quiet hours."""
-        cfg = (self._project.get("scheduler") or {}).get("quiet_hours") or {}
+        cfg = self._quiet_cfg()
         if not cfg.get("enabled", False):
             return False
 
@@ -73,95 +124,146 @@ class Scheduler:
 
         return False
 
+    def _seconds_until_quiet_boundary(self) -> Optional[float]:
+        """Seconds until quiet hours can next start or end (None if disabled)."""
+        if not self._quiet_cfg().get("enabled", False):
+            return None
+        # Quiet hours are configured in whole hours, so the next top of the hour
+        # is the earliest moment the answer can change.
+        now = datetime.now()
+        next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return max(0.0, (next_hour - now).total_seconds())
+
+    @property
+    def job_queue(self) -> List[Tuple[int, str]]:
+        """Queued (priority, job ID) pairs in dispatch order."""
+        return [(p, job_id) for p, _, job_id in sorted(self._queued.values())]
+
     async def submit_job(self, job_id: str, priority: int = 5) -> bool:
         """Submit a job to the scheduler with a priority (lower number = higher priority)."""
-        if self.is_quiet_time():
-            # Add to queue for later processing
-            self.job_queue.append((priority, job_id))
-            self._sort_queue()  # Keep queue sorted by priority
-            self._persist_queue()
-            return True
-
-        # Check both total and backend-specific limits
         backend_type = self._get_backend_for_job(job_id)
-        backend_limit = self._get_concurrent_limit_for_backend(backend_type)
-        current_backend_jobs = self._get_running_jobs_for_backend(backend_type)
-
-        if (
-            len(self.running_jobs) < self.effective_max_concurrent
-            and current_backend_jobs < backend_limit
-        ):
+        if not self.is_quiet_time() and self._has_capacity(backend_type):
             # Run immediately
-            task = asyncio.create_task(self._run_job(job_id))
-            self.running_jobs[job_id] = task
-            return True
-        else:
-            # Add to queue
-            self.job_queue.append((priority, job_id))
-            self._sort_queue()  # Keep queue sorted by priority
-            self._persist_queue()
+            self._start_job(job_id, backend_type)
             return True
 
-    def _sort_queue(self):
-        """Sort the job queue by priority (lower number = higher priority)."""
-        self.job_queue.sort(
-            key=lambda x: x[0]
-        )  # Sort by priority (first element of tuple)
+        # Add to queue for later processing
+        self._enqueue(priority, job_id)
+        self._persist_queue()
+        await self._notify()
+        return True
+
+    def set_priority(self, job_id: str, priority: int) -> bool:
+        """Change the priority of a queued job; returns False if it is not queued."""
+        if job_id not in self._queued:
+            return False
+        self._enqueue(priority, job_id)
+        self._persist_queue()
+        return True
+
+    def _enqueue(self, priority: int, job_id: str) -> None:
+        """Add (or re-prioritise) a job in the ready queue."""
+        entry = (priority, next(self._seq), job_id)
+        self._queued[job_id] = entry
+        backend_type = self._get_backend_for_job(job_id)
+        heapq.heappush(self._heaps.setdefault(backend_type, []), entry)
+
+    def _dequeue(self, job_id: str) -> bool:
+        """Remove a job from the ready queue (its heap entry goes stale)."""
+        return self._queued.pop(job_id, None) is not None
+
+    def _peek(self, backend_type: str) -> Optional[_Entry]:
+        """Best live entry for a backend, discarding stale heap entries."""
+        heap = self._heaps.get(backend_type)
+        while heap:
+            entry = heap[0]
+            if self._queued.get(entry[2]) == entry:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def _has_capacity(self, backend_type: str) -> bool:
+        return len(self.running_jobs) < self.effective_max_concurrent and (
+            self._running_by_backend[backend_type]
+            < self._admission.limit(backend_type)
+        )
+
+    def _start_job(self, job_id: str, backend_type: str) -> None:
+        task = asyncio.create_task(self._run_job(job_id))
+        self.running_jobs[job_id] = task
+        self._running_backend[job_id] = backend_type
+        self._running_by_backend[backend_type] += 1
+
+    def _finish_job(self, job_id: str) -> None:
+        """Release a job's running slot (idempotent)."""
+        self.running_jobs.pop(job_id, None)
+        backend_type = self._running_backend.pop(job_id, None)
+        if backend_type is not None:
+            self._running_by_backend[backend_type] -= 1
+        self._backend_cache.pop(job_id, None)
 
     async def _run_job(self, job_id: str):
         """Internal method to run a job."""
-        if not self.transport:
-            raise ValueError("Transport not set for scheduler")
+        try:
+            if not self.transport:
+                raise ValueError("Transport not set for scheduler")
 
-        # Create a job runner and run the job
-        runner = JobManager()
+            # Create a job runner and run the job
+            runner = JobManager()
 
-        # Create control queue and resume event for this job
-        control_queue = asyncio.Queue()
-        resume_event = asyncio.Event()
-        resume_event.set()  # Initially not paused
+            # Create control queue and resume event for this job
+            control_queue = asyncio.Queue()
+            resume_event = asyncio.Event()
+            resume_event.set()  # Initially not paused
 
-        try:
             await runner.run_job(job_id, self.transport, control_queue, resume_event)
         finally:
-            # Remove from running jobs when done
-            if job_id in self.running_jobs:
-                del self.running_jobs[job_id]
-
-            # Check if there are queued jobs to run
+            # Free the slot and start whatever can use it
+            self._finish_job(job_id)
             await self._process_queue()
 
     async def _process_queue(self):
         """Process queued jobs if there's capacity."""
-        # Load any external changes to the queue from file
-        self._load_persisted_queue()
-
-        # Process jobs that can run within limits
-        remaining_queue = []
-        for priority, job_id in self.job_queue:
-            if self.is_quiet_time():
-                remaining_queue.append(
-                    (priority, job_id)
-                )  # Keep in queue during quiet hours
-                continue
-
-            backend_type = self._get_backend_for_job(job_id)
-            backend_limit = self._get_concurrent_limit_for_backend(backend_type)
-            current_backend_jobs = self._get_running_jobs_for_backend(backend_type)
-
-            if (
-                len(self.running_jobs) < self.effective_max_concurrent
-                and current_backend_jobs < backend_limit
-            ):
-                # Start this job
-                task = asyncio.create_task(self._run_job(job_id))
-                self.running_jobs[job_id] = task
-            else:
-                # Keep in queue
-                remaining_queue.append((priority, job_id))
+        # Pick up edits other processes made to queue.json
+        self._reload_queue_if_changed()
+        if self._dispatch():
+            self._persist_queue()
 
-        self.job_queue = remaining_queue
-        self._persist_queue()  # Persist the updated queue
+    def _dispatch(self) -> int:
+        """Start the best queued jobs that fit the limits; returns how many started."""
+        if self._closing or self.is_quiet_time():
+            return 0
+        started = 0
+        while len(self.running_jobs) < self.effective_max_concurrent:
+            best: Optional[_Entry] = None
+            best_backend = ""
+            for backend_type in self._heaps:
+                if not self._has_capacity(backend_type):
+                    continue
+                entry = self._peek(backend_type)
+                if entry is not None and (best is None or entry < best):
+                    best, best_backend = entry, backend_type
+            if best is None:
+                break
+            heapq.heappop(self._heaps[best_backend])
+            self._dequeue(best[2])
+            self._start_job(best[2], best_backend)
+            started += 1
+        return started
+
+    def _get_wakeup(self) -> asyncio.Condition:
+        """Condition used to wake the scheduler loop (one per event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._wakeup is None or self._wakeup_loop is not loop:
+            self._wakeup = asyncio.Condition()
+            self._wakeup_loop = loop
+        return self._wakeup
+
+    async def _notify(self) -> None:
+        """Wake the scheduler loop."""
+        cond = self._get_wakeup()
+        async with cond:
+            cond.notify_all()
 
     async def wait_for_job(self, job_id: str):
         """Wait for a specific job to complete."""
@@ -175,95 +277,91 @@ class Scheduler:
             task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await task
-            del self.running_jobs[job_id]
+            self._finish_job(job_id)
+            return True
+        elif self._dequeue(job_id):
+            self._backend_cache.pop(job_id, None)
+            self._persist_queue()  # Persist the updated queue
             return True
-        else:
-            # Look for the job in the priority queue
-            for i, (priority, queued_job_id) in enumerate(self.job_queue):
-                if queued_job_id == job_id:
-                    self.job_queue.pop(i)
-                    self._persist_queue()  # Persist the updated queue
-                    return True
         return False
 
     def _get_backend_for_job(self, job_id: str) -> str:
-        """Get the backend type for a specific job."""
+        """Get the backend type for a specific job (cached while it is queued or running)."""
+        backend_type = self._backend_cache.get(job_id)
+        if backend_type is None:
+            meta = self._job_store.get_meta(job_id)
+            # Default to bridge if we can't determine the backend
+            backend_type = (meta or {}).get("backend") or "bridge"
+            self._backend_cache[job_id] = backend_type
+        return backend_type
+
+    def _queue_file_mtime(self) -> Optional[int]:
         try:
-            from .model import JobManager
+            return self._queue_file.stat().st_mtime_ns
+        except OSError:
+            return None
 
-            runner = JobManager()
-            job = runner.load(job_id)
-            return job.backend
-        except Exception:
-            # Default to bridge if we can't determine the backend
-            return "bridge"
+    def _reload_queue_if_changed(self) -> bool:
+        """Reload queue.json if something else rewrote it since we last saw it."""
+        if self._queue_file_mtime() == self._queue_mtime_ns:
+            return False
+        self._load_persisted_queue()
+        return True
 
     def _load_persisted_queue(self):
         """Load the persisted job queue from file."""
-        if self._queue_file.exists():
-            try:
-                import json
-
-                content = self._queue_file.read_text(encoding="utf-8")
-                data = json.loads(content)
-
-                # Handle both old format (list of job IDs) and new format (list of [priority, job_id] tuples)
-                raw_queue = data.get("queue", [])
-
-                if not raw_queue:
-                    self.job_queue = []
-                    return
-
-                # Check if this is the old format (just job IDs) or new format (priority, job_id pairs)
-                if raw_queue and isinstance(raw_queue[0], str):
-                    # Old format: just job IDs, assign default priority
-                    self.job_queue = [(5, job_id) for job_id in raw_queue]
-                elif (
-                    raw_queue
-                    and isinstance(raw_queue[0], list)
-                    and len(raw_queue[0]) == 2
-                ):
-                    # New format: [priority, job_id] pairs
-                    self.job_queue = [
-                        (priority, job_id) for priority, job_id in raw_queue
-                    ]
-                else:
-                    # Unexpected format, use default
-                    self.job_queue = []
-                    return
-
-                # Filter out jobs that no longer exist
-                valid_jobs = []
-                for priority, job_id in self.job_queue:
-                    try:
-                        from .model import JobManager
-
-                        runner = JobManager()
-                        job = runner.load(job_id)
-                        # Only keep PENDING jobs
-                        if job.state == "PENDING":
-                            valid_jobs.append((priority, job_id))
-                    except Exception:
-                        # Job doesn't exist anymore, skip it
-                        continue
-
-                self.job_queue = valid_jobs
-                self._sort_queue()  # Sort by priority
-            except Exception as e:
-                # If there's an error loading the queue, start fresh
-                print(f"Warning: Could not load persisted queue: {e}")
-                self.job_queue = []
+        self._queue_mtime_ns = self._queue_file_mtime()
+        if self._queue_mtime_ns is None:
+            return
+        try:
+            content = self._queue_file.read_text(encoding="utf-8")
+            data = json.loads(content)
+
+            # Handle both old format (list of job IDs) and
+            # new format (list of [priority, job_id] tuples)
+            raw_queue = data.get("queue", [])
+            if raw_queue and isinstance(raw_queue[0], str):
+                # Old format: just job IDs, assign default priority
+                pairs = [(5, job_id) for job_id in raw_queue]
+            elif (
+                raw_queue and isinstance(raw_queue[0], list) and len(raw_queue[0]) == 2
+            ):
+                # New format: [priority, job_id] pairs
+                pairs = [(priority, job_id) for priority, job_id in raw_queue]
+            else:
+                # Empty or unexpected format
+                pairs = []
+        except Exception as e:
+            # If there's an error loading the queue, start fresh
+            print(f"Warning: Could not load persisted queue: {e}")
+            pairs = []
+
+        self._heaps.clear()
+        self._queued.clear()
+        for priority, job_id in pairs:
+            if job_id in self.running_jobs or job_id in self._queued:
+                continue
+            meta = self._job_store.get_meta(job_id)
+            # Only keep PENDING jobs (missing jobs are skipped)
+            if meta and meta.get("state") == "PENDING":
+                self._backend_cache[job_id] = meta.get("backend") or "bridge"
+                self._enqueue(priority, job_id)
+        # Forget backends of jobs that were dropped from the queue
+        for job_id in list(self._backend_cache):
+            if job_id not in self._queued and job_id not in self.running_jobs:
+                del self._backend_cache[job_id]
 
     def _persist_queue(self):
         """Persist the current job queue to file."""
         self._queue_file.parent.mkdir(parents=True, exist_ok=True)
-        import json
 
         # Convert priority tuples to list format for JSON serialization
         queue_for_json = [[priority, job_id] for priority, job_id in self.job_queue]
 
         data = {"queue": queue_for_json, "timestamp": datetime.now().isoformat()}
         atomic_write(self._queue_file, json.dumps(data, indent=2), encoding="utf-8")
+        # Our own write is not an external change
+        self._queue_mtime_ns = self._queue_file_mtime()
 
     def _get_concurrent_limit_for_backend(self, backend_type: str) -> int:
         """Get the concurrent job limit for a specific backend type."""
@@ -278,12 +376,7 @@ class Scheduler:
 
     def _get_running_jobs_for_backend(self, backend_type: str) -> int:
         """Get the number of currently running jobs for a specific backend type."""
-        count = 0
-        for job_id in self.running_jobs:
-            job_backend = self._get_backend_for_job(job_id)
-            if job_backend == backend_type:
-                count += 1
-        return count
+        return self._running_by_backend[backend_type]
 
     @property
     def effective_max_concurrent(self) -> int:
@@ -293,25 +386,53 @@ class Scheduler:
 
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status."""
+        queue = self.job_queue
         return {
             "max_concurrent": self.effective_max_concurrent,
             "running_jobs": len(self.running_jobs),
-            "queued_jobs": len(self.job_queue),
+            "queued_jobs": len(queue),
             "is_quiet_time": self.is_quiet_time(),
             "running_job_ids": list(self.running_jobs.keys()),
-            "queued_job_ids": [
-                job_id for priority, job_id in self.job_queue
-            ],  # Just the job IDs
+            "running_by_backend": {
+                b: n for b, n in self._running_by_backend.items() if n > 0
+            },
+            "adaptive_concurrency": self._admission.enabled,
+            "backend_limits": self._admission.snapshot(),
+            "limit_decisions": self._admission.decisions(),
+            "queued_job_ids": [job_id for priority, job_id in queue],  # Just the job IDs
             "queued_jobs_with_priority": [
-                [priority, job_id] for priority, job_id in self.job_queue
+                [priority, job_id] for priority, job_id in queue
             ],  # Priority and job ID pairs
         }
 
-    async def run_scheduler(self):
-        """Main scheduler loop - runs indefinitely."""
-        while True:
-            # Process queued jobs if there's capacity
-            await self._process_queue()
+    async def aclose(self):
+        """Shut down: cancel running jobs and close the transport's connections."""
+        self._closing = True
+        for task in list(self.running_jobs.values()):
+            task.cancel()
+        for job_id, task in list(self.running_jobs.items()):
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+            self._finish_job(job_id)
+        if self.transport is not None:
+            await self.transport.aclose()
 
-            # Wait before checking again
-            await asyncio.sleep(1)
+    async def run_scheduler(self):
+        """Main scheduler loop - runs until cancelled, then shuts down cleanly."""
+        try:
+            cond = self._get_wakeup()
+            while True:
+                # Process queued jobs if there's capacity
+                await self._process_queue()
+
+                # Sleep until something changes: a submit or job completion
+                # (notified), a quiet-hours boundary, or the next queue file check.
+                timeout = QUEUE_FILE_CHECK_INTERVAL
+                boundary = self._seconds_until_quiet_boundary()
+                if boundary is not None:
+                    timeout = min(timeout, boundary + 0.5)
+                async with cond:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(cond.wait(), timeout)
+        finally:
+            await self.aclose()
@@ -2,31 +2,94 @@
 
 import contextlib
 import json
+import logging
 import os
+import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from ...utils.helpers import load_json_with_error_handling
 from ...utils.io import atomic_write
+from .checkpoint import Checkpoint
+from .event_log import EventLogWriter
+from .index import JobIndex, JobSummary, get_job_index
 from .model import JobV3
 
+logger = logging.getLogger(__name__)
+
 # No need for load_json wrapper since load_json_with_error_handling now returns data directly
 
+INDEX_PATH = Path(".xsarena") / "jobs.sqlite3"
+
 
 class JobStore:
     """Handles job persistence operations (load/save/list)."""
 
-    def __init__(self):
+    def __init__(self, use_index: Optional[bool] = None):
         Path(".xsarena/jobs").mkdir(parents=True, exist_ok=True)
+        from ..project_config import get_project_settings
+
+        settings = get_project_settings().jobs
+        if use_index is None:
+            use_index = settings.index
+        self._event_fsync = settings.event_fsync
+        self._event_fsync_interval_ms = settings.event_fsync_interval_ms
+        self._event_writers: Dict[str, EventLogWriter] = {}
+        self._index: Optional[JobIndex] = None
+        if use_index:
+            try:
+                self._index = get_job_index(INDEX_PATH)
+                if self._index.is_new:
+                    # First use in this workspace: import the existing job directories
+                    self.rebuild_index()
+            except sqlite3.Error as e:
+                logger.warning(f"Job index unavailable, scanning job directories: {e}")
+                self._index = None
 
     def _job_dir(self, job_id: str) -> Path:
         """Get the directory for a job."""
         return Path(".xsarena") / "jobs" / job_id
 
+    def _events_path(self, job_id: str) -> Path:
+        """Get the events log path for a job."""
+        return self._job_dir(job_id) / "events.jsonl"
+
+    def _checkpoint_path(self, job_id: str) -> Path:
+        """Get the resume checkpoint path for a job."""
+        return self._job_dir(job_id) / "checkpoint.json"
+
+    def save_checkpoint(self, job_id: str, checkpoint: Checkpoint) -> None:
+        """Atomically replace a job's resume checkpoint."""
+        checkpoint.updated_at = self._ts()
+        atomic_write(
+            self._checkpoint_path(job_id),
+            json.dumps(checkpoint.to_dict()),
+            encoding="utf-8",
+        )
+
+    def load_checkpoint(self, job_id: str) -> Optional[Checkpoint]:
+        """Load a job's resume checkpoint, or None if missing or unreadable."""
+        p = self._checkpoint_path(job_id)
+        if not p.exists():
+            return None
+        try:
+            return Checkpoint.from_dict(json.loads(p.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
     def _get_last_completed_chunk(self, job_id: str) -> int:
+        """Get the index of the last completed chunk (checkpoint first, then events.jsonl)."""
+        checkpoint = self.load_checkpoint(job_id)
+        if checkpoint is not None:
+            return checkpoint.chunk_idx
+        return self._scan_last_completed_chunk(job_id)
+
+    def _scan_last_completed_chunk(self, job_id: str) -> int:
         """Get the index of the last completed chunk by parsing events.jsonl."""
-        events_path = self._job_dir(job_id) / "events.jsonl"
+        self.flush_events(job_id)
+        events_path = self._events_path(job_id)
         if not events_path.exists():
             return 0
 
@@ -71,10 +134,41 @@ class JobStore:
         """Save job metadata."""
         jd = self._job_dir(job.id)
         job_path = jd / "job.json"
-        atomic_write(job_path, json.dumps(job.model_dump(), indent=2), encoding="utf-8")
+        data = job.model_dump()
+        atomic_write(job_path, json.dumps(data, indent=2), encoding="utf-8")
+        self._index_job(job, data)
+
+    def _index_row(
+        self, job: JobV3, data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the index row for a job."""
+        row = self._summary(job)._asdict()
+        row["data"] = json.dumps(data if data is not None else job.model_dump())
+        return row
+
+    def _index_job(self, job: JobV3, data: Optional[Dict[str, Any]] = None) -> None:
+        """Mirror a saved job into the index; the JSON file stays authoritative."""
+        if self._index is None:
+            return
+        try:
+            self._index.upsert(self._index_row(job, data))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index job {job.id}: {e}")
+
+    def rebuild_index(self) -> int:
+        """Rebuild the index from the job directories; returns the number of jobs indexed."""
+        if self._index is None:
+            return 0
+        rows = []
+        for job in self._scan_dirs():
+            rows.append(self._index_row(job))
+        self._index.clear()
+        self._index.upsert_many(rows)
+        self._index.is_new = False
+        return len(rows)
 
-    def list_all(self) -> List[JobV3]:
-        """List all jobs."""
+    def _scan_dirs(self) -> List[JobV3]:
+        """Load every job.json under .xsarena/jobs (skipping unreadable ones)."""
         base = Path(".xsarena") / "jobs"
         out: List[JobV3] = []
         if not base.exists():
@@ -82,12 +176,63 @@ class JobStore:
         for d in base.iterdir():
             p = d / "job.json"
             if p.exists():
-                out.append(self.load(d.name))
+                try:
+                    out.append(self.load(d.name))
+                except ValueError as e:
+                    logger.warning(f"Skipping unreadable job {d.name}: {e}")
         return out
 
+    def list_all(
+        self, state: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[JobSummary]:
+        """List job summaries, newest first, optionally filtered by state."""
+        if self._index is not None:
+            return self._index.list_summaries(state=state, limit=limit)
+        jobs = [
+            self._summary(j)
+            for j in self._scan_dirs()
+            if state is None or j.state == state
+        ]
+        jobs.sort(key=lambda j: j.created_at, reverse=True)
+        return jobs[:limit] if limit is not None else jobs
+
+    def _summary(self, job: JobV3) -> JobSummary:
+        """Build the summary row for a job without touching the index."""
+        return JobSummary(
+            id=job.id,
+            name=job.name,
+            state=job.state,
+            backend=job.backend,
+            out_path=self._normalize_out(job.run_spec),
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+        )
+
+    def get_meta(self, job_id: str) -> Optional[Dict[str, str]]:
+        """Return indexed fields (state, backend, out_path, ...) without parsing the job."""
+        if self._index is not None:
+            fields = self._index.get_fields(job_id)
+            if fields is not None:
+                return fields
+        try:
+            job = self.load(job_id)
+        except (FileNotFoundError, ValueError):
+            return None
+        return self._summary(job)._asdict()
+
+    def delete(self, job_id: str) -> bool:
+        """Delete a job directory and its index entry."""
+        d = self._job_dir(job_id)
+        existed = d.exists()
+        if existed:
+            shutil.rmtree(d, ignore_errors=True)
+        if self._index is not None:
+            with contextlib.suppress(sqlite3.Error):
+                self._index.delete(job_id)
+        return existed
+
     def _log_event(self, job_id: str, ev: Dict[str, Any]):
         """Log an event for a job with standardized structure."""
-        ev_path = self._job_dir(job_id) / "events.jsonl"
         # Ensure standard fields are present according to schema {ts, type, job_id, chunk_idx?, bytes?, hint?, attempt?, status_code?}
         standardized_event = {
             "ts": self._ts(),
@@ -104,12 +249,32 @@ class JobStore:
             if key not in standardized_event:
                 standardized_event[key] = value
 
-        # Use direct file operations with flush/fsync for durability
-        with open(ev_path, "a", encoding="utf-8") as e:
-            e.write(json.dumps(standardized_event) + "\n")
-            e.flush()
-            with contextlib.suppress(Exception):
-                os.fsync(e.fileno())
+        # Batched writer; durability follows the jobs.event_fsync policy
+        self._event_writer(job_id).append(standardized_event)
+
+    def _event_writer(self, job_id: str) -> EventLogWriter:
+        """Get (or open) the event writer for a job."""
+        writer = self._event_writers.get(job_id)
+        if writer is None:
+            writer = EventLogWriter(
+                self._events_path(job_id),
+                policy=self._event_fsync,
+                interval_ms=self._event_fsync_interval_ms,
+            )
+            self._event_writers[job_id] = writer
+        return writer
+
+    def flush_events(self, job_id: str, sync: bool = False) -> None:
+        """Write any queued events for a job to disk (fsync if `sync`)."""
+        writer = self._event_writers.get(job_id)
+        if writer is not None:
+            writer.flush(sync=sync)
+
+    async def aclose_events(self, job_id: str) -> None:
+        """Flush, fsync and close a job's event writer."""
+        writer = self._event_writers.pop(job_id, None)
+        if writer is not None:
+            await writer.aclose()
 
     @staticmethod
     def _ts() -> str:
@@ -119,9 +284,16 @@ class JobStore:
     def find_resumable(self, out_path_abs: str) -> Optional[str]:
         """Find an existing job (not DONE/FAILED/CANCELLED) that targets out_path."""
         target = os.path.abspath(out_path_abs)
+        if self._index is not None:
+            job_id = self._index.find_active_by_out_path(target)
+            if job_id is None or (self._job_dir(job_id) / "job.json").exists():
+                return job_id
+            # The job directory was removed behind our back; drop the stale row
+            with contextlib.suppress(sqlite3.Error):
+                self._index.delete(job_id)
+            return self.find_resumable(out_path_abs)
         for job in self.list_all():
-            job_out = self._normalize_out(job.run_spec)
-            if job_out == target and job.state not in ("DONE", "FAILED", "CANCELLED"):
+            if job.out_path == target and job.state not in ("DONE", "FAILED", "CANCELLED"):
                 return job.id
         return None
 
@@ -1,6 +1,7 @@
 """Project configuration for XSArena with concurrency settings."""
 
 from pathlib import Path
+from typing import Dict, List, Literal, Optional
 
 import yaml
 from pydantic import BaseModel
@@ -13,12 +14,56 @@ class ConcurrencySettings(BaseModel):
     bridge: int = 2  # Concurrent bridge jobs
     openrouter: int = 1  # Concurrent OpenRouter jobs
     quiet_hours: bool = False  # Whether to honor quiet hours
+    adaptive: bool = True  # Adapt per-backend limits (AIMD) below the values above
+    adaptive_min: int = 1  # Lowest limit adaptive control may cut a backend to
+
+
+class JobsSettings(BaseModel):
+    """Settings for job persistence."""
+
+    index: bool = True  # Mirror job.json files into an SQLite index for fast lookups
+    event_fsync: Literal["event", "chunk", "interval"] = "chunk"  # events.jsonl durability
+    event_fsync_interval_ms: int = 200  # Used by the "interval" policy
+
+
+class CacheSettings(BaseModel):
+    """Settings for the on-disk backend response cache."""
+
+    enabled: bool = True  # Serve repeated low-temperature requests from disk
+    max_mb: int = 256  # Size cap; least recently used entries are evicted beyond it
+    ttl_hours: float = 168  # Entries older than this are treated as misses
+    max_temperature: float = 0.5  # Requests sampled hotter than this are never cached
+    coalesce: bool = True  # Share one in-flight call between identical concurrent requests
+
+
+class BridgeSettings(BaseModel):
+    """Bridge endpoints to balance jobs across (each: base_url, session_id, message_id)."""
+
+    endpoints: List[Dict[str, Optional[str]]] = []
+    balance: Literal["least_outstanding", "ewma"] = "least_outstanding"
+    eject_below: float = 0.5  # Success-rate score under which an endpoint is ejected
+    eject_seconds: float = 30.0  # First ejection length; doubles on repeats
+
+
+class HedgeSettings(BaseModel):
+    """Opt-in hedged requests against the latency tail."""
+
+    enabled: bool = False  # Bridge: only with several endpoints (see bridge.endpoints)
+    percentile: float = 95.0  # Hedge once a request outlives this latency percentile
+    initial_delay: float = 60.0  # Delay used until enough latencies have been observed
+    min_delay: float = 2.0  # Never hedge sooner than this
+    budget_ratio: float = 0.1  # Extra requests allowed per request (per job)
+    budget_burst: int = 2  # Hedges allowed before the ratio kicks in
 
 
 class ProjectSettings(BaseModel):
     """Project-level settings for XSArena."""
 
     concurrency: ConcurrencySettings = ConcurrencySettings()
+    jobs: JobsSettings = JobsSettings()
+    cache: CacheSettings = CacheSettings()
+    bridge: BridgeSettings = BridgeSettings()
+    hedge: HedgeSettings = HedgeSettings()
 
     def save_to_file(self, path: str) -> None:
         """Save settings to a YAML file."""
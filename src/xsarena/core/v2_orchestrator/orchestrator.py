@@ -228,6 +228,8 @@ class Orchestrator:
                 transport_kwargs["session_id"] = run_spec.bridge_session_id
             if run_spec.bridge_message_id:
                 transport_kwargs["message_id"] = run_spec.bridge_message_id
+            if run_spec.bridge_endpoints:
+                transport_kwargs["endpoints"] = run_spec.bridge_endpoints
 
             self.transport = create_backend(backend_type, **transport_kwargs)
 
@@ -319,6 +321,8 @@ class Orchestrator:
                 transport_kwargs["session_id"] = run_spec.bridge_session_id
             if run_spec.bridge_message_id:
                 transport_kwargs["message_id"] = run_spec.bridge_message_id
+            if run_spec.bridge_endpoints:
+                transport_kwargs["endpoints"] = run_spec.bridge_endpoints
 
             self.transport = create_backend("bridge", **transport_kwargs)
 
@@ -53,7 +53,18 @@ class RunSpecV2(BaseModel):
     backend: Optional[str] = Field("bridge", description="Backend to use for the run")
     model: Optional[str] = Field("default", description="Model to use for the run")
     concurrency: int = Field(1, description="Number of concurrent operations")
-    timeout: int = Field(300, description="Timeout for operations in seconds")
+    timeout: int = Field(300, description="Per-chunk watchdog timeout in seconds")
+    max_retries: int = Field(
+        3, ge=0, description="Retries per chunk before the job is marked failed"
+    )
+    retry_backoff_base: float = Field(
+        2.0,
+        gt=0,
+        description="Minimum retry backoff in seconds (decorrelated jitter grows from it)",
+    )
+    retry_backoff_max: float = Field(
+        60.0, ge=0, description="Upper bound for a single retry backoff in seconds"
+    )
 
     # Bridge-specific configuration
     bridge_session_id: Optional[str] = Field(
@@ -62,6 +73,10 @@ class RunSpecV2(BaseModel):
     bridge_message_id: Optional[str] = Field(
         None, description="Specific message ID for bridge"
     )
+    bridge_endpoints: List[Dict[str, Optional[str]]] = Field(
+        default_factory=list,
+        description="Bridge endpoints (base_url, session_id, message_id) to balance across",
+    )
 
     model_config = ConfigDict(extra="forbid")  # Forbid extra fields to catch typos
 
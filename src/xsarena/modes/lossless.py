@@ -25,7 +25,7 @@ Provide a synthesized summary that captures the essential information in a struc
         system_prompt = self._build_system_prompt(
             "text synthesis", extra_notes, role_content
         )
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def rewrite_lossless(
         self, text: str, extra_notes: Optional[str] = None
@@ -42,7 +42,7 @@ Focus on making it more readable while keeping every piece of information intact
         system_prompt = self._build_system_prompt(
             "lossless text rewriting", extra_notes, role_content
         )
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def lossless_run(self, text: str, extra_notes: Optional[str] = None) -> str:
         """Perform a comprehensive lossless processing run."""
@@ -69,7 +69,7 @@ Add connecting phrases, improve transitions, and ensure smooth reading flow whil
         system_prompt = self._build_system_prompt(
             "text flow improvement", extra_notes, role_content
         )
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def break_paragraphs(
         self, text: str, extra_notes: Optional[str] = None
@@ -86,7 +86,7 @@ Keep related ideas together but separate distinct concepts into their own paragr
         system_prompt = self._build_system_prompt(
             "paragraph restructuring", extra_notes, role_content
         )
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def enhance_structure(
         self, text: str, extra_notes: Optional[str] = None
@@ -103,7 +103,7 @@ Add markdown formatting where appropriate to improve readability while preservin
         system_prompt = self._build_system_prompt(
             "text structure enhancement", extra_notes, role_content
         )
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     def _load_role_directive(self, role_name: str) -> str:
         """Load content from a role directive file."""
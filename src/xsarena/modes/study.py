@@ -51,7 +51,7 @@ class StudyMode:
         system_prompt = SYSTEM_PROMPTS[
             "book"
         ]  # Using book mode for educational content
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def generate_quiz(
         self, content: str, num_questions: int = 10, question_type: str = "mixed"
@@ -64,7 +64,7 @@ class StudyMode:
 Provide questions with clear answer choices where appropriate and include the correct answers."""
 
         system_prompt = SYSTEM_PROMPTS["book"]
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def create_glossary(self, content: str) -> str:
         """Create a glossary of key terms from content."""
@@ -75,7 +75,7 @@ Provide questions with clear answer choices where appropriate and include the co
 Define each term clearly and concisely, focusing on terms that are important for understanding the content."""
 
         system_prompt = SYSTEM_PROMPTS["book"]
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def generate_index(self, content: str) -> str:
         """Generate an index for the content."""
@@ -86,7 +86,7 @@ Define each term clearly and concisely, focusing on terms that are important for
 Organize the index in a hierarchical format with main topics and subtopics."""
 
         system_prompt = SYSTEM_PROMPTS["book"]
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def drill_mode(
         self, questions: List[str], answers: List[str]
@@ -111,7 +111,7 @@ Organize the index in a hierarchical format with main topics and subtopics."""
 Include key concepts, summaries, important points to remember, and self-assessment questions."""
 
         system_prompt = SYSTEM_PROMPTS["book"]
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
 
     async def topic_summary(self, content: str, topic: str) -> str:
         """Create a summary of a specific topic from content."""
@@ -122,4 +122,4 @@ Include key concepts, summaries, important points to remember, and self-assessme
 Focus specifically on information related to {topic} and how it connects to the broader content."""
 
         system_prompt = SYSTEM_PROMPTS["book"]
-        return await self.engine.send_and_collect(prompt, system_prompt)
+        return await self.engine.send_and_collect(prompt, system_prompt, cache=True)
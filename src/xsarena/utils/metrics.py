@@ -47,6 +47,8 @@ class MetricsCollector:
     def __init__(self):
         self._enabled = PROMETHEUS_AVAILABLE
         self._job_costs = {}  # Track costs in memory when prometheus unavailable
+        self._coalesced = {}  # Requests served by a shared in-flight call, per backend
+        self._breaker_transitions = {}  # (transport, to_state) -> count
 
         if self._enabled:
             # Define metrics when prometheus is available
@@ -67,6 +69,16 @@ class MetricsCollector:
             self.active_jobs = Gauge(
                 "xsarena_active_jobs", "Number of currently active jobs"
             )
+            self.coalesced_requests_total = Counter(
+                "xsarena_coalesced_requests_total",
+                "Requests that joined an identical in-flight backend call",
+                ["backend"],
+            )
+            self.breaker_transitions_total = Counter(
+                "xsarena_circuit_breaker_transitions_total",
+                "Circuit breaker state transitions",
+                ["transport", "key", "state"],
+            )
         else:
             # Initialize dummy attributes when prometheus unavailable
             self.tokens_used_total = Counter()
@@ -74,6 +86,8 @@ class MetricsCollector:
             self.chunks_processed_total = Counter()
             self.job_duration_seconds = Histogram()
             self.active_jobs = Gauge()
+            self.coalesced_requests_total = Counter()
+            self.breaker_transitions_total = Counter()
 
     def record_tokens(self, model: str, input_tokens: int, output_tokens: int) -> None:
         """Record token usage."""
@@ -106,6 +120,31 @@ class MetricsCollector:
         if self._enabled:
             self.active_jobs.set(count)
 
+    def record_coalesced(self, backend: str) -> None:
+        """Record a request served by an identical in-flight call."""
+        if self._enabled:
+            self.coalesced_requests_total.labels(backend=backend).inc()
+        self._coalesced[backend] = self._coalesced.get(backend, 0) + 1
+
+    def get_coalesced(self) -> dict:
+        """Coalesced request counts per backend (this process)."""
+        return dict(self._coalesced)
+
+    def record_breaker_transition(self, transport: str, key: str, state: str) -> None:
+        """Record a circuit breaker entering `state` (closed/open/half_open)."""
+        if self._enabled:
+            self.breaker_transitions_total.labels(
+                transport=transport, key=key, state=state
+            ).inc()
+        counter_key = (transport, state)
+        self._breaker_transitions[counter_key] = (
+            self._breaker_transitions.get(counter_key, 0) + 1
+        )
+
+    def get_breaker_transitions(self) -> dict:
+        """Breaker transition counts keyed by (transport, state) (this process)."""
+        return dict(self._breaker_transitions)
+
     def get_total_cost(self, model: Optional[str] = None) -> float:
         """Get total cost, either for specific model or all models."""
         if self._enabled:
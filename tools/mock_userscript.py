@@ -4,6 +4,9 @@ Mock userscript for development and testing purposes.
 This script simulates the real userscript by connecting to the bridge server via WebSocket,
 receiving payloads, and sending back mock responses via WebSocket instead of HTTP POSTs.
 It serves as a development helper to test the bridge without requiring a real browser.
+
+For latency/fault injection and load tests use `xsarena ops dev mock-userscript`
+and `xsarena ops dev loadtest` instead.
 """
 
 import asyncio
@@ -1,7 +1,7 @@
 // ==UserScript==
 // @name         XSArena Bridge v2 (WebSocket-based)
 // @namespace    http://tampermonkey.net/
-// @version      0.5
+// @version      0.6
 // @description  WebSocket-based bridge for XSArena, supporting all XSArena features.
 // @match        https://lmarena.ai/*
 // @match        https://*.lmarena.ai/*
@@ -22,6 +22,25 @@
   let ws = null;
   let isCaptureModeActive = false;
   let isApiBridgeRequest = false; // Flag to avoid recursive capture
+  // Per-request stream control for the bridge's backpressure commands
+  const streamControls = new Map(); // request_id -> { paused, wake, abort }
+
+  function streamControl(requestId) {
+    let control = streamControls.get(requestId);
+    if (!control) {
+      control = { paused: false, wake: null, abort: new AbortController() };
+      streamControls.set(requestId, control);
+    }
+    return control;
+  }
+
+  function resumeStream(control) {
+    control.paused = false;
+    if (control.wake) {
+      control.wake();
+      control.wake = null;
+    }
+  }
 
   // Function to connect WebSocket
   function connectWebSocket() {
@@ -57,6 +76,20 @@
               if (!document.title.startsWith("🎯 ")) {
                 document.title = "🎯 " + document.title;
               }
+            } else if (command === "pause_stream" || command === "resume_stream" || command === "cancel_stream") {
+              // The bridge's buffer for this request is full (or drained, or given up on).
+              // Pausing stops reading the response body, so the browser stops pulling from LMArena.
+              const control = streamControls.get(message.request_id);
+              if (control) {
+                if (command === "pause_stream") {
+                  control.paused = true;
+                } else if (command === "resume_stream") {
+                  resumeStream(control);
+                } else {
+                  control.abort.abort();
+                  resumeStream(control);
+                }
+              }
             } else if (command === "send_page_source") {
               console.log("[XSArenaBridge] Sending page source to bridge...");
               // Send the full HTML of the page to the bridge
@@ -110,6 +143,7 @@
 
   // Function to execute LMArena request
   async function executeLMArenaRequest(requestId, payload) {
+    const control = streamControl(requestId);
     try {
       const { message_templates, target_model_id, session_id, message_id, is_image_request } = payload || {};
       if (!Array.isArray(message_templates) || !session_id || !message_id) {
@@ -223,7 +257,8 @@
           "X-Api-Bridge-Request": "true"  // Custom header to identify bridge requests
         },
         credentials: "include",
-        body: JSON.stringify(body)
+        body: JSON.stringify(body),
+        signal: control.abort.signal
       });
 
       // Reset the flag after request
@@ -239,6 +274,14 @@
       const reader = resp.body.getReader();
       const dec = new TextDecoder();
       while (true) {
+        if (control.paused) {
+          await new Promise(resolve => { control.wake = resolve; });
+        }
+        if (control.abort.signal.aborted) {
+          await reader.cancel().catch(() => {});
+          console.log("[XSArenaBridge] Stream cancelled by bridge:", requestId);
+          return;
+        }
         const { value, done } = await reader.read();
         if (done) break;
         const chunk = dec.decode(value);
@@ -258,9 +301,15 @@
       }
       sendResponse(requestId, "[DONE]");
     } catch (e) {
-      console.error("[XSArenaBridge] job error:", e);
       isApiBridgeRequest = false; // Reset flag on error
+      if (control.abort.signal.aborted) {
+        console.log("[XSArenaBridge] Stream cancelled by bridge:", requestId);
+        return;
+      }
+      console.error("[XSArenaBridge] job error:", e);
       sendResponse(requestId, { error: e.message || String(e) });
+    } finally {
+      streamControls.delete(requestId);
     }
   }
 